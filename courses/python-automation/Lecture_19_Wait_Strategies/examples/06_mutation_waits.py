@@ -0,0 +1,298 @@
+"""Example 6: Event-Driven Waits with MutationObserver
+
+04_custom_waits.py uses page.wait_for_function(), which re-runs the JS
+predicate on EVERY animation frame (~60 times per second) until it is true.
+With many parallel tests on one machine, all that polling burns browser CPU.
+
+This example builds a small wait library that:
+- installs ONE MutationObserver per page
+- re-checks conditions ONLY when the DOM actually changes
+- resolves in the same tick as the mutation that made the condition true
+- records latency statistics for every wait
+
+Conditions:
+    count_is(selector, n)
+    text_contains(selector, text)
+    attr_absent(selector, attribute)
+    style_equals(selector, property, value)
+    all_of(...), any_of(...)
+
+Note: MutationObserver only sees DOM changes (nodes, attributes, text).
+A computed style that changes WITHOUT a DOM change (e.g. a :hover rule or a
+CSS animation) is not observed - use wait_for_function() for those.
+"""
+import statistics
+
+from playwright.sync_api import sync_playwright, Page, TimeoutError
+
+
+# ============================================
+# JAVASCRIPT WAIT ENGINE (runs in the page)
+# ============================================
+
+WAIT_ENGINE_JS = """
+() => {
+    if (window.__waitEngine) return;
+
+    const check = (spec) => {
+        switch (spec.kind) {
+            case "count":
+                return document.querySelectorAll(spec.selector).length === spec.value;
+            case "text": {
+                const el = document.querySelector(spec.selector);
+                return !!el && el.textContent.includes(spec.value);
+            }
+            case "attr_absent": {
+                const el = document.querySelector(spec.selector);
+                return !!el && !el.hasAttribute(spec.attribute);
+            }
+            case "style": {
+                const el = document.querySelector(spec.selector);
+                return !!el && getComputedStyle(el).getPropertyValue(spec.property) === spec.value;
+            }
+            case "all":
+                return spec.conditions.every(check);
+            case "any":
+                return spec.conditions.some(check);
+        }
+        throw new Error("Unknown condition: " + spec.kind);
+    };
+
+    const pending = new Set();
+    let observer = null;
+
+    const run = () => {
+        for (const wait of pending) {
+            wait.checks += 1;
+            if (check(wait.spec)) wait.finish(true);
+        }
+        if (!pending.size && observer) {
+            observer.disconnect();   // nothing to wait for - stop observing
+            observer = null;
+        }
+    };
+
+    const observe = () => {
+        if (observer) return;
+        observer = new MutationObserver(run);
+        observer.observe(document.documentElement, {
+            childList: true, subtree: true, attributes: true, characterData: true,
+        });
+    };
+
+    window.__waitEngine = {
+        wait(spec, timeout) {
+            const started = performance.now();
+            return new Promise((resolve) => {
+                const wait = {spec, checks: 1, finish: null};
+                let timer = null;
+                wait.finish = (ok) => {
+                    pending.delete(wait);
+                    clearTimeout(timer);
+                    resolve({ok, elapsed: performance.now() - started, checks: wait.checks});
+                };
+                if (check(spec)) {
+                    resolve({ok: true, elapsed: 0, checks: 1});
+                    return;
+                }
+                pending.add(wait);
+                observe();
+                timer = setTimeout(() => wait.finish(false), timeout);
+            });
+        },
+    };
+}
+"""
+
+
+# Installs the engine on first use in each document, then waits.
+# page.evaluate() returns only when the Promise resolves.
+WAIT_JS = f"""
+([spec, timeout]) => {{
+    ({WAIT_ENGINE_JS})();
+    return window.__waitEngine.wait(spec, timeout);
+}}
+"""
+
+
+# ============================================
+# CONDITIONS (Python side)
+# ============================================
+# A condition is just a JSON-able spec + a readable description.
+# The spec is sent to the browser; the description is used in stats/errors.
+
+class Condition:
+    def __init__(self, spec, description):
+        self.spec = spec
+        self.description = description
+
+    def __repr__(self):
+        return self.description
+
+
+def count_is(selector, value):
+    return Condition({"kind": "count", "selector": selector, "value": value},
+                     f"count({selector}) == {value}")
+
+
+def text_contains(selector, text):
+    return Condition({"kind": "text", "selector": selector, "value": text},
+                     f"text({selector}) contains {text!r}")
+
+
+def attr_absent(selector, attribute):
+    return Condition({"kind": "attr_absent", "selector": selector, "attribute": attribute},
+                     f"{selector} has no [{attribute}]")
+
+
+def style_equals(selector, property_name, value):
+    return Condition({"kind": "style", "selector": selector,
+                      "property": property_name, "value": value},
+                     f"style({selector}).{property_name} == {value!r}")
+
+
+def all_of(*conditions):
+    return Condition({"kind": "all", "conditions": [c.spec for c in conditions]},
+                     "all_of(" + ", ".join(c.description for c in conditions) + ")")
+
+
+def any_of(*conditions):
+    return Condition({"kind": "any", "conditions": [c.spec for c in conditions]},
+                     "any_of(" + ", ".join(c.description for c in conditions) + ")")
+
+
+# ============================================
+# WAITER
+# ============================================
+
+class MutationWaiter:
+    """Event-driven waits for one page, with latency statistics."""
+
+    def __init__(self, page: Page, default_timeout=10000):
+        self.page = page
+        self.default_timeout = default_timeout
+        self.latencies = {}  # description -> [ms, ms, ...]
+        self.checks = {}     # description -> [checks per wait, ...]
+
+    def wait(self, condition: Condition, timeout=None):
+        """Block until the condition is true or raise TimeoutError."""
+        timeout = timeout or self.default_timeout
+        # Install (if this document doesn't have it yet) + wait = ONE round trip
+        result = self.page.evaluate(WAIT_JS, [condition.spec, timeout])
+        self.latencies.setdefault(condition.description, []).append(result["elapsed"])
+        self.checks.setdefault(condition.description, []).append(result["checks"])
+        if not result["ok"]:
+            raise TimeoutError(f"Timeout {timeout}ms exceeded waiting for: {condition}")
+        return result["elapsed"]
+
+    def stats(self):
+        """Per-condition latency summary in milliseconds."""
+        summary = {}
+        for description, values in self.latencies.items():
+            ordered = sorted(values)
+            summary[description] = {
+                "count": len(values),
+                "mean_ms": statistics.fmean(values),
+                "p50_ms": ordered[len(ordered) // 2],
+                "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                "max_ms": ordered[-1],
+                "checks": sum(self.checks[description]),
+            }
+        return summary
+
+    def print_stats(self):
+        print(f"   {'condition':<55} {'n':>3} {'p50':>8} {'p95':>8} {'checks':>7}")
+        for description, s in self.stats().items():
+            print(f"   {description[:55]:<55} {s['count']:>3} "
+                  f"{s['p50_ms']:>6.1f}ms {s['p95_ms']:>6.1f}ms {s['checks']:>7}")
+
+
+# ============================================
+# DEMO
+# ============================================
+
+def example_mutation_waits():
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        page = browser.new_page()
+        waiter = MutationWaiter(page)
+
+        print("=== MutationObserver Waits Demo ===\n")
+
+        # Example 1: Wait for element count
+        print("1. Waiting for 5 added elements...")
+        page.goto("https://the-internet.herokuapp.com/add_remove_elements/")
+        for i in range(5):
+            page.locator("button").first.click()
+        waiter.wait(count_is(".added-manually", 5))
+        print("   ✓ 5 elements present!")
+
+        # Example 2: Wait for text content
+        print("\n2. Waiting for 'Hello World' text...")
+        page.goto("https://the-internet.herokuapp.com/dynamic_loading/2")
+        page.locator("#start button").click()
+        elapsed = waiter.wait(text_contains("#finish h4", "Hello World"))
+        print(f"   ✓ Text appeared {elapsed:.1f}ms after waiting started")
+
+        # Example 3: Wait for attribute removal
+        print("\n3. Waiting for input to lose [disabled]...")
+        page.goto("https://the-internet.herokuapp.com/dynamic_controls")
+        page.locator("button").filter(has_text="Enable").click()
+        waiter.wait(attr_absent("#input-example input", "disabled"))
+        print("   ✓ Input is enabled!")
+
+        # Example 4: Wait for computed style (changed by a style attribute)
+        print("\n4. Waiting for #finish to be displayed...")
+        page.goto("https://the-internet.herokuapp.com/dynamic_loading/1")
+        page.locator("#start button").click()
+        waiter.wait(style_equals("#finish", "display", "block"))
+        print("   ✓ Element became visible!")
+
+        # Example 5: Combinators
+        print("\n5. Waiting for loading hidden AND result shown...")
+        page.goto("https://the-internet.herokuapp.com/dynamic_loading/1")
+        page.locator("#start button").click()
+        waiter.wait(all_of(
+            style_equals("#loading", "display", "none"),
+            text_contains("#finish h4", "Hello"),
+        ))
+        print("   ✓ Both conditions true!")
+
+        print("\n6. Success OR error message, whichever comes first...")
+        page.goto("https://the-internet.herokuapp.com/dynamic_controls")
+        page.locator("#checkbox-example button").click()
+        waiter.wait(any_of(
+            text_contains("#message", "It's gone!"),
+            text_contains("#message", "It's back!"),
+        ))
+        print("   ✓ One of the messages appeared!")
+
+        # Example 7: Timeout
+        print("\n7. Condition that never becomes true...")
+        try:
+            waiter.wait(count_is(".does-not-exist", 3), timeout=500)
+        except TimeoutError as error:
+            print(f"   ✓ {error}")
+
+        # Latency statistics - "checks" shows how FEW times each predicate ran.
+        # wait_for_function() would have run it on every frame instead.
+        print("\n8. Wait statistics:")
+        waiter.print_stats()
+
+        browser.close()
+
+
+# ============================================
+# KEY POINTS:
+#
+# 1. wait_for_function() polls every animation frame
+# 2. MutationObserver re-checks only when the DOM changes
+# 3. One observer per page, disconnected when nothing is pending
+# 4. Conditions are JSON specs -> easy to combine (all_of / any_of)
+# 5. Track per-wait latency to find slow spots
+# 6. Non-DOM changes (hover, animations) still need polling
+# ============================================
+
+
+if __name__ == "__main__":
+    example_mutation_waits()
@@ -0,0 +1,343 @@
+"""Example 6: Table Snapshot - Read a Whole Table in One Call
+
+03_table_handling.py reads tables cell by cell:
+
+    for row in rows:
+        cells = row.locator("td").all()             # 1 round trip
+        data = [c.text_content() for c in cells]    # 1 round trip PER CELL
+
+Every text_content() is a separate message to the browser. A 1,000-row,
+6-column table means ~7,000 round trips.
+
+TableSnapshot reads headers + all cells with ONE evaluate() call and
+keeps the data in Python. Filtering, sorting, finding rows and statistics
+(examples 7-12 of 03_table_handling.py) then cost zero browser calls.
+"""
+import re
+import time
+from datetime import datetime
+
+from playwright.sync_api import sync_playwright, Locator
+
+
+# ============================================
+# JAVASCRIPT: EXTRACT EVERYTHING AT ONCE
+# ============================================
+# Runs inside the browser. Returns plain lists/dicts, which Playwright
+# sends back to Python as one JSON message.
+
+EXTRACT_TABLE_JS = """
+(table, options) => {
+    const headerCells = table.querySelectorAll("thead th");
+    const headers = Array.from(headerCells, th => th.textContent.trim());
+
+    // The HTML parser wraps bare <tr>s in a <tbody>, so tBodies is never empty
+    const bodyRows = Array.from(table.tBodies).flatMap(body => Array.from(body.rows));
+
+    const rows = [];
+    const attributes = [];
+    const links = [];
+    for (const tr of bodyRows) {
+        const cells = Array.from(tr.cells);
+        rows.push(cells.map(td => td.textContent.trim()));
+        if (options.attributes) {
+            attributes.push(cells.map(td => Object.fromEntries(
+                Array.from(td.attributes, a => [a.name, a.value])
+            )));
+        }
+        if (options.links) {
+            links.push(cells.map(td => Array.from(td.querySelectorAll("a[href]"), a => a.href)));
+        }
+    }
+    return {headers, rows, attributes, links};
+}
+"""
+
+
+# ============================================
+# TYPED PARSING
+# ============================================
+# Values come back as strings. Parsers turn them into numbers/dates ONCE,
+# so we never write float(text.replace('$', '')) by hand again.
+
+DATE_FORMATS = ["%Y-%m-%d", "%m/%d/%Y", "%d.%m.%Y", "%b %d, %Y"]
+
+
+def parse_currency(text):
+    """'$1,050.00' -> 1050.0, '-$5' -> -5.0"""
+    cleaned = re.sub(r"[^\d.\-]", "", text)
+    if not cleaned or cleaned in "-.":
+        raise ValueError(f"Not a currency value: {text!r}")
+    return float(cleaned)
+
+
+def parse_number(text):
+    """'1,234' -> 1234, '3.5' -> 3.5"""
+    cleaned = text.replace(",", "").strip()
+    return float(cleaned) if "." in cleaned else int(cleaned)
+
+
+def parse_date(text):
+    """Try the common date formats used on test sites."""
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(text.strip(), date_format).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Not a date: {text!r}")
+
+
+PARSERS = {
+    "text": str,
+    "currency": parse_currency,
+    "number": parse_number,
+    "date": parse_date,
+}
+
+
+def detect_type(values):
+    """Pick the first parser that accepts every non-empty value."""
+    non_empty = [v for v in values if v != ""]
+    if not non_empty:
+        return "text"
+    for type_name in ("number", "currency", "date"):
+        # Currency must actually look like money, otherwise "123" counts too
+        if type_name == "currency" and not all(re.search(r"[$€£₴]", v) for v in non_empty):
+            continue
+        try:
+            for value in non_empty:
+                PARSERS[type_name](value)
+            return type_name
+        except ValueError:
+            continue
+    return "text"
+
+
+def unique_headers(headers):
+    """Column names that can be dict keys: blank -> column_<i>, repeats -> Name_2.
+
+    ['Name', '', 'Name'] -> ['Name', 'column_1', 'Name_2']
+    """
+    names = []
+    for index, header in enumerate(headers):
+        base = header or f"column_{index}"
+        name, count = base, 1
+        while name in names:
+            count += 1
+            name = f"{base}_{count}"
+        names.append(name)
+    return names
+
+
+# ============================================
+# TABLE SNAPSHOT
+# ============================================
+
+class TableSnapshot:
+    """Column-oriented copy of an HTML table.
+
+    columns["Due"] -> [50.0, 51.0, 100.0, 50.0]
+    raw["Due"]     -> ["$50.00", "$51.00", "$100.00", "$50.00"]
+    """
+
+    def __init__(self, headers, columns, raw, types, attributes=None, links=None):
+        self.headers = headers
+        self.columns = columns
+        self.raw = raw
+        self.types = types
+        self.attributes = attributes or []
+        self.links = links or []
+
+    # ---------- creation ----------
+
+    @classmethod
+    def capture(cls, table: Locator, types=None, attributes=False, links=False):
+        """Read the table with ONE browser round trip.
+
+        types: {"Due": "currency"} or {"Due": my_parser}; other columns
+               are detected automatically.
+        """
+        data = table.evaluate(EXTRACT_TABLE_JS, {"attributes": attributes, "links": links})
+        return cls.from_rows(data["headers"], data["rows"], types,
+                             data["attributes"], data["links"])
+
+    @classmethod
+    def from_rows(cls, headers, rows, types=None, attributes=None, links=None):
+        """Build a snapshot from a list of string rows (no browser needed)."""
+        width = max([len(headers)] + [len(row) for row in rows]) if rows else len(headers)
+        headers = unique_headers(list(headers) + [""] * (width - len(headers)))
+
+        raw = {h: [row[i] if i < len(row) else "" for row in rows] for i, h in enumerate(headers)}
+        types = dict(types or {})
+        columns = {}
+        for header in headers:
+            column_type = types.setdefault(header, detect_type(raw[header]))
+            parser = PARSERS.get(column_type, column_type)
+            columns[header] = [parser(v) if v != "" else None for v in raw[header]]
+        return cls(headers, columns, raw, types, attributes, links)
+
+    def take(self, indexes):
+        """New snapshot with only the given row indexes (in that order)."""
+        indexes = list(indexes)
+        return TableSnapshot(
+            self.headers,
+            {h: [values[i] for i in indexes] for h, values in self.columns.items()},
+            {h: [values[i] for i in indexes] for h, values in self.raw.items()},
+            self.types,
+            [self.attributes[i] for i in indexes] if self.attributes else None,
+            [self.links[i] for i in indexes] if self.links else None,
+        )
+
+    # ---------- rows ----------
+
+    def __len__(self):
+        return len(self.columns[self.headers[0]]) if self.headers else 0
+
+    def row(self, index):
+        """One row as a dict: {"Last Name": "Smith", "Due": 50.0, ...}"""
+        return {h: self.columns[h][index] for h in self.headers}
+
+    def rows(self):
+        for index in range(len(self)):
+            yield self.row(index)
+
+    def column(self, name):
+        return self.columns[name]
+
+    # ---------- searching / filtering / sorting (pure Python) ----------
+
+    def find_row(self, column, value):
+        """First row where column == value, or None."""
+        for index, cell in enumerate(self.columns[column]):
+            if cell == value:
+                return self.row(index)
+        return None
+
+    def find_index(self, column, value):
+        """Row index (0-based) where column == value, or -1."""
+        try:
+            return self.columns[column].index(value)
+        except ValueError:
+            return -1
+
+    def filter(self, predicate):
+        """Keep rows where predicate(row_dict) is True."""
+        return self.take(i for i in range(len(self)) if predicate(self.row(i)))
+
+    def contains(self, text):
+        """Rows where ANY cell contains text (like .filter(has_text=...))."""
+        return self.take(
+            i for i in range(len(self))
+            if any(text in self.raw[h][i] for h in self.headers)
+        )
+
+    def sort_by(self, column, reverse=False):
+        """Sort rows by a typed column (numbers sort as numbers)."""
+        values = self.columns[column]
+        present = [i for i in range(len(self)) if values[i] is not None]
+        missing = [i for i in range(len(self)) if values[i] is None]
+        order = sorted(present, key=lambda i: values[i], reverse=reverse)
+        return self.take(order + missing)  # empty cells always last
+
+    # ---------- statistics ----------
+
+    def numeric(self, column):
+        return [v for v in self.columns[column] if isinstance(v, (int, float))]
+
+    def sum(self, column):
+        return sum(self.numeric(column))
+
+    def mean(self, column):
+        values = self.numeric(column)
+        return sum(values) / len(values) if values else 0.0
+
+    def min(self, column):
+        return min(self.numeric(column), default=None)
+
+    def max(self, column):
+        return max(self.numeric(column), default=None)
+
+
+# ============================================
+# DEMO: EXAMPLES 7-12 WITHOUT ROUND TRIPS
+# ============================================
+
+def example_table_snapshot():
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        page = browser.new_page()
+
+        print("=== Table Snapshot Demo ===\n")
+        page.goto("https://the-internet.herokuapp.com/tables")
+
+        # 1. Capture the whole table - ONE evaluate() call
+        print("1. Capturing table in one call...")
+        start = time.perf_counter()
+        table = TableSnapshot.capture(page.locator("#table1"), links=True)
+        print(f"   {len(table)} rows x {len(table.headers)} columns "
+              f"in {(time.perf_counter() - start) * 1000:.1f}ms")
+        print(f"   Headers: {table.headers}")
+        print(f"   Detected types: {table.types}")
+
+        # 2. Compare with the cell-by-cell approach
+        print("\n2. Same table, cell by cell (03_table_handling.py style)...")
+        start = time.perf_counter()
+        slow_data = []
+        for row in page.locator("#table1 tbody tr").all():
+            slow_data.append([cell.text_content() for cell in row.locator("td").all()])
+        print(f"   {len(slow_data)} rows in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+        # 3. Find row by content (example 7)
+        print("\n3. Rows containing 'Smith'...")
+        for row in table.contains("Smith").rows():
+            print(f"   {row['Last Name']}, {row['First Name']}")
+
+        # 4. Find row by value (example 8)
+        print("\n4. Row where First Name == 'John'...")
+        john = table.find_row("First Name", "John")
+        print(f"   {john['Last Name']} owes ${john['Due']:.2f}")
+
+        # 5. One column (example 9)
+        print(f"\n5. Last names: {table.column('Last Name')}")
+
+        # 6. Filter with any Python condition
+        print("\n6. Rows with Due > 50...")
+        for row in table.filter(lambda r: r["Due"] > 50).rows():
+            print(f"   {row['First Name']} {row['Last Name']}: ${row['Due']:.2f}")
+
+        # 7. Sort by typed column (example 11) - $100 sorts above $51
+        print("\n7. Sorted by due amount (highest first)...")
+        for row in table.sort_by("Due", reverse=True).take(range(3)).rows():
+            print(f"   {row['First Name']} {row['Last Name']}: ${row['Due']:.2f}")
+
+        # 8. Statistics (example 12)
+        print("\n8. Statistics...")
+        print(f"   Total due:   ${table.sum('Due'):.2f}")
+        print(f"   Average due: ${table.mean('Due'):.2f}")
+        print(f"   Max due:     ${table.max('Due'):.2f}")
+
+        # 9. Links collected in the same call
+        smith_index = table.find_index("Last Name", "Smith")
+        print(f"\n9. Links in Smith's row: {table.links[smith_index]}")
+
+        # 10. If you need to CLICK something, go back to a locator by index
+        print("\n10. Clicking 'edit' in Smith's row via its index...")
+        page.locator("#table1 tbody tr").nth(smith_index).locator("a", has_text="edit").click()
+
+        print("\n✓ Table snapshot examples complete!")
+        browser.close()
+
+
+# ============================================
+# KEY POINTS:
+#
+# 1. Each text_content() is one browser round trip
+# 2. locator.evaluate() can return the WHOLE table at once
+# 3. Parse types once: currency, number, date
+# 4. Filter / sort / find / stats run in Python memory
+# 5. Use the row index to get back to a locator for clicks
+# ============================================
+
+
+if __name__ == "__main__":
+    example_table_snapshot()
@@ -0,0 +1,264 @@
+"""Example 7: Async Multi-User Load Runner
+
+async_multi_user_parallel() in 06_async_pages.py runs TWO hard-coded
+users with asyncio.gather(). This example turns that idea into a small
+load runner:
+
+- N virtual users (hundreds) run a scripted flow: login -> secure -> logout
+- a Semaphore limits how many run at the same time
+- users share a limited set of browser contexts (cleared between users)
+- ramp-up: users start gradually instead of all in the same millisecond
+- per-step latency histograms (p50 / p95 / p99)
+- throughput (flows/sec), error rate per step
+- browser memory growth (needs `pip install psutil`, optional)
+
+Run with:
+    python 07_async_load_runner.py --users 200 --concurrency 20 --ramp-up 10
+Against the local server from Lecture 32 (06_local_test_server.py):
+    python 07_async_load_runner.py --base-url http://127.0.0.1:8000
+"""
+import argparse
+import asyncio
+import bisect
+import time
+
+from playwright.async_api import async_playwright, Page
+
+try:
+    import psutil  # optional: only needed for memory numbers
+except ImportError:
+    psutil = None
+
+
+USERNAME = "tomsmith"
+PASSWORD = "SuperSecretPassword!"
+
+
+# ============================================
+# THE SCRIPTED FLOW
+# ============================================
+# Each step is an async function(page, base_url). Steps run in order;
+# if one fails, the rest of that user's flow is skipped.
+
+async def step_login(page: Page, base_url):
+    await page.goto(f"{base_url}/login")
+    await page.locator("#username").fill(USERNAME)
+    await page.locator("#password").fill(PASSWORD)
+    await page.locator("button[type='submit']").click()
+    await page.wait_for_url("**/secure")
+
+
+async def step_secure(page: Page, base_url):
+    await page.goto(f"{base_url}/secure")
+    await page.locator("a[href='/logout']").wait_for()
+
+
+async def step_logout(page: Page, base_url):
+    await page.locator("a[href='/logout']").click()
+    await page.wait_for_url("**/login")
+
+
+LOGIN_FLOW = [
+    ("login", step_login),
+    ("secure", step_secure),
+    ("logout", step_logout),
+]
+
+
+# ============================================
+# LATENCY HISTOGRAM
+# ============================================
+# Fixed buckets instead of storing every sample: memory stays the same
+# whether we run 100 or 100,000 flows.
+
+BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000]
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)  # last bucket = "more than"
+        self.total = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms):
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.total += 1
+        self.sum_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket that contains the percentile."""
+        if not self.total:
+            return 0.0
+        target = fraction * self.total
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return BUCKETS_MS[index] if index < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def bars(self, width=30):
+        peak = max(self.counts) or 1
+        labels = [f"<={b}ms" for b in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}ms"]
+        for label, count in zip(labels, self.counts):
+            if count:
+                yield f"{label:>10} | {'#' * max(1, count * width // peak)} {count}"
+
+
+# ============================================
+# BROWSER MEMORY (optional)
+# ============================================
+
+def browser_memory_mb():
+    """RSS of all child processes (Playwright driver + browser)."""
+    if psutil is None:
+        return None
+    total = 0
+    for child in psutil.Process().children(recursive=True):
+        try:
+            total += child.memory_info().rss
+        except psutil.Error:
+            pass
+    return total / 1024 / 1024
+
+
+# ============================================
+# LOAD RUNNER
+# ============================================
+
+class LoadRunner:
+    def __init__(self, browser, base_url, flow, users, concurrency, ramp_up):
+        self.browser = browser
+        self.base_url = base_url
+        self.flow = flow
+        self.users = users
+        self.concurrency = concurrency
+        self.ramp_up = ramp_up
+
+        self.histograms = {name: LatencyHistogram() for name, _ in flow}
+        self.errors = {name: 0 for name, _ in flow}
+        self.error_samples = []
+        self.completed = 0
+        self.memory_samples = []
+
+    async def run_user(self, user_id, semaphore, contexts):
+        # Ramp-up: spread user starts over `ramp_up` seconds
+        await asyncio.sleep(self.ramp_up * user_id / self.users)
+
+        async with semaphore:
+            context = await contexts.get()
+            page = await context.new_page()
+            try:
+                for name, step in self.flow:
+                    start = time.perf_counter()
+                    try:
+                        await step(page, self.base_url)
+                    except Exception as error:
+                        self.errors[name] += 1
+                        if len(self.error_samples) < 5:
+                            self.error_samples.append(f"user {user_id} / {name}: {error}")
+                        return
+                    self.histograms[name].add((time.perf_counter() - start) * 1000)
+                self.completed += 1
+            finally:
+                await page.close()
+                await context.clear_cookies()   # next user starts logged out
+                contexts.put_nowait(context)
+
+    async def sample_memory(self, interval=1.0):
+        while True:
+            memory = browser_memory_mb()
+            if memory is not None:
+                self.memory_samples.append(memory)
+            await asyncio.sleep(interval)
+
+    async def run(self):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        contexts = asyncio.Queue()
+        for _ in range(self.concurrency):
+            contexts.put_nowait(await self.browser.new_context())
+
+        sampler = asyncio.create_task(self.sample_memory())
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            self.run_user(user_id, semaphore, contexts) for user_id in range(self.users)
+        ))
+        self.elapsed = time.perf_counter() - start
+        sampler.cancel()
+
+        while not contexts.empty():
+            await contexts.get_nowait().close()
+
+    def report(self):
+        failed = self.users - self.completed
+        print(f"\n=== Load Report: {self.users} users, concurrency {self.concurrency}, "
+              f"ramp-up {self.ramp_up}s ===")
+        print(f"Elapsed:     {self.elapsed:.1f}s")
+        print(f"Throughput:  {self.completed / self.elapsed:.2f} flows/sec")
+        print(f"Errors:      {failed}/{self.users} flows ({failed / self.users * 100:.1f}%)")
+
+        print(f"\n{'step':<10} {'ok':>6} {'err':>5} {'mean':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+        for name, histogram in self.histograms.items():
+            mean = histogram.sum_ms / histogram.total if histogram.total else 0
+            print(f"{name:<10} {histogram.total:>6} {self.errors[name]:>5} {mean:>6.0f}ms "
+                  f"{histogram.percentile(0.50):>6.0f}ms {histogram.percentile(0.95):>6.0f}ms "
+                  f"{histogram.percentile(0.99):>6.0f}ms {histogram.max_ms:>6.0f}ms")
+
+        for name, histogram in self.histograms.items():
+            print(f"\n{name} latency:")
+            for line in histogram.bars():
+                print(f"  {line}")
+
+        if self.memory_samples:
+            first, peak, last = self.memory_samples[0], max(self.memory_samples), self.memory_samples[-1]
+            print(f"\nBrowser memory: start {first:.0f}MB, peak {peak:.0f}MB, "
+                  f"end {last:.0f}MB (growth {last - first:+.0f}MB)")
+        else:
+            print("\nBrowser memory: install psutil to measure")
+
+        for sample in self.error_samples:
+            print(f"  error: {sample}")
+
+
+# ============================================
+# MAIN
+# ============================================
+
+async def main(args):
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=not args.headed)
+        runner = LoadRunner(
+            browser, args.base_url, LOGIN_FLOW,
+            users=args.users, concurrency=args.concurrency, ramp_up=args.ramp_up,
+        )
+        await runner.run()
+        runner.report()
+        await browser.close()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Async multi-user load runner")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="seconds")
+    parser.add_argument("--base-url", default="https://the-internet.herokuapp.com")
+    parser.add_argument("--headed", action="store_true")
+    return parser.parse_args()
+
+
+# ============================================
+# KEY POINTS:
+#
+# 1. asyncio.Semaphore = at most N users at the same time
+# 2. Reuse a fixed set of contexts (clear cookies between users)
+# 3. Ramp-up avoids a thundering herd at t=0
+# 4. Bucket histograms keep memory flat for any number of samples
+# 5. Report throughput, errors AND latency percentiles
+# 6. Watch memory growth - leaks show up under load
+# ============================================
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,249 @@
+"""Example 6: Background Artifact Writer
+
+capture_step() and capture_on_failure() in 05_artifacts_management.py
+write every PNG and HTML file on the test thread, so each step also waits
+for the disk. The ArtifactSink below:
+
+- takes screenshot BYTES (page.screenshot() without path=) and hands them
+  to a background writer thread
+- stores files by content hash: identical frames are saved only once
+- gzips HTML dumps (in the background too)
+- stops writing when the run's disk budget is used up
+- flush() waits for the queue - call it on teardown
+
+Run with: python 06_artifact_writer.py
+Test (uses the artifact_sink fixture): pytest 06_artifact_writer.py -v -s
+Budget: ARTIFACT_BUDGET_MB=50 python 06_artifact_writer.py
+"""
+import gzip
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+import pytest
+from playwright.sync_api import Page, sync_playwright
+
+
+# ============================================
+# ARTIFACT SINK
+# ============================================
+
+class ArtifactSink:
+    """Queue artifacts on the test thread, write them on a background thread."""
+
+    def __init__(self, run_dir, budget_bytes=200 * 1024 * 1024, queue_size=256):
+        self.run_dir = run_dir
+        self.blob_dir = os.path.join(run_dir, "blobs")
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self.budget_bytes = budget_bytes
+
+        # Bounded: if the disk can't keep up, put() waits instead of
+        # filling memory with screenshots
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.entries = []     # manifest: what each step/test produced
+        self.blobs = {}       # digest -> relative path, already on disk
+        self.errors = []
+
+        # Statistics
+        self.bytes_written = 0
+        self.deduplicated = 0
+        self.dropped = 0
+        self.enqueue_time = 0.0   # spent on the TEST thread
+        self.write_time = 0.0     # spent on the writer thread
+
+        self.thread = threading.Thread(target=self._run, name="artifact-writer", daemon=True)
+        self.thread.start()
+
+    # ---------- test thread ----------
+
+    def put(self, name, data, kind):
+        start = time.perf_counter()
+        self.queue.put((name, kind, data))
+        self.enqueue_time += time.perf_counter() - start
+
+    def screenshot(self, page, name, **options):
+        """page.screenshot() to memory, then queue. Options as usual (full_page=...)."""
+        self.put(name, page.screenshot(**options), "png")
+
+    def html(self, page, name):
+        self.put(name, page.content().encode("utf-8"), "html")
+
+    def flush(self):
+        """Block until everything queued so far is on disk."""
+        self.queue.join()
+
+    def close(self):
+        self.flush()
+        self.queue.put(None)
+        self.thread.join()
+        with open(os.path.join(self.run_dir, "manifest.json"), "w") as f:
+            json.dump(self.entries, f, indent=2)
+
+    # ---------- writer thread ----------
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                start = time.perf_counter()
+                self._write(*item)
+                self.write_time += time.perf_counter() - start
+            except Exception as error:
+                # A failed write must never stop the writer (or the tests)
+                self.errors.append(f"{item[0]}: {error}")
+            finally:
+                self.queue.task_done()
+
+    def _write(self, name, kind, data):
+        digest = hashlib.sha256(data).hexdigest()
+        entry = {"name": name, "kind": kind, "sha256": digest, "bytes": len(data)}
+        self.entries.append(entry)
+
+        if digest in self.blobs:
+            self.deduplicated += 1
+            entry["path"] = self.blobs[digest]
+            return
+
+        if kind == "html":
+            data = gzip.compress(data, compresslevel=6)
+            extension = "html.gz"
+        else:
+            extension = kind
+
+        if self.bytes_written + len(data) > self.budget_bytes:
+            self.dropped += 1
+            entry["path"] = None  # over budget - recorded, not stored
+            return
+
+        # blobs/ab/abcdef....png - two-level dirs keep directories small
+        relative = os.path.join("blobs", digest[:2], f"{digest}.{extension}")
+        path = os.path.join(self.run_dir, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        self.blobs[digest] = relative
+        self.bytes_written += len(data)
+        entry["path"] = relative
+
+    def report(self):
+        print(f"   Artifacts: {len(self.entries)} captured, {len(self.blobs)} files written, "
+              f"{self.deduplicated} duplicates skipped, {self.dropped} over budget")
+        print(f"   Disk: {self.bytes_written / 1024:.0f} KB of "
+              f"{self.budget_bytes / 1024 / 1024:.0f} MB budget")
+        print(f"   Test thread: {self.enqueue_time * 1000:.1f}ms queuing, "
+              f"writer thread: {self.write_time * 1000:.1f}ms writing")
+        for error in self.errors:
+            print(f"   Write error: {error}")
+
+
+def budget_from_env():
+    return int(float(os.getenv("ARTIFACT_BUDGET_MB", "200")) * 1024 * 1024)
+
+
+# ============================================
+# HELPERS (same names as in 05_artifacts_management.py)
+# ============================================
+
+def capture_step(sink, page, step_number, step_name):
+    sink.screenshot(page, f"{step_number:02d}_{step_name}")
+
+
+def capture_on_failure(sink, page, test_name):
+    timestamp = datetime.now().strftime("%H%M%S")
+    sink.screenshot(page, f"FAILURE_{test_name}_{timestamp}", full_page=True)
+    sink.html(page, f"FAILURE_{test_name}_{timestamp}")
+
+
+# ============================================
+# FIXTURE (put this in conftest.py)
+# ============================================
+
+@pytest.fixture(scope="session")
+def artifact_sink():
+    run_dir = f"artifacts/test_run_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    sink = ArtifactSink(run_dir, budget_bytes=budget_from_env())
+    yield sink
+    sink.close()  # flush-on-teardown: nothing queued is lost
+    sink.report()
+
+
+# ============================================
+# DEMO: SYNCHRONOUS vs BACKGROUND
+# ============================================
+
+def run_steps(page, capture):
+    page.goto("https://the-internet.herokuapp.com/login")
+    capture(1, "login_page")
+    capture(2, "login_page_again")  # same frame -> stored once
+    page.locator("#username").fill("tomsmith")
+    capture(3, "username_entered")
+    page.locator("#password").fill("SuperSecretPassword!")
+    capture(4, "password_entered")
+    page.locator("button[type='submit']").click()
+    page.wait_for_load_state()
+    capture(5, "after_login")
+
+
+# ============================================
+# TESTS
+# ============================================
+
+def test_login_steps(page: Page, artifact_sink):
+    run_steps(page, lambda number, name: capture_step(artifact_sink, page, number, name))
+    artifact_sink.flush()
+    assert page.locator("#flash.success").is_visible()
+    # flush() waited for the writer: all five steps are in the manifest
+    assert len(artifact_sink.entries) >= 5
+    assert not artifact_sink.errors
+
+
+# ============================================
+# KEY POINTS:
+#
+# 1. page.screenshot() without path= returns bytes
+# 2. A background thread does hashing, compression and disk writes
+# 3. Bounded queue = back-pressure instead of unbounded memory
+# 4. Content-addressed files: identical frames stored once
+# 5. A disk budget protects CI runners from huge artifact folders
+# 6. flush()/close() on teardown so nothing is lost
+# ============================================
+
+
+if __name__ == "__main__":
+    with sync_playwright() as p:
+        print("=== Background Artifact Writer Demo ===\n")
+        browser = p.chromium.launch()
+        page = browser.new_page()
+        run_dir = f"artifacts/test_run_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+
+        # 1. The old way: every screenshot written on the test thread
+        os.makedirs(f"{run_dir}/sync", exist_ok=True)
+        start = time.perf_counter()
+        run_steps(page, lambda number, name: page.screenshot(
+            path=f"{run_dir}/sync/{number:02d}_{name}.png", full_page=True))
+        sync_time = time.perf_counter() - start
+        print(f"1. Synchronous capture: {sync_time:.2f}s")
+
+        # 2. The sink: test thread only takes the screenshot and queues it
+        sink = ArtifactSink(f"{run_dir}/sink", budget_bytes=budget_from_env())
+        start = time.perf_counter()
+        run_steps(page, lambda number, name: sink.screenshot(
+            page, f"{number:02d}_{name}", full_page=True))
+        capture_on_failure(sink, page, "demo")  # screenshot + gzipped HTML
+        sink_time = time.perf_counter() - start
+        print(f"2. Background capture: {sink_time:.2f}s")
+
+        sink.close()
+        sink.report()
+        print(f"\n3. Manifest: {run_dir}/sink/manifest.json")
+
+        browser.close()
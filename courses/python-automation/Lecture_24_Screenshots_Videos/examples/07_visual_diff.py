@@ -0,0 +1,470 @@
+"""Example 7: Visual Regression with NumPy
+
+02_element_screenshots.py and 04_screenshot_options.py SAVE screenshots,
+but nothing checks them against a known-good image. This example adds:
+
+- decode PNG -> NumPy array, compare whole images at once (no Python loops)
+- a color threshold, and anti-aliasing tolerance: a pixel that matches a
+  NEIGHBOUR in the other image is a shifted edge, not a real change
+- mask regions (like the mask= option in 04) that are ignored
+- per-region difference counts and a heatmap PNG
+- a baseline store with approve/update commands
+- batch comparison of many baselines in parallel processes
+
+Install: pip install numpy pillow
+Run with: pytest 07_visual_diff.py -v -s
+Approve new/changed screenshots: python 07_visual_diff.py approve [name ...]
+Rewrite all baselines from a run: VISUAL_UPDATE=1 pytest 07_visual_diff.py
+Compare everything in parallel:  python 07_visual_diff.py compare-all --workers 8
+Compare a fresh screenshot set:  python 07_visual_diff.py compare-all new_screenshots/
+"""
+import argparse
+import io
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+from PIL import Image
+from playwright.sync_api import Page
+
+
+BASE_URL = "https://the-internet.herokuapp.com"
+BASELINE_DIR = os.getenv("VISUAL_BASELINE_DIR", "visual_baselines")
+
+
+# ============================================
+# DECODE / ENCODE
+# ============================================
+
+def decode_png(source):
+    """PNG bytes or file path -> uint8 array of shape (height, width, 3)."""
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    with Image.open(source) as image:
+        return np.asarray(image.convert("RGB"))
+
+
+def encode_png(array):
+    buffer = io.BytesIO()
+    Image.fromarray(array).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+# ============================================
+# DIFF ENGINE
+# ============================================
+
+# 3x3 neighbourhood, without the pixel itself
+NEIGHBOURS = [(dy, dx) for dy in (-1, 0, 1) for dx in (-1, 0, 1) if (dy, dx) != (0, 0)]
+
+
+class DiffResult:
+    def __init__(self, diff_mask, aa_mask, region_size):
+        self.diff_mask = diff_mask   # True = real difference
+        self.aa_mask = aa_mask       # True = ignored as anti-aliasing
+        self.diff_pixels = int(np.count_nonzero(diff_mask))
+        self.aa_pixels = int(np.count_nonzero(aa_mask))
+        self.ratio = self.diff_pixels / diff_mask.size
+        self.region_size = region_size
+
+    @property
+    def regions(self):
+        """Changed pixels per region (computed only when asked for)."""
+        return region_counts(self.diff_mask, self.region_size)
+
+    def bbox(self):
+        """(x, y, width, height) around all differences, or None."""
+        if not self.diff_pixels:
+            return None
+        ys, xs = np.nonzero(self.diff_mask)
+        return int(xs.min()), int(ys.min()), int(xs.max() - xs.min() + 1), int(ys.max() - ys.min() + 1)
+
+    def worst_regions(self, count=5):
+        """[(x, y, pixels)] of the regions with most changed pixels."""
+        regions = self.regions
+        flat = np.argsort(regions, axis=None)[::-1][:count]
+        rows, cols = np.unravel_index(flat, regions.shape)
+        return [(int(c) * self.region_size, int(r) * self.region_size, int(regions[r, c]))
+                for r, c in zip(rows, cols) if regions[r, c]]
+
+
+def channel_distance(a, b):
+    """Largest per-channel difference, 0..255.
+
+    max(a, b) - min(a, b) never wraps around, so it can stay uint8 -
+    much faster than converting both images to int16 first.
+    """
+    distance = np.maximum(a, b)
+    distance -= np.minimum(a, b)
+    largest = np.maximum(distance[..., 0], distance[..., 1])
+    np.maximum(largest, distance[..., 2], out=largest)
+    return largest
+
+
+def matches_a_neighbour(source, other, threshold):
+    """Per pixel: does source[y, x] equal any pixel around (y, x) in `other`?
+
+    Eight whole-array comparisons against `other` shifted by one pixel
+    (edges repeat the border pixel) - no fancy indexing, so the cost is
+    fixed by the area compared, however many pixels changed.
+    """
+    height, width = other.shape[:2]
+    padded = np.pad(other, ((1, 1), (1, 1), (0, 0)), mode="edge")
+    found = np.zeros((height, width), dtype=bool)
+    for dy, dx in NEIGHBOURS:
+        shifted = padded[1 + dy:1 + dy + height, 1 + dx:1 + dx + width]
+        found |= channel_distance(source, shifted) <= threshold
+    return found
+
+
+def region_counts(mask, size):
+    """Changed pixels per size x size block (image padded to whole blocks)."""
+    height, width = mask.shape
+    padded = np.pad(mask, ((0, -height % size), (0, -width % size)))
+    rows, cols = padded.shape[0] // size, padded.shape[1] // size
+    return padded.reshape(rows, size, cols, size).sum(axis=(1, 3))
+
+
+def compare(actual, expected, threshold=0.1, anti_aliasing=True, masks=(), region_size=32):
+    """Compare two RGB arrays of the same size.
+
+    threshold: 0..1, per-channel color difference still counted as equal
+    masks:     [(x, y, width, height)] regions to ignore
+    """
+    if actual.shape != expected.shape:
+        raise ValueError(f"size differs: {actual.shape[1]}x{actual.shape[0]} "
+                         f"vs {expected.shape[1]}x{expected.shape[0]}")
+    limit = int(threshold * 255)
+
+    # 1. Find the band of rows that changed at all (a cheap exact compare),
+    #    then measure color distance inside that band only
+    diff_mask = np.zeros(actual.shape[:2], dtype=bool)
+    changed_rows = np.flatnonzero((actual != expected).reshape(actual.shape[0], -1).any(axis=1))
+    top, bottom = (changed_rows[0], changed_rows[-1] + 1) if changed_rows.size else (0, 0)
+    diff_mask[top:bottom] = channel_distance(actual[top:bottom], expected[top:bottom]) > limit
+    for x, y, width, height in masks:
+        diff_mask[max(y, 0):y + height, max(x, 0):x + width] = False
+
+    # 2. Anti-aliasing: only inside the bounding box of the changed pixels
+    #    (plus the 1px ring of neighbours they are compared with)
+    aa_mask = np.zeros_like(diff_mask)
+    changed_cols = np.flatnonzero(diff_mask[top:bottom].any(axis=0))
+    if anti_aliasing and changed_cols.size:
+        y0, y1 = max(top - 1, 0), min(bottom + 1, actual.shape[0])
+        x0, x1 = max(changed_cols[0] - 1, 0), min(changed_cols[-1] + 2, actual.shape[1])
+        box = (slice(y0, y1), slice(x0, x1))
+        shifted = diff_mask[box] & matches_a_neighbour(actual[box], expected[box], limit)
+        if shifted.any():
+            shifted &= matches_a_neighbour(expected[box], actual[box], limit)
+        aa_mask[box] = shifted
+        diff_mask[box] &= ~shifted
+
+    return DiffResult(diff_mask, aa_mask, region_size)
+
+
+def heatmap(actual, result, masks=()):
+    """Faded grey copy of the screenshot: red = changed, yellow = anti-aliasing,
+    blue tint = masked."""
+    luma = actual.astype(np.float32) @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    faded = (luma * 0.3 + 178).astype(np.uint8)
+    image = np.repeat(faded[:, :, None], 3, axis=2)
+    for x, y, width, height in masks:
+        image[max(y, 0):y + height, max(x, 0):x + width, 2] = 255
+    image[result.aa_mask] = (255, 210, 0)
+    image[result.diff_mask] = (255, 0, 0)
+    return image
+
+
+# ============================================
+# BASELINE STORE
+# ============================================
+# visual_baselines/
+#   login_form.png          <- approved baseline
+#   _actual/login_form.png  <- last screenshot that did not match
+#   _diff/login_form.png    <- heatmap for it
+
+class BaselineStore:
+    def __init__(self, root=BASELINE_DIR):
+        self.root = root
+        for sub in ("", "_actual", "_diff"):
+            os.makedirs(os.path.join(root, sub), exist_ok=True)
+
+    def paths(self, name):
+        return (os.path.join(self.root, f"{name}.png"),
+                os.path.join(self.root, "_actual", f"{name}.png"),
+                os.path.join(self.root, "_diff", f"{name}.png"))
+
+    def check(self, name, png_bytes, max_diff_ratio=0.0, update=False, **options):
+        """Compare against the baseline; raise AssertionError on mismatch."""
+        baseline_path, actual_path, diff_path = self.paths(name)
+
+        if update:
+            with open(baseline_path, "wb") as f:
+                f.write(png_bytes)
+            return None
+
+        if not os.path.exists(baseline_path):
+            with open(actual_path, "wb") as f:
+                f.write(png_bytes)
+            raise AssertionError(f"No baseline for '{name}'. Review {actual_path}, "
+                                 f"then run: python 07_visual_diff.py approve {name}")
+
+        actual = decode_png(png_bytes)
+        try:
+            result = compare(actual, decode_png(baseline_path), **options)
+        except ValueError as error:
+            with open(actual_path, "wb") as f:
+                f.write(png_bytes)
+            raise AssertionError(f"'{name}': {error}") from None
+
+        if result.ratio > max_diff_ratio:
+            with open(actual_path, "wb") as f:
+                f.write(png_bytes)
+            Image.fromarray(heatmap(actual, result, options.get("masks", ()))).save(diff_path)
+            raise AssertionError(
+                f"'{name}': {result.diff_pixels} pixels differ ({result.ratio:.3%}) "
+                f"in {result.bbox()}. Heatmap: {diff_path}")
+
+        # Passed: leftovers from an earlier failure are no longer relevant
+        for path in (actual_path, diff_path):
+            if os.path.exists(path):
+                os.remove(path)
+        return result
+
+    def pending(self):
+        folder = os.path.join(self.root, "_actual")
+        return sorted(name[:-4] for name in os.listdir(folder) if name.endswith(".png"))
+
+    def approve(self, names=None):
+        """Make the last actual screenshot the new baseline."""
+        approved = []
+        for name in names or self.pending():
+            baseline_path, actual_path, diff_path = self.paths(name)
+            if os.path.exists(actual_path):
+                shutil.move(actual_path, baseline_path)
+                if os.path.exists(diff_path):
+                    os.remove(diff_path)
+                approved.append(name)
+        return approved
+
+
+# ============================================
+# BATCH COMPARISON (PARALLEL PROCESSES)
+# ============================================
+
+def compare_files(job):
+    """One (name, actual_path, baseline_path) job - runs in a worker process."""
+    name, actual_path, baseline_path = job
+    start = time.perf_counter()
+    try:
+        result = compare(decode_png(actual_path), decode_png(baseline_path))
+        return name, result.diff_pixels, None, time.perf_counter() - start
+    except (OSError, ValueError) as error:
+        return name, None, str(error), time.perf_counter() - start
+
+
+def batch_jobs(store, folder=None):
+    """Jobs for every NAME.png in `folder` (default: _actual/) that has a baseline.
+
+    Returns (jobs, names without a baseline).
+    """
+    folder = folder or os.path.join(store.root, "_actual")
+    jobs, missing = [], []
+    for filename in sorted(os.listdir(folder)):
+        if not filename.endswith(".png"):
+            continue
+        name = filename[:-4]
+        baseline_path = store.paths(name)[0]
+        if os.path.exists(baseline_path):
+            jobs.append((name, os.path.join(folder, filename), baseline_path))
+        else:
+            missing.append(name)
+    return jobs, missing
+
+
+def compare_many(jobs, workers=None):
+    """Decoding PNGs is CPU work - processes, not threads, use every core."""
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(compare_files, jobs, chunksize=8))
+
+
+# ============================================
+# FIXTURES (put these in conftest.py)
+# ============================================
+
+@pytest.fixture(scope="session")
+def baselines():
+    return BaselineStore()
+
+
+@pytest.fixture
+def assert_screenshot(baselines):
+    """assert_screenshot("name", png_bytes, masks=[...]); VISUAL_UPDATE=1 rewrites baselines."""
+    update = os.getenv("VISUAL_UPDATE") == "1"
+
+    def _assert(name, png_bytes, **options):
+        return baselines.check(name, png_bytes, update=update, **options)
+
+    return _assert
+
+
+def mask_boxes(page: Page, *selectors):
+    """Bounding boxes of every element each selector matches, to use as masks."""
+    boxes = []
+    for selector in selectors:
+        for element in page.locator(selector).all():
+            box = element.bounding_box()
+            if box:
+                boxes.append((int(box["x"]), int(box["y"]), int(box["width"]) + 1, int(box["height"]) + 1))
+    return boxes
+
+
+# ============================================
+# TESTS
+# ============================================
+
+def make_image(width=200, height=100):
+    image = np.full((height, width, 3), 255, dtype=np.uint8)
+    image[20:60, 30:120] = (40, 90, 200)  # a "button"
+    return image
+
+
+def test_identical_images_match():
+    assert compare(make_image(), make_image()).diff_pixels == 0
+
+
+def test_real_change_is_found():
+    changed = make_image()
+    changed[70:80, 150:170] = (255, 0, 0)
+    result = compare(changed, make_image())
+    assert result.diff_pixels == 200
+    assert result.bbox() == (150, 70, 20, 10)
+
+
+def test_anti_aliased_edge_is_ignored():
+    """The button moved 1px: the edge pixels match a neighbour in the other image."""
+    shifted = np.full_like(make_image(), 255)
+    shifted[20:60, 31:121] = (40, 90, 200)
+    result = compare(shifted, make_image())
+    assert result.diff_pixels == 0
+    assert result.aa_pixels > 0
+
+    strict = compare(shifted, make_image(), anti_aliasing=False)
+    assert strict.diff_pixels > 0
+
+
+def test_mask_hides_region():
+    changed = make_image()
+    changed[70:80, 150:170] = (255, 0, 0)
+    assert compare(changed, make_image(), masks=[(140, 65, 40, 20)]).diff_pixels == 0
+
+
+def test_full_hd_speed():
+    rng = np.random.default_rng(1)
+    expected = rng.integers(0, 256, (1080, 1920, 3), dtype=np.uint8)
+    actual = expected.copy()
+    actual[500:520, 900:960] = 0
+
+    compare(actual, expected)  # warm-up
+    start = time.perf_counter()
+    result = compare(actual, expected)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"\n  1920x1080 diff: {elapsed:.1f}ms, {result.diff_pixels} pixels differ")
+    assert result.diff_pixels > 0
+
+
+def test_full_hd_worst_case_speed():
+    """Every pixel differs: the anti-aliasing pass covers the whole frame."""
+    rng = np.random.default_rng(2)
+    expected = rng.integers(0, 256, (1080, 1920, 3), dtype=np.uint8)
+    actual = rng.integers(0, 256, (1080, 1920, 3), dtype=np.uint8)
+
+    start = time.perf_counter()
+    result = compare(actual, expected)
+    elapsed = time.perf_counter() - start
+    print(f"\n  1920x1080 fully different: {elapsed * 1000:.0f}ms, {result.diff_pixels} pixels differ")
+    assert result.diff_pixels > 0.9 * expected.shape[0] * expected.shape[1]
+    assert elapsed < 1.5  # the per-pixel neighbour lookup it replaced took ~3s
+
+
+def test_batch_compare_fresh_screenshots(tmp_path):
+    """No browser needed: a folder of new screenshots against the baselines."""
+    store = BaselineStore(str(tmp_path / "baselines"))
+    fresh = tmp_path / "new"
+    fresh.mkdir()
+    changed = make_image()
+    changed[70:80, 150:170] = (255, 0, 0)
+    for name in ("same", "changed"):
+        Image.fromarray(make_image()).save(store.paths(name)[0])
+    Image.fromarray(make_image()).save(fresh / "same.png")
+    Image.fromarray(changed).save(fresh / "changed.png")
+    Image.fromarray(changed).save(fresh / "brand_new.png")
+
+    jobs, missing = batch_jobs(store, str(fresh))
+    assert missing == ["brand_new"]
+    results = {name: diff for name, diff, _, _ in compare_many(jobs, workers=2)}
+    assert results == {"changed": 200, "same": 0}
+
+
+def test_login_form_visual(page: Page, assert_screenshot):
+    page.goto(f"{BASE_URL}/login")
+    form = page.locator("#login")
+    assert_screenshot("login_form", form.screenshot())
+
+
+def test_dynamic_page_with_mask(page: Page, assert_screenshot):
+    """Like the mask= example in 04: the changing content is ignored."""
+    page.goto(f"{BASE_URL}/dynamic_content")
+    masks = mask_boxes(page, "#content .row")
+    assert_screenshot("dynamic_content", page.screenshot(), masks=masks, max_diff_ratio=0.001)
+
+
+# ============================================
+# KEY POINTS:
+#
+# 1. Decode once, compare whole arrays - no per-pixel Python loops
+# 2. Diff only the changed rows; max - min keeps uint8 from wrapping
+# 3. Anti-aliasing: 8 shifted whole-array compares inside the changed box,
+#    never fancy indexing per changed pixel
+# 4. Masks for dynamic areas, heatmaps to see WHAT changed
+# 5. New/changed screenshots wait in _actual/ until approved
+# 6. Many baselines: ProcessPoolExecutor uses every CPU core
+# ============================================
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Visual baseline tool")
+    commands = parser.add_subparsers(dest="command", required=True)
+    approve = commands.add_parser("approve", help="accept actual screenshots as baselines")
+    approve.add_argument("names", nargs="*")
+    commands.add_parser("list", help="show screenshots waiting for approval")
+    compare_all = commands.add_parser("compare-all", help="compare a folder of screenshots with the baselines")
+    compare_all.add_argument("folder", nargs="?", default=None,
+                             help="NAME.png files to compare (default: the _actual/ folder)")
+    compare_all.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    store = BaselineStore()
+    if args.command == "approve":
+        approved = store.approve(args.names)
+        print(f"Approved {len(approved)}: {', '.join(approved) or '-'}")
+    elif args.command == "list":
+        for name in store.pending():
+            print(name)
+    else:
+        jobs, missing = batch_jobs(store, args.folder)
+        for name in missing:
+            print(f"{name:<40} {'':>9}  no baseline")
+        start = time.perf_counter()
+        results = compare_many(jobs, args.workers)
+        for name, diff_pixels, error, seconds in results:
+            status = error or ("OK" if diff_pixels == 0 else f"{diff_pixels} pixels differ")
+            print(f"{name:<40} {seconds * 1000:7.1f}ms  {status}")
+        print(f"{len(results)} comparisons in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
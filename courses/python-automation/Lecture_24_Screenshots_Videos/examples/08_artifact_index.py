@@ -0,0 +1,464 @@
+"""Example 8: Artifact Index and Garbage Collector
+
+create_artifact_directory() in 05_artifacts_management.py makes a new
+artifacts/test_run_<timestamp>/ folder every run. Add the screenshots/,
+traces/, videos/ and debug_output/ folders from Lectures 32 and 35 and
+they pile up forever. Finding "the trace of the test that failed
+yesterday" means walking the whole tree.
+
+This keeps a small SQLite index next to the artifacts:
+    run -> test nodeid + outcome -> files (path, kind, size, sha256)
+
+- lookup by test name is one indexed query (CLI: find)
+- retention rules: keep the last N runs, keep failures for X days,
+  cap the total size
+- GC reads the INDEX, not the disk, and deletes at most `batch` files per
+  call - run it at the end of every session and it never gets slow
+- `adopt` indexes old test_run_* folders once
+
+Setup: conftest.py in this folder stores the test reports the artifacts
+fixture reads and runs the GC once per session - copy both hooks.
+With pytest-xdist all workers write into ONE run (PYTEST_XDIST_TESTRUNUID).
+
+Run with (from this folder): pytest 08_artifact_index.py -v -s
+CLI:
+    python 08_artifact_index.py find test_login
+    python 08_artifact_index.py runs
+    python 08_artifact_index.py gc --keep-runs 10 --keep-failures-days 14 --max-mb 2000
+    python 08_artifact_index.py adopt artifacts
+"""
+import argparse
+import hashlib
+import os
+import sqlite3
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from playwright.sync_api import Page
+
+
+BASE_URL = "https://the-internet.herokuapp.com"
+ARTIFACT_ROOT = os.getenv("ARTIFACT_ROOT", "artifacts")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    name TEXT UNIQUE NOT NULL,
+    started_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tests (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    nodeid TEXT NOT NULL,
+    outcome TEXT NOT NULL DEFAULT 'unknown',
+    finished_at REAL,
+    UNIQUE (run_id, nodeid)
+);
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    test_id INTEGER REFERENCES tests(id),
+    path TEXT UNIQUE NOT NULL,      -- relative to the artifact root
+    kind TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    deleted_at REAL
+);
+CREATE INDEX IF NOT EXISTS tests_nodeid ON tests (nodeid);
+CREATE INDEX IF NOT EXISTS files_live ON files (deleted_at, created_at);
+CREATE INDEX IF NOT EXISTS files_test ON files (test_id);
+"""
+
+KINDS = {".png": "screenshot", ".jpg": "screenshot", ".zip": "trace",
+         ".webm": "video", ".html": "html", ".gz": "html", ".log": "log"}
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# ============================================
+# ARTIFACT INDEX
+# ============================================
+
+class ArtifactIndex:
+    def __init__(self, root=ARTIFACT_ROOT):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self.db = sqlite3.connect(os.path.join(root, "index.sqlite"), timeout=30)
+        self.db.row_factory = sqlite3.Row
+        # WAL: readers (the CLI) don't block writers (xdist workers)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+        self.run_id = None   # the current run - set by the session fixture
+        self.run_dir = None
+
+    def close(self):
+        self.db.close()
+
+    # ---------- recording ----------
+
+    def start_run(self, name=None, started_at=None):
+        name = name or f"test_run_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        with self.db:
+            self.db.execute("INSERT OR IGNORE INTO runs (name, started_at) VALUES (?, ?)",
+                            (name, started_at or time.time()))
+        return self.db.execute("SELECT id FROM runs WHERE name = ?", (name,)).fetchone()["id"]
+
+    def record_test(self, run_id, nodeid, outcome):
+        with self.db:
+            self.db.execute(
+                "INSERT INTO tests (run_id, nodeid, outcome, finished_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (run_id, nodeid) DO UPDATE SET outcome = excluded.outcome, "
+                "finished_at = excluded.finished_at",
+                (run_id, nodeid, outcome, time.time()))
+
+    def test_id(self, run_id, nodeid):
+        with self.db:
+            self.db.execute("INSERT OR IGNORE INTO tests (run_id, nodeid) VALUES (?, ?)",
+                            (run_id, nodeid))
+        return self.db.execute("SELECT id FROM tests WHERE run_id = ? AND nodeid = ?",
+                               (run_id, nodeid)).fetchone()["id"]
+
+    def add_file(self, run_id, path, nodeid=None, kind=None):
+        """Index a file that was just written (path may be anywhere under root)."""
+        relative = os.path.relpath(path, self.root)
+        kind = kind or KINDS.get(os.path.splitext(path)[1].lower(), "other")
+        test_id = self.test_id(run_id, nodeid) if nodeid else None
+        stat = os.stat(path)
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO files (run_id, test_id, path, kind, size, sha256, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (run_id, test_id, relative, kind, stat.st_size, file_sha256(path), stat.st_mtime))
+
+    # ---------- lookup ----------
+
+    def find(self, pattern, limit=20):
+        """Newest artifacts of tests whose nodeid contains `pattern`."""
+        return self.db.execute(
+            "SELECT runs.name AS run, tests.nodeid, tests.outcome, files.path, files.kind, files.size "
+            "FROM tests JOIN runs ON runs.id = tests.run_id "
+            "JOIN files ON files.test_id = tests.id "
+            "WHERE tests.nodeid LIKE ? AND files.deleted_at IS NULL "
+            "ORDER BY files.created_at DESC LIMIT ?",
+            (f"%{pattern}%", limit)).fetchall()
+
+    def runs(self):
+        return self.db.execute(
+            "SELECT runs.name, runs.started_at, COUNT(files.id) AS files, "
+            "COALESCE(SUM(files.size), 0) AS bytes, "
+            "(SELECT COUNT(*) FROM tests WHERE tests.run_id = runs.id AND tests.outcome = 'failed') AS failed "
+            "FROM runs LEFT JOIN files ON files.run_id = runs.id AND files.deleted_at IS NULL "
+            "GROUP BY runs.id ORDER BY runs.started_at DESC").fetchall()
+
+    def live_bytes(self):
+        return self.db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM files WHERE deleted_at IS NULL").fetchone()[0]
+
+    # ---------- garbage collection ----------
+
+    def gc(self, keep_runs=10, keep_failures_days=14, max_bytes=None, batch=500):
+        """Delete up to `batch` files that no rule protects. Returns (files, bytes)."""
+        now = time.time()
+        failure_cutoff = now - keep_failures_days * 86400
+
+        # Rules 1+2: older than the last N runs, and not a recent failure
+        candidates = self.db.execute(
+            "SELECT files.id, files.path, files.size FROM files "
+            "LEFT JOIN tests ON tests.id = files.test_id "
+            "WHERE files.deleted_at IS NULL "
+            "AND files.run_id NOT IN (SELECT id FROM runs ORDER BY started_at DESC LIMIT ?) "
+            "AND NOT (COALESCE(tests.outcome, '') = 'failed' AND files.created_at >= ?) "
+            "ORDER BY files.created_at LIMIT ?",
+            (keep_runs, failure_cutoff, batch)).fetchall()
+        deleted, freed = self._delete(candidates, now)
+
+        # Rule 3: size cap - oldest files first, whatever they are
+        if max_bytes is not None and deleted < batch:
+            excess = self.live_bytes() - max_bytes
+            if excess > 0:
+                oldest = self.db.execute(
+                    "SELECT id, path, size FROM files WHERE deleted_at IS NULL "
+                    "ORDER BY created_at LIMIT ?", (batch - deleted,)).fetchall()
+                over = []
+                for row in oldest:
+                    if excess <= 0:
+                        break
+                    over.append(row)
+                    excess -= row["size"]
+                more, more_bytes = self._delete(over, now)
+                deleted, freed = deleted + more, freed + more_bytes
+
+        self._remove_empty_runs()
+        return deleted, freed
+
+    def _delete(self, rows, now):
+        freed = 0
+        for row in rows:
+            path = os.path.join(self.root, row["path"])
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # already gone - just fix the index
+            freed += row["size"]
+        with self.db:
+            self.db.executemany("UPDATE files SET deleted_at = ? WHERE id = ?",
+                                [(now, row["id"]) for row in rows])
+        return len(rows), freed
+
+    def _remove_empty_runs(self):
+        """Drop the folder of runs whose files are all deleted (only that folder is walked)."""
+        empty = self.db.execute(
+            "SELECT runs.id, runs.name FROM runs WHERE NOT EXISTS "
+            "(SELECT 1 FROM files WHERE files.run_id = runs.id AND files.deleted_at IS NULL) "
+            "AND EXISTS (SELECT 1 FROM files WHERE files.run_id = runs.id)").fetchall()
+        for run in empty:
+            run_dir = os.path.join(self.root, run["name"])
+            for folder, _, _ in sorted(os.walk(run_dir), reverse=True):
+                try:
+                    os.rmdir(folder)  # only succeeds when empty: untracked files survive
+                except OSError:
+                    pass
+            with self.db:
+                self.db.execute("DELETE FROM files WHERE run_id = ?", (run["id"],))
+                self.db.execute("DELETE FROM tests WHERE run_id = ?", (run["id"],))
+                self.db.execute("DELETE FROM runs WHERE id = ?", (run["id"],))
+
+    # ---------- legacy folders ----------
+
+    def adopt(self, folder):
+        """Index existing test_run_* folders (one full scan, once)."""
+        adopted = 0
+        for name in sorted(os.listdir(folder)):
+            run_dir = os.path.join(folder, name)
+            if not (name.startswith("test_run_") and os.path.isdir(run_dir)):
+                continue
+            try:  # test_run_20240131_235959 -> when that run started
+                started_at = datetime.strptime(name, "test_run_%Y%m%d_%H%M%S").timestamp()
+            except ValueError:
+                started_at = os.path.getmtime(run_dir)
+            run_id = self.start_run(name, started_at)
+            for dirpath, _, filenames in os.walk(run_dir):
+                for filename in filenames:
+                    self.add_file(run_id, os.path.join(dirpath, filename))
+                    adopted += 1
+        return adopted
+
+
+def outcome_of(node):
+    """passed/failed/skipped from the reports conftest.py stores on the item.
+
+    Setup failed -> "error". No reports at all (the hook is not installed)
+    -> "unknown": better no answer than every test marked as an error.
+    """
+    call = getattr(node, "rep_call", None)
+    if call is not None:
+        return call.outcome
+    setup = getattr(node, "rep_setup", None)
+    if setup is not None:
+        return "error" if setup.failed else setup.outcome
+    return "unknown"
+
+
+# ============================================
+# FIXTURES (put these in conftest.py)
+# ============================================
+
+def run_name():
+    """One name for the whole run - all xdist workers share PYTEST_XDIST_TESTRUNUID."""
+    if os.getenv("ARTIFACT_RUN"):
+        return os.getenv("ARTIFACT_RUN")
+    run_uid = os.getenv("PYTEST_XDIST_TESTRUNUID")
+    if run_uid:
+        return f"test_run_{run_uid[:12]}"  # a timestamp could differ between workers
+    return f"test_run_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+
+
+def collect_garbage(root=ARTIFACT_ROOT):
+    """Incremental GC - run ONCE per session, by the process that is not a worker."""
+    index = ArtifactIndex(root)
+    files, freed = index.gc(
+        keep_runs=int(os.getenv("ARTIFACT_KEEP_RUNS", "10")),
+        keep_failures_days=float(os.getenv("ARTIFACT_KEEP_FAILURES_DAYS", "14")),
+        max_bytes=int(float(os.getenv("ARTIFACT_MAX_MB", "2000")) * 1024 * 1024),
+    )
+    index.close()
+    return files, freed
+
+
+@pytest.fixture(scope="session")
+def artifact_index():
+    # Every worker joins the same run: start_run() is INSERT OR IGNORE.
+    # GC is not done here - conftest.py runs collect_garbage() once, at the
+    # end of the whole session (on the xdist controller).
+    index = ArtifactIndex()
+    name = run_name()
+    index.run_id = index.start_run(name)
+    index.run_dir = os.path.join(index.root, name)
+    yield index
+    index.close()
+
+
+@pytest.fixture
+def artifacts(artifact_index, request):
+    """artifacts.path("screenshot.png") -> where to write; indexed after the test."""
+
+    class TestArtifacts:
+        def __init__(self):
+            safe = request.node.name.replace("/", "_")
+            self.dir = os.path.join(artifact_index.run_dir, safe)
+            self.paths = []
+
+        def path(self, filename):
+            os.makedirs(self.dir, exist_ok=True)
+            self.paths.append(os.path.join(self.dir, filename))
+            return self.paths[-1]
+
+    test_artifacts = TestArtifacts()
+    yield test_artifacts
+
+    outcome = outcome_of(request.node)
+    artifact_index.record_test(artifact_index.run_id, request.node.nodeid, outcome)
+    for path in test_artifacts.paths:
+        if os.path.exists(path):
+            artifact_index.add_file(artifact_index.run_id, path, request.node.nodeid)
+
+
+# pytest_runtest_makereport (sets item.rep_setup / rep_call) is in conftest.py
+
+
+# ============================================
+# TESTS
+# ============================================
+
+def test_login_screenshot(page: Page, artifacts):
+    page.goto(f"{BASE_URL}/login")
+    page.screenshot(path=artifacts.path("login.png"))
+    assert page.locator("h2").is_visible()
+
+
+def test_outcome_from_reports():
+    """No browser needed: the outcome comes from the stored reports."""
+    def report(outcome):
+        return SimpleNamespace(outcome=outcome, failed=outcome == "failed")
+
+    assert outcome_of(SimpleNamespace(rep_setup=report("passed"), rep_call=report("failed"))) == "failed"
+    assert outcome_of(SimpleNamespace(rep_setup=report("failed"))) == "error"
+    assert outcome_of(SimpleNamespace(rep_setup=report("skipped"))) == "skipped"
+    assert outcome_of(SimpleNamespace()) == "unknown"
+
+
+def test_workers_share_one_run(tmp_path, monkeypatch):
+    """No browser needed: two workers of one xdist run -> one run in the index."""
+    monkeypatch.delenv("ARTIFACT_RUN", raising=False)
+    monkeypatch.setenv("PYTEST_XDIST_TESTRUNUID", "5f2c0a9e41b34d0c")
+    workers = [ArtifactIndex(str(tmp_path)) for _ in range(2)]
+    assert len({index.start_run(run_name()) for index in workers}) == 1
+    assert len(workers[0].runs()) == 1
+    for index in workers:
+        index.close()
+
+
+def make_run(index, name, started_at, outcome="passed", size=100):
+    run_id = index.start_run(name)
+    index.db.execute("UPDATE runs SET started_at = ? WHERE id = ?", (started_at, run_id))
+    path = os.path.join(index.root, name, "test_a", "shot.png")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(os.urandom(size))
+    os.utime(path, (started_at, started_at))
+    index.record_test(run_id, "tests/test_a.py::test_a", outcome)
+    index.add_file(run_id, path, "tests/test_a.py::test_a")
+    return path
+
+
+def test_find_and_retention(tmp_path):
+    index = ArtifactIndex(str(tmp_path))
+    now = time.time()
+    old_pass = make_run(index, "test_run_1", now - 30 * 86400)
+    old_fail = make_run(index, "test_run_2", now - 20 * 86400, outcome="failed")
+    recent_fail = make_run(index, "test_run_3", now - 2 * 86400, outcome="failed")
+    latest = make_run(index, "test_run_4", now)
+
+    assert len(index.find("test_a")) == 4
+
+    files, _ = index.gc(keep_runs=1, keep_failures_days=14)
+    assert files == 2
+    assert not os.path.exists(old_pass) and not os.path.exists(old_fail)
+    assert os.path.exists(recent_fail) and os.path.exists(latest)
+    assert not os.path.exists(tmp_path / "test_run_1")  # empty run folder removed
+    assert [r["name"] for r in index.runs()] == ["test_run_4", "test_run_3"]
+    index.close()
+
+
+def test_size_cap_and_batches(tmp_path):
+    index = ArtifactIndex(str(tmp_path))
+    now = time.time()
+    for i in range(6):
+        make_run(index, f"test_run_{i}", now - (6 - i) * 60, size=1000)
+
+    # Only 2 files per call: GC work per session stays small
+    assert index.gc(keep_runs=10, max_bytes=2500, batch=2)[0] == 2
+    assert index.gc(keep_runs=10, max_bytes=2500, batch=2)[0] == 2
+    assert index.live_bytes() <= 2500
+    index.close()
+
+
+# ============================================
+# KEY POINTS:
+#
+# 1. Index artifacts when they are written - never search the disk later
+# 2. SQLite + WAL: one file, safe for parallel workers, no server
+# 3. Retention: last N runs, recent failures, total size cap
+# 4. GC in small batches at the end of every session
+# 5. Delete the file, mark the row - the index stays the source of truth
+# 6. `adopt` once to bring old test_run_* folders under control
+# ============================================
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Artifact index")
+    parser.add_argument("--root", default=ARTIFACT_ROOT)
+    commands = parser.add_subparsers(dest="command", required=True)
+    find = commands.add_parser("find", help="artifacts of tests matching a name")
+    find.add_argument("pattern")
+    find.add_argument("--limit", type=int, default=20)
+    commands.add_parser("runs", help="list indexed runs")
+    gc = commands.add_parser("gc", help="apply retention rules")
+    gc.add_argument("--keep-runs", type=int, default=10)
+    gc.add_argument("--keep-failures-days", type=float, default=14)
+    gc.add_argument("--max-mb", type=float, default=None)
+    gc.add_argument("--batch", type=int, default=500)
+    adopt = commands.add_parser("adopt", help="index existing test_run_* folders")
+    adopt.add_argument("folder")
+    args = parser.parse_args()
+
+    index = ArtifactIndex(args.root)
+    if args.command == "find":
+        for row in index.find(args.pattern, args.limit):
+            print(f"{row['run']}  {row['outcome']:<7} {row['kind']:<10} "
+                  f"{row['size']:>10,}  {os.path.join(index.root, row['path'])}")
+    elif args.command == "runs":
+        for row in index.runs():
+            started = datetime.fromtimestamp(row["started_at"]).strftime("%Y-%m-%d %H:%M")
+            print(f"{row['name']:<28} {started}  {row['files']:>5} files  "
+                  f"{row['bytes'] / 1024 / 1024:8.1f} MB  {row['failed']} failed")
+    elif args.command == "gc":
+        max_bytes = int(args.max_mb * 1024 * 1024) if args.max_mb else None
+        files, freed = index.gc(args.keep_runs, args.keep_failures_days, max_bytes, args.batch)
+        print(f"Removed {files} files ({freed / 1024 / 1024:.1f} MB)")
+    else:
+        print(f"Indexed {index.adopt(args.folder)} files")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+"""Hooks for 08_artifact_index.py: item.rep_<when> reports and one GC per session."""
+import importlib.util
+import os
+
+import pytest
+
+
+@pytest.hookimpl(tryfirst=True, hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    rep = outcome.get_result()
+    setattr(item, f"rep_{rep.when}", rep)
+
+
+def pytest_sessionfinish(session):
+    # xdist workers skip this: the controller finishes last and cleans up once
+    if hasattr(session.config, "workerinput"):
+        return
+    root = os.getenv("ARTIFACT_ROOT", "artifacts")
+    if not os.path.exists(os.path.join(root, "index.sqlite")):
+        return
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "08_artifact_index.py")
+    spec = importlib.util.spec_from_file_location("artifact_index", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    files, freed = module.collect_garbage(root)
+    print(f"\n  [artifact index] GC removed {files} files ({freed / 1024 / 1024:.1f} MB)")
@@ -0,0 +1,245 @@
+"""Example 6: Shared Auth-State Cache for Parallel Workers
+
+login_and_save() in 05_multi_user_auth.py logs in through the UI for every
+user on every run. With pytest-xdist (`pytest -n 4`) each WORKER repeats
+those logins, so 4 workers x 2 roles = 8 UI logins before any test starts.
+
+This cache:
+- keys saved states by role + credentials (changed password = new entry)
+- stores them in a directory shared by all xdist workers
+- uses a file lock, so exactly ONE worker logs in per role
+- checks freshness cheaply: one API request to /secure (no browser page)
+- expires entries after a TTL, even if they still look valid
+
+Install: pip install filelock pytest-xdist
+Run with: pytest 06_auth_state_cache.py -v -s -n 4
+"""
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+import pytest
+from filelock import FileLock
+from playwright.sync_api import Browser, Playwright, Page, expect
+
+
+BASE_URL = "https://the-internet.herokuapp.com"
+
+# In a real project each role has its own account
+USERS = {
+    "admin": {"username": "tomsmith", "password": "SuperSecretPassword!"},
+    "user": {"username": "tomsmith", "password": "SuperSecretPassword!"},
+}
+
+
+# ============================================
+# AUTH STATE CACHE
+# ============================================
+
+class AuthStateCache:
+    """storage_state files shared between processes, one login per role."""
+
+    def __init__(self, playwright: Playwright, browser: Browser, base_url,
+                 cache_dir=".auth_cache", ttl_seconds=30 * 60):
+        self.playwright = playwright
+        self.browser = browser
+        self.base_url = base_url
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.validated = {}  # key -> (created_at, state), checked by THIS process already
+
+        self.logins = 0
+        self.hits = 0
+
+    # ---------- keys and files ----------
+
+    @staticmethod
+    def key(role, username, password):
+        """Same role + same credentials = same cache entry."""
+        digest = hashlib.sha256(f"{username}:{password}".encode()).hexdigest()[:12]
+        return f"{role}-{digest}"
+
+    def paths(self, key):
+        return self.cache_dir / f"{key}.json", self.cache_dir / f"{key}.lock"
+
+    def expired(self, created_at):
+        return time.time() - created_at > self.ttl_seconds
+
+    def read(self, path):
+        """Return (created_at, state) if the file exists and is younger than the TTL."""
+        if not path.exists():
+            return None
+        entry = json.loads(path.read_text())
+        if self.expired(entry["created_at"]):
+            return None
+        return entry["created_at"], entry["storage_state"]
+
+    @staticmethod
+    def write(path, state):
+        """Atomic write: other workers never read a half-written file."""
+        created_at = time.time()
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps({"created_at": created_at, "storage_state": state}))
+        os.replace(tmp_path, path)
+        return created_at
+
+    # ---------- validation and login ----------
+
+    def is_valid(self, state):
+        """One HTTP request instead of a browser: does /secure let us in?"""
+        api = self.playwright.request.new_context(base_url=self.base_url, storage_state=state)
+        try:
+            response = api.get("/secure", max_redirects=0)
+            return response.status == 200
+        finally:
+            api.dispose()
+
+    def login(self, username, password):
+        """Full UI login - the slow path we want to run as rarely as possible."""
+        self.logins += 1
+        context = self.browser.new_context()
+        page = context.new_page()
+        page.goto(f"{self.base_url}/login")
+        page.locator("#username").fill(username)
+        page.locator("#password").fill(password)
+        page.locator("button[type='submit']").click()
+        page.wait_for_url("**/secure")
+        state = context.storage_state()
+        context.close()
+        return state
+
+    def get(self, role, username, password):
+        """Return a valid storage_state for this role."""
+        key = self.key(role, username, password)
+        # The TTL counts from the login, so it applies to memory hits too
+        if key in self.validated and not self.expired(self.validated[key][0]):
+            self.hits += 1
+            return self.validated[key][1]
+
+        state_path, lock_path = self.paths(key)
+        # Only one process at a time may check/refresh this role.
+        # Workers that wait here will find a fresh file when they get the lock.
+        with FileLock(str(lock_path)):
+            entry = self.read(state_path)
+            if entry is not None and self.is_valid(entry[1]):
+                self.hits += 1
+            else:
+                state = self.login(username, password)
+                entry = self.write(state_path, state), state
+
+        self.validated[key] = entry
+        return entry[1]
+
+    def invalidate(self, role, username, password):
+        """Drop an entry, e.g. after a test changed the password."""
+        key = self.key(role, username, password)
+        self.validated.pop(key, None)
+        state_path, _ = self.paths(key)
+        state_path.unlink(missing_ok=True)
+
+
+# ============================================
+# FIXTURES (put these in conftest.py)
+# ============================================
+# Every xdist worker creates its own AuthStateCache object, but they all
+# share the same cache directory and lock files.
+
+@pytest.fixture(scope="session")
+def auth_cache(playwright: Playwright, browser: Browser):
+    cache = AuthStateCache(
+        playwright, browser, BASE_URL,
+        cache_dir=os.getenv("AUTH_CACHE_DIR", ".auth_cache"),
+        ttl_seconds=int(os.getenv("AUTH_CACHE_TTL", "1800")),
+    )
+    yield cache
+    worker = os.getenv("PYTEST_XDIST_WORKER", "main")
+    print(f"\n  [auth cache:{worker}] UI logins: {cache.logins}, cache hits: {cache.hits}")
+
+
+@pytest.fixture
+def login_as(browser: Browser, auth_cache):
+    """Factory: login_as("admin") -> page that is already logged in."""
+    contexts = []
+
+    def _login_as(role):
+        credentials = USERS[role]
+        state = auth_cache.get(role, credentials["username"], credentials["password"])
+        context = browser.new_context(storage_state=state)
+        contexts.append(context)
+        return context.new_page()
+
+    yield _login_as
+
+    for context in contexts:
+        context.close()
+
+
+@pytest.fixture
+def admin_page(login_as):
+    return login_as("admin")
+
+
+@pytest.fixture
+def user_page(login_as):
+    return login_as("user")
+
+
+# ============================================
+# TESTS
+# ============================================
+
+def test_admin_has_access(admin_page: Page):
+    admin_page.goto(f"{BASE_URL}/secure")
+    expect(admin_page.locator("h2")).to_have_text(" Secure Area")
+
+
+def test_user_has_access(user_page: Page):
+    user_page.goto(f"{BASE_URL}/secure")
+    expect(user_page.locator("h2")).to_have_text(" Secure Area")
+
+
+def test_both_roles_at_once(admin_page: Page, user_page: Page):
+    admin_page.goto(f"{BASE_URL}/secure")
+    user_page.goto(f"{BASE_URL}/secure")
+    expect(admin_page.locator("a[href='/logout']")).to_be_visible()
+    expect(user_page.locator("a[href='/logout']")).to_be_visible()
+
+
+@pytest.mark.parametrize("run", range(8))
+def test_many_admin_tests(admin_page: Page, run):
+    """8 tests, spread over workers - still only one admin login in total."""
+    admin_page.goto(f"{BASE_URL}/secure")
+    assert "/secure" in admin_page.url
+
+
+def test_memory_hit_expires_with_ttl(tmp_path, monkeypatch):
+    """No browser needed: a state validated earlier is not reused past the TTL."""
+    cache = AuthStateCache(None, None, BASE_URL, cache_dir=tmp_path, ttl_seconds=60)
+    states = iter([{"cookies": ["first"]}, {"cookies": ["second"]}])
+    monkeypatch.setattr(cache, "login", lambda username, password: next(states))
+    monkeypatch.setattr(cache, "is_valid", lambda state: True)
+
+    first = cache.get("admin", "tomsmith", "secret")
+    assert cache.get("admin", "tomsmith", "secret") is first  # memory hit
+
+    later = time.time() + 61
+    monkeypatch.setattr(time, "time", lambda: later)
+    assert cache.get("admin", "tomsmith", "secret") == {"cookies": ["second"]}
+
+
+# ============================================
+# KEY POINTS:
+#
+# 1. Key cached states by role AND credentials
+# 2. A shared directory + FileLock = one login per role across workers
+# 3. Write files atomically (temp file + os.replace)
+# 4. Validate with one API request, not a browser page
+# 5. TTL forces a fresh login even if the session still looks valid -
+#    checked on every hit, in memory too
+# 6. Tests just ask for admin_page / user_page
+#
+# Run: pytest 06_auth_state_cache.py -v -s -n 4
+# ============================================
@@ -0,0 +1,346 @@
+"""Example 6: Network Telemetry with Fixed-Size Aggregates
+
+01_monitoring_requests.py, capture_all in 05_waiting_network.py and
+on_request/on_response in Lecture 35 attach a Python handler to EVERY
+request and append one dict per request. On an asset-heavy page that is
+hundreds of browser -> Python messages and hundreds of dicts per test.
+
+NetworkTelemetry keeps numbers instead of lists:
+- per (resource type, host): requests, bytes, status classes
+  (2xx/3xx/4xx/5xx/failed) and a duration histogram with fixed buckets
+- per-request detail ONLY for failures and the slowest outliers,
+  both capped - memory does not grow with the number of requests
+
+Two collection modes:
+- "events": one "response" and one "requestfailed" handler (no "request"
+  handler, nothing stored per request)
+- "bulk":   NO handlers at all. The browser already records every resource
+  in performance.getEntriesByType("resource"); we read that list in ONE
+  evaluate() before each navigation and at the end of the test.
+  Cheapest, but misses requests that never got a response (DNS errors,
+  blocked requests).
+
+Run with: pytest 06_network_telemetry.py -v -s
+Mode: TELEMETRY_MODE=bulk pytest 06_network_telemetry.py -v -s
+Benchmark: python 06_network_telemetry.py
+"""
+import heapq
+import json
+import os
+import re
+import time
+from bisect import bisect_left
+from collections import deque
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import pytest
+from playwright.sync_api import Page, sync_playwright
+
+
+BASE_URL = "https://the-internet.herokuapp.com"
+TELEMETRY_MODE = os.getenv("TELEMETRY_MODE", "events")   # "events" or "bulk"
+TELEMETRY_DIR = os.getenv("TELEMETRY_DIR", "test-results/telemetry")
+
+# Histogram bucket upper bounds in ms; the last bucket is "slower than 5s"
+DURATION_BUCKETS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+STATUS_CLASSES = ("1xx", "2xx", "3xx", "4xx", "5xx", "failed")
+
+# performance initiatorType -> Playwright resource_type
+INITIATOR_TYPES = {"img": "image", "css": "stylesheet", "link": "stylesheet",
+                   "xmlhttprequest": "xhr", "navigation": "document"}
+
+# Reads only the entries not read before, so calling it twice is cheap
+BULK_JS = """() => {
+    const entries = performance.getEntriesByType("navigation")
+        .concat(performance.getEntriesByType("resource"));
+    const start = window.__telemetryRead || 0;
+    window.__telemetryRead = entries.length;
+    return entries.slice(start).map(e => [
+        e.initiatorType, e.name, e.responseStatus || 0,
+        e.transferSize || e.encodedBodySize || 0, e.duration,
+    ]);
+}"""
+
+# Default buffer holds only 250 resources - asset-heavy pages need more
+BUFFER_JS = "performance.setResourceTimingBufferSize(2000)"
+
+
+# ============================================
+# AGGREGATES
+# ============================================
+
+class Aggregate:
+    """Counters for one (resource type, host) pair - fixed size."""
+
+    __slots__ = ("requests", "bytes", "status", "histogram", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.requests = 0
+        self.bytes = 0
+        self.status = [0] * len(STATUS_CLASSES)
+        self.histogram = [0] * (len(DURATION_BUCKETS) + 1)
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, status, size, duration_ms):
+        self.requests += 1
+        self.bytes += size
+        # status None = the request never got a response
+        self.status[5 if status is None else min(max(status // 100, 1), 5) - 1] += 1
+        if duration_ms is not None:
+            self.histogram[bisect_left(DURATION_BUCKETS, duration_ms)] += 1
+            self.total_ms += duration_ms
+            self.max_ms = max(self.max_ms, duration_ms)
+
+    def merge(self, other):
+        self.requests += other.requests
+        self.bytes += other.bytes
+        self.status = [a + b for a, b in zip(self.status, other.status)]
+        self.histogram = [a + b for a, b in zip(self.histogram, other.histogram)]
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+
+    def to_dict(self):
+        return {
+            "requests": self.requests,
+            "bytes": self.bytes,
+            "status": dict(zip(STATUS_CLASSES, self.status)),
+            "histogram_ms": dict(zip([f"<={b}" for b in DURATION_BUCKETS] + [f">{DURATION_BUCKETS[-1]}"],
+                                     self.histogram)),
+            "avg_ms": round(self.total_ms / self.requests, 1) if self.requests else 0,
+            "max_ms": round(self.max_ms, 1),
+        }
+
+
+class NetworkTelemetry:
+    def __init__(self, slow_ms=1000, max_keys=64, max_details=20):
+        self.slow_ms = slow_ms
+        self.max_keys = max_keys
+        self.aggregates = {}                         # (type, host) -> Aggregate
+        self.failures = deque(maxlen=max_details)    # the last N failures
+        self.slowest = []                            # heap of the N slowest
+        self.max_details = max_details
+        self.mode = None
+
+    # ---------- core ----------
+
+    def add(self, resource_type, url, status, size, duration_ms, method="GET", error=None):
+        key = (resource_type, urlsplit(url).hostname or "-")
+        aggregate = self.aggregates.get(key)
+        if aggregate is None:
+            # Pages with ad/CDN hosts could make this grow - cap the keys
+            if len(self.aggregates) >= self.max_keys:
+                key = ("other", "other")
+            aggregate = self.aggregates.setdefault(key, Aggregate())
+        aggregate.add(status, size, duration_ms)
+
+        # Detail only for what someone will actually look at
+        if status is None or status >= 400:
+            self.failures.append({"url": url, "method": method, "type": resource_type,
+                                  "status": status, "error": error})
+        if duration_ms is not None and duration_ms >= self.slow_ms:
+            item = (duration_ms, url, resource_type)
+            if len(self.slowest) < self.max_details:
+                heapq.heappush(self.slowest, item)
+            elif item > self.slowest[0]:
+                heapq.heapreplace(self.slowest, item)
+
+    # ---------- "events" mode ----------
+
+    def attach(self, page: Page):
+        """Two handlers; nothing is stored per request."""
+        self.mode = "events"
+
+        def on_response(response):
+            # request.timing is already here - no extra round trip.
+            # At "response" time only responseStart is known: time to first byte.
+            timing = response.request.timing
+            duration = timing["responseStart"] if timing["responseStart"] >= 0 else None
+            size = response.headers.get("content-length")  # missing when chunked
+            self.add(response.request.resource_type, response.url, response.status,
+                     int(size) if size and size.isdigit() else 0, duration,
+                     response.request.method)
+
+        def on_request_failed(request):
+            self.add(request.resource_type, request.url, None, 0, None,
+                     request.method, request.failure)
+
+        page.on("response", on_response)
+        page.on("requestfailed", on_request_failed)
+
+    # ---------- "bulk" mode ----------
+
+    def prepare(self, page: Page):
+        self.mode = "bulk"
+        page.context.add_init_script(BUFFER_JS)
+
+    def collect(self, page: Page):
+        """Read all new resource timing entries of the current document at once."""
+        if page.is_closed() or page.url == "about:blank":
+            return
+        for initiator, url, status, size, duration in page.evaluate(BULK_JS):
+            # responseStatus 0 = unknown (older browsers, cross-origin without CORS)
+            self.add(INITIATOR_TYPES.get(initiator, initiator), url,
+                     status or 200, size, duration)
+
+    # ---------- results ----------
+
+    def totals(self):
+        total = Aggregate()
+        for aggregate in self.aggregates.values():
+            total.merge(aggregate)
+        return total
+
+    def to_dict(self):
+        return {
+            "mode": self.mode,
+            "total": self.totals().to_dict(),
+            "by_type_host": {f"{t} {h}": a.to_dict() for (t, h), a in sorted(self.aggregates.items())},
+            "failures": list(self.failures),
+            "slowest": [{"url": u, "type": t, "duration_ms": round(d, 1)}
+                        for d, u, t in sorted(self.slowest, reverse=True)],
+        }
+
+    def export(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2))
+        return path
+
+    def report(self):
+        total = self.totals()
+        print(f"  [network] {total.requests} requests, {total.bytes / 1024:.0f}KB, "
+              + ", ".join(f"{c} {n}" for c, n in zip(STATUS_CLASSES, total.status) if n))
+        for (resource_type, host), a in sorted(self.aggregates.items(), key=lambda kv: -kv[1].requests):
+            print(f"  [network]   {resource_type:<10} {host:<35} {a.requests:>4} req "
+                  f"{a.bytes / 1024:>7.0f}KB  max {a.max_ms:.0f}ms")
+        for failure in self.failures:
+            print(f"  [network] FAILED {failure['status'] or failure['error']} {failure['url']}")
+        for duration, url, _ in sorted(self.slowest, reverse=True):
+            print(f"  [network] SLOW {duration:.0f}ms {url}")
+
+
+# ============================================
+# FIXTURE (put this in conftest.py)
+# ============================================
+
+@pytest.fixture
+def network_telemetry(page: Page, request):
+    """Telemetry for one test, exported to TELEMETRY_DIR/<test>.json."""
+    telemetry = NetworkTelemetry(slow_ms=float(os.getenv("TELEMETRY_SLOW_MS", "1000")))
+    if TELEMETRY_MODE == "bulk":
+        telemetry.prepare(page)
+        original_goto = page.goto
+
+        def goto(url, **kwargs):
+            telemetry.collect(page)  # the old document's entries are gone after navigating
+            return original_goto(url, **kwargs)
+
+        page.goto = goto
+    else:
+        telemetry.attach(page)
+
+    yield telemetry
+
+    if TELEMETRY_MODE == "bulk":
+        telemetry.collect(page)
+    name = re.sub(r"[^\w.-]+", "_", request.node.name)
+    path = telemetry.export(os.path.join(TELEMETRY_DIR, f"{name}.json"))
+    print(f"\n  [network] {request.node.name} -> {path}")
+    telemetry.report()
+
+
+# ============================================
+# TESTS
+# ============================================
+
+def test_home_page_traffic(page: Page, network_telemetry):
+    page.goto(f"{BASE_URL}/")
+    page.goto(f"{BASE_URL}/dynamic_loading/1")
+    page.locator("#start button").click()
+    page.locator("#finish").wait_for()
+
+    if TELEMETRY_MODE == "events":  # bulk data is read at teardown
+        total = network_telemetry.totals()
+        assert total.requests > 0
+        assert total.status[STATUS_CLASSES.index("5xx")] == 0
+
+
+def test_missing_page_is_a_failure(page: Page, network_telemetry):
+    page.goto(f"{BASE_URL}/status_codes/404")
+    if TELEMETRY_MODE == "bulk":
+        network_telemetry.collect(page)
+    assert any(f["status"] == 404 for f in network_telemetry.failures)
+
+
+def test_memory_stays_fixed():
+    """No browser needed: 100k requests, the telemetry stays the same size."""
+    telemetry = NetworkTelemetry(slow_ms=500, max_details=10)
+    for i in range(100_000):
+        telemetry.add("image", f"https://cdn{i % 5}.example.com/{i}.png",
+                      404 if i % 1000 == 0 else 200, 2048, i % 700)
+
+    assert telemetry.totals().requests == 100_000
+    assert len(telemetry.aggregates) == 5
+    assert len(telemetry.failures) == 10
+    assert len(telemetry.slowest) == 10
+    assert telemetry.totals().status[STATUS_CLASSES.index("4xx")] == 100
+
+
+# ============================================
+# DEMO: DICT PER REQUEST vs EVENTS vs BULK
+# ============================================
+
+if __name__ == "__main__":
+    runs = int(os.getenv("BENCHMARK_RUNS", "10"))
+    pages = [f"{BASE_URL}/", f"{BASE_URL}/dynamic_loading/2", f"{BASE_URL}/tables"]
+
+    with sync_playwright() as p:
+        print("=== Network Telemetry Demo ===\n")
+        browser = p.chromium.launch()
+
+        def measure(mode):
+            context = browser.new_context()
+            page = context.new_page()
+            telemetry = NetworkTelemetry()
+            log = []
+            if mode == "dict per request":
+                page.on("request", lambda r: log.append({"url": r.url, "method": r.method,
+                                                         "type": r.resource_type}))
+                page.on("response", lambda r: log.append({"url": r.url, "status": r.status}))
+            elif mode == "events":
+                telemetry.attach(page)
+            else:
+                telemetry.prepare(page)
+
+            start = time.perf_counter()
+            for _ in range(runs):
+                for url in pages:
+                    if mode == "bulk":
+                        telemetry.collect(page)
+                    page.goto(url)
+            if mode == "bulk":
+                telemetry.collect(page)
+            elapsed = time.perf_counter() - start
+            context.close()
+            count = len(log) if log else telemetry.totals().requests
+            return elapsed, count, telemetry
+
+        for mode in ("dict per request", "events", "bulk"):
+            elapsed, count, telemetry = measure(mode)
+            print(f"{mode:<17} {elapsed:6.2f}s  {count} records/requests")
+        print()
+        telemetry.report()
+        browser.close()
+
+
+# ============================================
+# KEY POINTS:
+#
+# 1. Aggregate on arrival: counters + fixed histogram per type and host
+# 2. Keep details only for failures and the slowest requests (capped)
+# 3. Fewer handlers = fewer browser -> Python messages
+# 4. Bulk mode: read performance entries once per document, no handlers
+# 5. Export one JSON per test for dashboards and comparisons
+# ============================================
@@ -0,0 +1,589 @@
+"""Example 6: Local JSONPlaceholder-compatible API Server
+
+Demonstrates how to replace https://jsonplaceholder.typicode.com with a
+local REST server that REALLY stores data.
+
+Why?
+- JSONPlaceholder accepts writes but never persists them
+  (POST returns id 101, GET /posts/101 is still 404)
+- It can't be reached from offline CI runners
+- A local server answers at loopback speed, so we can load-test helpers
+
+Routes (same as JSONPlaceholder):
+    GET/POST           /posts, /comments, /users, /todos
+    GET/PUT/PATCH/DEL  /posts/{id}, /comments/{id}, /users/{id}, /todos/{id}
+    GET                /posts/{id}/comments, /users/{id}/posts, /users/{id}/todos
+    Query params:      any field filter (?userId=1), _limit, _start, _sort, _order
+    Bad input (invalid JSON, _limit=abc, ...) -> 400 {"error": "..."}
+
+Run with: pytest 06_local_api_server.py -v -s
+Or start it by hand: python 06_local_api_server.py
+"""
+import functools
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+from playwright.sync_api import Playwright, APIRequestContext
+
+
+# ============================================
+# IN-MEMORY DATA STORE
+# ============================================
+# One dict per resource: {id: record}. A single lock keeps writes safe
+# when many requests arrive at the same time.
+
+RESOURCES = ["posts", "comments", "users", "todos"]
+
+# Nested routes: /posts/1/comments -> comments where postId == 1
+NESTED = {
+    ("posts", "comments"): "postId",
+    ("users", "posts"): "userId",
+    ("users", "todos"): "userId",
+}
+
+
+def seed_data():
+    """Generate the same shape of data JSONPlaceholder has.
+
+    10 users, 100 posts (10 per user), 500 comments (5 per post),
+    200 todos (20 per user). Values are deterministic.
+    """
+    data = {name: {} for name in RESOURCES}
+    for user_id in range(1, 11):
+        data["users"][user_id] = {
+            "id": user_id,
+            "name": f"User {user_id}",
+            "username": f"user{user_id}",
+            "email": f"user{user_id}@example.com",
+        }
+    for post_id in range(1, 101):
+        data["posts"][post_id] = {
+            "userId": (post_id - 1) // 10 + 1,
+            "id": post_id,
+            "title": f"post title {post_id}",
+            "body": f"post body {post_id}",
+        }
+    for comment_id in range(1, 501):
+        data["comments"][comment_id] = {
+            "postId": (comment_id - 1) // 5 + 1,
+            "id": comment_id,
+            "name": f"comment {comment_id}",
+            "email": f"commenter{comment_id}@example.com",
+            "body": f"comment body {comment_id}",
+        }
+    for todo_id in range(1, 201):
+        data["todos"][todo_id] = {
+            "userId": (todo_id - 1) // 20 + 1,
+            "id": todo_id,
+            "title": f"todo {todo_id}",
+            "completed": todo_id % 2 == 0,
+        }
+    return data
+
+
+class DataStore:
+    """Thread-safe in-memory store with optional JSON snapshots on disk."""
+
+    def __init__(self, snapshot_path=None):
+        self.lock = threading.Lock()
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else None
+        if self.snapshot_path and self.snapshot_path.exists():
+            self.data = self.load_snapshot(self.snapshot_path)
+        else:
+            self.data = seed_data()
+        self.next_ids = {name: max(records, default=0) + 1 for name, records in self.data.items()}
+
+    # ---------- snapshots ----------
+
+    @staticmethod
+    def load_snapshot(path):
+        """Read a snapshot (JSON keys are strings, ids are ints)."""
+        raw = json.loads(Path(path).read_text())
+        return {
+            name: {int(record_id): record for record_id, record in raw.get(name, {}).items()}
+            for name in RESOURCES
+        }
+
+    def save_snapshot(self, path=None):
+        """Write all data to disk atomically (temp file + rename)."""
+        path = Path(path or self.snapshot_path)
+        with self.lock:
+            content = json.dumps(self.data)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_text(content)
+        os.replace(tmp_path, path)
+        return path
+
+    def reset(self):
+        """Go back to seed data (useful between test modules)."""
+        with self.lock:
+            self.data = seed_data()
+            self.next_ids = {name: max(records) + 1 for name, records in self.data.items()}
+
+    # ---------- CRUD ----------
+
+    def list(self, resource, filters=None):
+        with self.lock:
+            records = list(self.data[resource].values())
+        for field, value in (filters or {}).items():
+            records = [r for r in records if str(r.get(field)).lower() == value.lower()]
+        return records
+
+    def get(self, resource, record_id):
+        with self.lock:
+            return self.data[resource].get(record_id)
+
+    def create(self, resource, payload):
+        with self.lock:
+            record_id = self.next_ids[resource]
+            self.next_ids[resource] += 1
+            record = {**payload, "id": record_id}
+            self.data[resource][record_id] = record
+            return record
+
+    def replace(self, resource, record_id, payload):
+        with self.lock:
+            if record_id not in self.data[resource]:
+                return None
+            record = {**payload, "id": record_id}
+            self.data[resource][record_id] = record
+            return record
+
+    def update(self, resource, record_id, payload):
+        with self.lock:
+            record = self.data[resource].get(record_id)
+            if record is None:
+                return None
+            record.update({k: v for k, v in payload.items() if k != "id"})
+            return dict(record)
+
+    def delete(self, resource, record_id):
+        with self.lock:
+            return self.data[resource].pop(record_id, None) is not None
+
+
+class BadRequest(ValueError):
+    """Invalid input from the client - answered with 400, not a crash."""
+
+
+def query_int(query, name, default=None):
+    value = query.get(name)
+    if value is None:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise BadRequest(f"{name} must be an integer, got {value!r}") from None
+    if number < 0:
+        raise BadRequest(f"{name} must not be negative, got {number}")
+    return number
+
+
+def apply_query(records, query):
+    """Apply JSONPlaceholder's _sort/_order/_start/_limit params."""
+    if "_sort" in query:
+        field = query["_sort"]
+        reverse = query.get("_order", "asc") == "desc"
+        # Records may lack the field (POST without "title"): they sort after
+        # every value (first with _order=desc); numbers sort as numbers,
+        # anything else as text
+        def key(record):
+            value = record.get(field)
+            if value is None:
+                return (2, 0, "")
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                return (0, value, "")
+            return (1, 0, str(value))
+        records = sorted(records, key=key, reverse=reverse)
+    start = query_int(query, "_start", 0)
+    limit = query_int(query, "_limit")
+    if limit is not None:
+        return records[start:start + limit]
+    return records[start:]
+
+
+def answers_bad_request(route):
+    """Decorator for do_* methods: BadRequest -> 400 with a JSON error body."""
+    @functools.wraps(route)
+    def wrapper(self):
+        try:
+            route(self)
+        except BadRequest as error:
+            self.send_json({"error": str(error)}, status=400)
+    return wrapper
+
+
+# ============================================
+# REQUEST HANDLER
+# ============================================
+
+class JSONPlaceholderHandler(BaseHTTPRequestHandler):
+    """REST routes on top of DataStore.
+
+    HTTP/1.1 keeps connections alive, so a client can reuse one socket
+    for many requests instead of reconnecting every time.
+    """
+
+    protocol_version = "HTTP/1.1"
+    store = None  # set by LocalApiServer
+
+    def log_message(self, format, *args):
+        """Silence per-request logging."""
+
+    # ---------- helpers ----------
+
+    def send_json(self, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_body(self):
+        """Accept both JSON and form-encoded bodies (a JSON object only)."""
+        try:
+            length = int(self.headers.get("Content-Length", "0"))
+        except ValueError:
+            raise BadRequest("Content-Length must be an integer") from None
+        raw = self.rfile.read(length) if length > 0 else b""
+        if not raw:
+            return {}
+        try:
+            text = raw.decode("utf-8")
+            if "application/x-www-form-urlencoded" in self.headers.get("Content-Type", ""):
+                return {k: v[0] for k, v in parse_qs(text).items()}
+            payload = json.loads(text)
+        except ValueError as error:  # UnicodeDecodeError and JSONDecodeError too
+            raise BadRequest(f"invalid request body: {error}") from None
+        if not isinstance(payload, dict):
+            raise BadRequest("request body must be a JSON object")
+        return payload
+
+    def parse_route(self):
+        """Return (parts, query) for '/posts/1/comments?_limit=2'."""
+        url = urlsplit(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        return parts, query
+
+    def resolve_item(self, parts):
+        """Return (resource, id) for '/posts/1', or (None, None)."""
+        if len(parts) == 2 and parts[0] in RESOURCES and parts[1].isdigit():
+            return parts[0], int(parts[1])
+        return None, None
+
+    # ---------- routes ----------
+
+    @answers_bad_request
+    def do_GET(self):
+        parts, query = self.parse_route()
+        filters = {k: v for k, v in query.items() if not k.startswith("_")}
+
+        if len(parts) == 1 and parts[0] in RESOURCES:
+            records = self.store.list(parts[0], filters)
+            self.send_json(apply_query(records, query))
+            return
+
+        if len(parts) == 3 and (parts[0], parts[2]) in NESTED and parts[1].isdigit():
+            filters[NESTED[(parts[0], parts[2])]] = parts[1]
+            records = self.store.list(parts[2], filters)
+            self.send_json(apply_query(records, query))
+            return
+
+        resource, record_id = self.resolve_item(parts)
+        record = self.store.get(resource, record_id) if resource else None
+        if record is None:
+            self.send_json({}, status=404)
+        else:
+            self.send_json(record)
+
+    @answers_bad_request
+    def do_POST(self):
+        parts, _ = self.parse_route()
+        payload = self.read_body()
+        if len(parts) == 1 and parts[0] in RESOURCES:
+            self.send_json(self.store.create(parts[0], payload), status=201)
+        else:
+            self.send_json({}, status=404)
+
+    @answers_bad_request
+    def do_PUT(self):
+        self.write_item(self.store.replace)
+
+    @answers_bad_request
+    def do_PATCH(self):
+        self.write_item(self.store.update)
+
+    def write_item(self, method):
+        parts, _ = self.parse_route()
+        payload = self.read_body()
+        resource, record_id = self.resolve_item(parts)
+        record = method(resource, record_id, payload) if resource else None
+        if record is None:
+            self.send_json({}, status=404)
+        else:
+            self.send_json(record)
+
+    def do_DELETE(self):
+        parts, _ = self.parse_route()
+        resource, record_id = self.resolve_item(parts)
+        if resource and self.store.delete(resource, record_id):
+            self.send_json({})
+        else:
+            self.send_json({}, status=404)
+
+
+# ============================================
+# SERVER LIFECYCLE
+# ============================================
+
+class ApiHTTPServer(ThreadingHTTPServer):
+    """Thread-per-connection server with a deep accept backlog.
+
+    The default backlog (5) drops connections when thousands of clients
+    connect at once; 1024 lets a load test queue up instead of failing.
+    """
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+class LocalApiServer:
+    """Runs the API on a free localhost port in a background thread."""
+
+    def __init__(self, snapshot_path=None, host="127.0.0.1", port=0):
+        self.store = DataStore(snapshot_path)
+        handler = type("ConfiguredHandler", (JSONPlaceholderHandler,), {"store": self.store})
+        self.httpd = ApiHTTPServer((host, port), handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.thread.join(timeout=5)
+        # Keep data between runs if a snapshot file was configured
+        if self.store.snapshot_path:
+            self.store.save_snapshot()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+# ============================================
+# PYTEST FIXTURES (put these in conftest.py)
+# ============================================
+# Set API_SNAPSHOT=api_data.json to keep data between runs.
+
+@pytest.fixture(scope="session")
+def api_server():
+    """Start the local API ONCE for the whole test session."""
+    with LocalApiServer(snapshot_path=os.getenv("API_SNAPSHOT")) as server:
+        print(f"\n  [local api] {server.url}")
+        yield server
+
+
+@pytest.fixture(scope="session")
+def api(playwright: Playwright, api_server):
+    """Playwright APIRequestContext pointed at the local server."""
+    context = playwright.request.new_context(base_url=api_server.url)
+    yield context
+    context.dispose()
+
+
+# ============================================
+# TESTS: CRUD WITH REAL STATE CHANGES
+# ============================================
+
+def test_read_with_filters(api: APIRequestContext):
+    response = api.get("/posts", params={"userId": 1, "_limit": 3})
+    assert response.ok
+    posts = response.json()
+    assert len(posts) == 3
+    assert all(post["userId"] == 1 for post in posts)
+
+
+def test_nested_routes(api: APIRequestContext):
+    assert len(api.get("/posts/1/comments").json()) == 5
+    assert len(api.get("/users/1/posts").json()) == 10
+
+
+def test_create_is_persisted(api: APIRequestContext):
+    """Unlike JSONPlaceholder, the created post can be read back."""
+    created = api.post("/posts", data={"title": "My Test Post", "body": "...", "userId": 1})
+    assert created.status == 201
+    post_id = created.json()["id"]
+
+    fetched = api.get(f"/posts/{post_id}")
+    assert fetched.ok
+    assert fetched.json()["title"] == "My Test Post"
+
+
+def test_put_and_patch(api: APIRequestContext):
+    post_id = api.post("/posts", data={"title": "Original", "body": "b", "userId": 2}).json()["id"]
+
+    api.put(f"/posts/{post_id}", data={"title": "Replaced", "body": "new", "userId": 2})
+    api.patch(f"/posts/{post_id}", data={"title": "Patched"})
+
+    post = api.get(f"/posts/{post_id}").json()
+    assert post["title"] == "Patched"
+    assert post["body"] == "new"
+
+
+def test_delete_really_deletes(api: APIRequestContext):
+    post_id = api.post("/posts", data={"title": "Temp", "userId": 1}).json()["id"]
+
+    assert api.delete(f"/posts/{post_id}").ok
+    assert api.get(f"/posts/{post_id}").status == 404
+
+
+def test_cleanup_flow(api: APIRequestContext):
+    """Scenario 3 from 05_ui_api_combined.py, now verifiable."""
+    test_ids = [
+        api.post("/posts", data={"title": f"Test Post {i}", "userId": 1}).json()["id"]
+        for i in range(3)
+    ]
+    for post_id in test_ids:
+        api.delete(f"/posts/{post_id}")
+
+    remaining = [p["id"] for p in api.get("/posts", params={"userId": 1}).json()]
+    assert not set(test_ids) & set(remaining)
+
+
+def test_bad_input_gets_400(api_server):
+    """The handler answers 400 with a JSON error - and keeps serving."""
+    connection = HTTPConnection(api_server.url.replace("http://", ""), timeout=10)
+
+    def call(method, path, body=None):
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        connection.request(method, path, body=body, headers=headers)
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+
+    status, payload = call("GET", "/posts?_limit=abc")
+    assert status == 400 and "_limit" in payload["error"]
+    status, payload = call("POST", "/posts", body="{not json")
+    assert status == 400 and "invalid request body" in payload["error"]
+    assert call("PATCH", "/posts/1", body="[1, 2]")[0] == 400
+
+    connection.putrequest("POST", "/posts")
+    connection.putheader("Content-Length", "abc")
+    connection.endheaders()
+    response = connection.getresponse()
+    assert response.status == 400 and "Content-Length" in json.loads(response.read())["error"]
+
+    assert call("GET", "/posts/1")[0] == 200  # same keep-alive connection still works
+    connection.close()
+
+
+def test_sort_with_missing_field(api_server):
+    """A record without the sort field (POST without "title") sorts last, not a 400."""
+    connection = HTTPConnection(api_server.url.replace("http://", ""), timeout=10)
+    connection.request("POST", "/posts", body=json.dumps({"userId": 1}),
+                       headers={"Content-Type": "application/json"})
+    untitled = json.loads(connection.getresponse().read())
+
+    connection.request("GET", "/posts?_sort=title")
+    response = connection.getresponse()
+    posts = json.loads(response.read())
+    assert response.status == 200
+    assert posts[-1]["id"] == untitled["id"]
+    assert posts[0]["title"] == "post title 1"
+
+    connection.request("GET", "/posts?_sort=id&_order=desc&_limit=2")
+    assert [p["id"] for p in json.loads(connection.getresponse().read())] == [untitled["id"], 100]
+
+    connection.request("DELETE", f"/posts/{untitled['id']}")
+    connection.getresponse().read()
+    connection.close()
+
+
+# ============================================
+# LOAD TEST: THOUSANDS OF CONCURRENT REQUESTS
+# ============================================
+# Playwright's sync API is not thread-safe, so the load test uses
+# http.client directly - one keep-alive connection per worker thread.
+
+def hammer(base_url, requests_per_worker):
+    """Send GET /posts/N requests over one keep-alive connection."""
+    host_port = base_url.replace("http://", "")
+    connection = HTTPConnection(host_port, timeout=10)
+    errors = 0
+    for i in range(requests_per_worker):
+        connection.request("GET", f"/posts/{i % 100 + 1}")
+        response = connection.getresponse()
+        response.read()
+        if response.status != 200:
+            errors += 1
+    connection.close()
+    return errors
+
+
+def test_concurrent_load(api_server):
+    workers, per_worker = 50, 40  # 2000 requests total
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        errors = sum(pool.map(hammer, [api_server.url] * workers, [per_worker] * workers))
+    elapsed = time.perf_counter() - start
+
+    total = workers * per_worker
+    print(f"\n  {total} requests in {elapsed:.2f}s ({total / elapsed:.0f} req/s)")
+    assert errors == 0
+
+
+def test_snapshot_round_trip(tmp_path):
+    """Data written before a restart is still there afterwards."""
+    snapshot = tmp_path / "api_data.json"
+
+    store = DataStore(snapshot)
+    post = store.create("posts", {"title": "Survives restart", "userId": 1})
+    store.save_snapshot()
+
+    reloaded = DataStore(snapshot)
+    assert reloaded.get("posts", post["id"])["title"] == "Survives restart"
+
+
+# ============================================
+# KEY POINTS:
+#
+# 1. Same routes as JSONPlaceholder, but writes persist
+# 2. DataStore + one lock = safe concurrent writes
+# 3. Snapshots use temp file + os.replace (never half-written)
+# 4. HTTP/1.1 keep-alive + deep backlog for load tests
+# 5. Session fixture: one server for the whole run
+# 6. Verify real state: create -> read -> delete -> 404
+# 7. Bad client input is a 400 with a JSON error, never a crashed handler
+#
+# Run: pytest 06_local_api_server.py -v -s
+# ============================================
+
+
+if __name__ == "__main__":
+    port = int(os.getenv("PORT", "3000"))
+    with LocalApiServer(snapshot_path=os.getenv("API_SNAPSHOT"), port=port) as server:
+        print(f"Serving JSONPlaceholder stand-in on {server.url} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,294 @@
+"""Example 7: Concurrent Async API Client for Bulk Setup and Teardown
+
+Scenario 3 in 05_ui_api_combined.py creates and deletes test posts in a
+`for` loop: one request, wait for the answer, next request. Seeding 300
+records costs 300 round trips in a row.
+
+This client sends the whole batch at once:
+- built on Playwright's ASYNC APIRequestContext, running on an event loop
+  in a background thread - so normal sync tests and fixtures can use it
+- a small pool of request contexts (each has its own connections)
+- create_many / delete_many with at most `concurrency` requests in flight
+- retries idempotent verbs (GET, PUT, DELETE, ...) on network errors and
+  429/5xx - never POST, which could create the same record twice
+- remembers everything it created; a fixture finalizer deletes it
+- reports requests/sec
+
+Run with: pytest 07_async_api_client.py -v -s
+Against the local server (python 06_local_api_server.py):
+    API_BASE_URL=http://127.0.0.1:3000 pytest 07_async_api_client.py -v -s
+"""
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+from playwright.async_api import async_playwright, Error as PlaywrightError
+from playwright.sync_api import Playwright
+
+
+BASE_URL = os.getenv("API_BASE_URL", "https://jsonplaceholder.typicode.com")
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+# ============================================
+# ASYNC CLIENT
+# ============================================
+
+class AsyncApiClient:
+    """Bounded-concurrency requests over a pool of APIRequestContexts."""
+
+    def __init__(self, playwright, base_url, pool_size=4, concurrency=20,
+                 retries=2, backoff=0.2):
+        self.playwright = playwright
+        self.base_url = base_url
+        self.pool_size = pool_size
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+
+        self.contexts = []
+        self.semaphore = None  # created inside the event loop in start()
+        self.created = []      # (path, id) of everything create_many made
+
+        # Statistics
+        self.requests = 0
+        self.retried = 0
+        self.failed = 0
+        self.batch_time = 0.0
+
+    async def start(self):
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        for _ in range(self.pool_size):
+            self.contexts.append(await self.playwright.request.new_context(base_url=self.base_url))
+        return self
+
+    async def close(self):
+        for context in self.contexts:
+            await context.dispose()
+        self.contexts = []
+
+    # ---------- single request with retries ----------
+
+    async def request(self, method, path, **kwargs):
+        method = method.upper()
+        attempts = 1 + (self.retries if method in IDEMPOTENT_METHODS else 0)
+
+        async with self.semaphore:
+            # Round-robin over the pool
+            context = self.contexts[self.requests % len(self.contexts)]
+            self.requests += 1
+
+            for attempt in range(attempts):
+                last_attempt = attempt == attempts - 1
+                try:
+                    response = await context.fetch(path, method=method, **kwargs)
+                except PlaywrightError:
+                    if last_attempt:
+                        self.failed += 1
+                        raise
+                else:
+                    if response.status not in RETRY_STATUSES or last_attempt:
+                        if not response.ok:
+                            self.failed += 1
+                        return response
+                self.retried += 1
+                await asyncio.sleep(self.backoff * 2 ** attempt)
+
+    async def gather(self, requests):
+        """Run (method, path, kwargs) tuples concurrently, keep their order."""
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(self.request(method, path, **kwargs) for method, path, kwargs in requests),
+            return_exceptions=True,
+        )
+        self.batch_time += time.perf_counter() - start
+        return results
+
+    # ---------- bulk helpers ----------
+
+    async def create_many(self, path, payloads):
+        """POST every payload; return the created records in the same order."""
+        responses = await self.gather([("POST", path, {"data": p}) for p in payloads])
+
+        records, errors = [], []
+        for response in responses:
+            if isinstance(response, Exception):
+                errors.append(str(response))
+            elif not response.ok:
+                errors.append(f"{response.status} {response.url}")
+            else:
+                record = await response.json()
+                self.created.append((path, record["id"]))
+                records.append(record)
+
+        # Raise only after recording what DID get created, so cleanup finds it
+        if errors:
+            raise RuntimeError(f"create_many {path}: {len(errors)}/{len(payloads)} failed "
+                               f"(first: {errors[0]})")
+        return records
+
+    async def delete_many(self, path, ids):
+        """DELETE path/<id> for every id. 404 counts as already deleted."""
+        ids = list(ids)
+        responses = await self.gather([("DELETE", f"{path}/{i}", {}) for i in ids])
+
+        errors = []
+        for record_id, response in zip(ids, responses):
+            if isinstance(response, Exception):
+                errors.append(str(response))
+            elif response.ok or response.status == 404:
+                if (path, record_id) in self.created:
+                    self.created.remove((path, record_id))
+            else:
+                errors.append(f"{response.status} {response.url}")
+
+        if errors:
+            raise RuntimeError(f"delete_many {path}: {len(errors)}/{len(ids)} failed "
+                               f"(first: {errors[0]})")
+        return len(ids) - len(errors)
+
+    async def cleanup(self):
+        """Delete everything create_many made, newest resources first."""
+        by_path = {}
+        for path, record_id in reversed(self.created):
+            by_path.setdefault(path, []).append(record_id)
+        for path, ids in by_path.items():
+            await self.delete_many(path, ids)
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "retried": self.retried,
+            "failed": self.failed,
+            "seconds": self.batch_time,
+            "requests_per_sec": self.requests / self.batch_time if self.batch_time else 0.0,
+        }
+
+
+# ============================================
+# SYNC FRONT END
+# ============================================
+# The async client lives on its own event loop in a background thread.
+# Tests call plain methods and get plain results back.
+
+class BulkApi:
+    def __init__(self, base_url=BASE_URL, **client_args):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+        self.playwright = self.run(async_playwright().start())
+        self.client = self.run(AsyncApiClient(self.playwright, base_url, **client_args).start())
+
+    def run(self, coroutine):
+        """Run a coroutine on the background loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def create_many(self, path, payloads):
+        return self.run(self.client.create_many(path, payloads))
+
+    def delete_many(self, path, ids):
+        return self.run(self.client.delete_many(path, ids))
+
+    def cleanup(self):
+        self.run(self.client.cleanup())
+
+    def stats(self):
+        return self.client.stats()
+
+    def close(self):
+        self.run(self.client.close())
+        self.run(self.playwright.stop())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+# ============================================
+# FIXTURES (put these in conftest.py)
+# ============================================
+
+@pytest.fixture(scope="session")
+def bulk_api():
+    """One client (and one background loop) for the whole session."""
+    api = BulkApi(
+        BASE_URL,
+        pool_size=int(os.getenv("API_POOL_SIZE", "4")),
+        concurrency=int(os.getenv("API_CONCURRENCY", "20")),
+    )
+    yield api
+
+    s = api.stats()
+    print(f"\n  [bulk api] {s['requests']} requests in {s['seconds']:.2f}s "
+          f"({s['requests_per_sec']:.0f} req/s), {s['retried']} retried, {s['failed']} failed")
+    api.close()
+
+
+@pytest.fixture
+def api_data(request, bulk_api):
+    """Everything a test creates through bulk_api is deleted afterwards,
+    even if the test (or the setup itself) fails."""
+    request.addfinalizer(bulk_api.cleanup)
+    return bulk_api
+
+
+@pytest.fixture
+def seeded_posts(api_data):
+    """100 posts, created in one concurrent batch."""
+    return api_data.create_many("/posts", [
+        {"title": f"Seeded Post {i}", "body": "Will be cleaned up", "userId": 1}
+        for i in range(100)
+    ])
+
+
+# ============================================
+# TESTS
+# ============================================
+
+def test_seeded_posts(seeded_posts):
+    assert len(seeded_posts) == 100
+    assert all("id" in post for post in seeded_posts)
+
+
+def test_sequential_vs_bulk(playwright: Playwright, api_data):
+    """Scenario 3 from 05_ui_api_combined.py, both ways."""
+    count = 30
+    payloads = [{"title": f"Test Post {i}", "body": "...", "userId": 1} for i in range(count)]
+
+    # The for-loop version
+    api = playwright.request.new_context(base_url=BASE_URL)
+    start = time.perf_counter()
+    ids = [api.post("/posts", data=payload).json()["id"] for payload in payloads]
+    for post_id in ids:
+        api.delete(f"/posts/{post_id}")
+    sequential = time.perf_counter() - start
+    api.dispose()
+
+    # The batch version
+    start = time.perf_counter()
+    posts = api_data.create_many("/posts", payloads)
+    api_data.delete_many("/posts", [post["id"] for post in posts])
+    bulk = time.perf_counter() - start
+
+    print(f"\n  {count} creates + {count} deletes:")
+    print(f"    sequential: {sequential:.2f}s")
+    print(f"    bulk:       {bulk:.2f}s ({sequential / bulk:.1f}x faster)")
+    assert len(posts) == count
+
+
+# ============================================
+# KEY POINTS:
+#
+# 1. Sequential setup = one round trip per record
+# 2. asyncio.gather + Semaphore = a whole batch, bounded concurrency
+# 3. Retry only idempotent verbs - a retried POST can duplicate data
+# 4. Track what was created BEFORE raising, so cleanup still works
+# 5. A fixture finalizer runs cleanup even when the test fails
+# 6. Sync tests can use async code through a background event loop
+#
+# Run: pytest 07_async_api_client.py -v -s
+# ============================================
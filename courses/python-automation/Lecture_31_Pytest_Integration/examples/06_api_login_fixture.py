@@ -0,0 +1,149 @@
+"""Example 6: Logging In via API Instead of the Login Form
+
+The logged_in_page fixture in 02_pytest_fixtures.py fills #username and
+#password and clicks Login before EVERY test: load /login, type, submit,
+wait for the redirect. That is the slowest part of most tests.
+
+The form just POSTs to /authenticate and gets a session cookie back.
+We can do that POST with Playwright's API client (no page rendering),
+copy the cookie into the browser context with add_cookies(), and open
+/secure directly.
+
+If the API path fails for any reason, the fixture falls back to the
+normal UI login, so tests never break because of the shortcut.
+
+Run with: pytest 06_api_login_fixture.py -v -s
+Benchmark: RUN_BENCHMARK=1 pytest 06_api_login_fixture.py -k benchmark -s
+"""
+import os
+import time
+
+import pytest
+from playwright.sync_api import Browser, BrowserContext, Page, Playwright, expect
+
+
+BASE_URL = "https://the-internet.herokuapp.com"
+USERNAME = "tomsmith"
+PASSWORD = "SuperSecretPassword!"
+
+
+# ============================================
+# TWO WAYS TO LOG IN
+# ============================================
+
+def ui_login(page: Page, username=USERNAME, password=PASSWORD):
+    """The classic way (same steps as logged_in_page)."""
+    page.goto(f"{BASE_URL}/login")
+    page.locator("#username").fill(username)
+    page.locator("#password").fill(password)
+    page.locator("button[type='submit']").click()
+    page.wait_for_url("**/secure")
+
+
+def api_login_cookies(playwright: Playwright, username=USERNAME, password=PASSWORD):
+    """POST the login form with the API client and return session cookies."""
+    api = playwright.request.new_context(base_url=BASE_URL)
+    try:
+        # form= sends application/x-www-form-urlencoded, like the HTML form
+        response = api.post("/authenticate", form={"username": username, "password": password})
+        # The server redirects to /secure on success, back to /login on failure
+        if not response.ok or not response.url.endswith("/secure"):
+            raise RuntimeError(f"API login failed: {response.status} {response.url}")
+        return api.storage_state()["cookies"]
+    finally:
+        api.dispose()
+
+
+def api_login(playwright: Playwright, context: BrowserContext, page: Page):
+    """Seed cookies from the API, open /secure. Returns True on success."""
+    try:
+        context.add_cookies(api_login_cookies(playwright))
+    except Exception as error:
+        print(f"\n  [api login] {error}")
+        return False
+    page.goto(f"{BASE_URL}/secure")
+    # Still on /login? The cookie wasn't accepted.
+    return page.url.endswith("/secure")
+
+
+# ============================================
+# FIXTURE WITH FALLBACK
+# ============================================
+
+@pytest.fixture
+def logged_in_page(playwright: Playwright, context: BrowserContext, page: Page):
+    """Authenticated page on /secure - API shortcut, UI fallback."""
+    if not api_login(playwright, context, page):
+        print("\n  [api login] falling back to UI login")
+        context.clear_cookies()
+        ui_login(page)
+    return page
+
+
+# ============================================
+# TESTS (same as in 02_pytest_fixtures.py)
+# ============================================
+
+def test_secure_area_accessible(logged_in_page: Page):
+    assert "/secure" in logged_in_page.url
+    expect(logged_in_page.locator("h2")).to_contain_text("Secure Area")
+
+
+def test_logout_button_visible(logged_in_page: Page):
+    expect(logged_in_page.locator("a[href='/logout']")).to_be_visible()
+
+
+def test_logout_works(logged_in_page: Page):
+    logged_in_page.locator("a[href='/logout']").click()
+    expect(logged_in_page.locator("#flash")).to_contain_text("You logged out")
+
+
+def test_wrong_password_is_rejected(playwright: Playwright):
+    """The API path must fail loudly, so the fixture can fall back."""
+    with pytest.raises(RuntimeError):
+        api_login_cookies(playwright, password="wrong")
+
+
+# ============================================
+# BENCHMARK: UI LOGIN vs API LOGIN
+# ============================================
+# Each iteration = what one test's setup costs: new context + page + login.
+
+@pytest.mark.skipif(os.getenv("RUN_BENCHMARK") != "1", reason="set RUN_BENCHMARK=1")
+def test_benchmark_login_paths(playwright: Playwright, browser: Browser):
+    runs = int(os.getenv("BENCHMARK_RUNS", "100"))
+    results = {}
+
+    for name in ("ui", "api"):
+        durations = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            context = browser.new_context()
+            page = context.new_page()
+            if name == "ui":
+                ui_login(page)
+            else:
+                assert api_login(playwright, context, page)
+            durations.append(time.perf_counter() - start)
+            context.close()
+        results[name] = durations
+
+    ui_total, api_total = sum(results["ui"]), sum(results["api"])
+    print(f"\n  {runs} test setups:")
+    print(f"    UI login:  {ui_total:.1f}s total, {ui_total / runs * 1000:.0f}ms per test")
+    print(f"    API login: {api_total:.1f}s total, {api_total / runs * 1000:.0f}ms per test")
+    print(f"    Saved: {ui_total - api_total:.1f}s ({ui_total / api_total:.1f}x faster)")
+
+
+# ============================================
+# KEY POINTS:
+#
+# 1. A login form is just a POST - call it with playwright.request
+# 2. api.storage_state()["cookies"] -> context.add_cookies()
+# 3. Go straight to the page under test (/secure)
+# 4. Check you really are logged in, else fall back to the UI
+# 5. Keep ONE UI login test to cover the form itself
+# 6. Measure: the benchmark shows the saving per test
+#
+# Run: pytest 06_api_login_fixture.py -v -s
+# ============================================
@@ -0,0 +1,726 @@
+"""Example 6: Local Test Server (Offline the-internet Stand-in)
+
+Demonstrates how to run the pages our tests depend on from a small
+in-process HTTP server instead of https://the-internet.herokuapp.com.
+
+Why?
+- CI runners often have no outbound network
+- Every remote goto() costs hundreds of milliseconds
+- A local server is fully deterministic (no flaky third-party site)
+
+The server starts ONCE per session and overrides the `base_url` fixture,
+so every test that uses f"{base_url}/login" runs against it unchanged.
+
+Pages served:
+    /  /login  /authenticate  /secure  /logout  /checkboxes  /dropdown
+    /inputs  /tables  /add_remove_elements/  /dynamic_loading/1|2
+    /dynamic_controls  /iframe  /nested_frames  /windows  /windows/new
+    /slow  /broken_images
+
+Run with: pytest 06_local_test_server.py -v
+Or start it by hand: python 06_local_test_server.py
+"""
+import os
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+from playwright.sync_api import Page, expect
+
+
+# ============================================
+# SERVER CONFIGURATION
+# ============================================
+# All delays are in milliseconds and can be set with environment variables:
+#   LOCAL_SERVER_LATENCY_MS=50 pytest 06_local_test_server.py
+#
+# - latency_ms       - added to EVERY response (simulate a real network)
+# - dynamic_delay_ms - "loading..." time on dynamic_loading / dynamic_controls
+#                      (the real site uses ~5 seconds)
+# - slow_ms          - how long /slow_resources takes to answer
+
+class ServerConfig:
+    """Delays used by the local server."""
+
+    def __init__(self, latency_ms=0, dynamic_delay_ms=200, slow_ms=500):
+        self.latency_ms = latency_ms
+        self.dynamic_delay_ms = dynamic_delay_ms
+        self.slow_ms = slow_ms
+
+    @classmethod
+    def from_env(cls):
+        """Build config from LOCAL_SERVER_* environment variables."""
+        return cls(
+            latency_ms=int(os.getenv("LOCAL_SERVER_LATENCY_MS", "0")),
+            dynamic_delay_ms=int(os.getenv("LOCAL_SERVER_DYNAMIC_DELAY_MS", "200")),
+            slow_ms=int(os.getenv("LOCAL_SERVER_SLOW_MS", "500")),
+        )
+
+
+VALID_USERNAME = "tomsmith"
+VALID_PASSWORD = "SuperSecretPassword!"
+SESSION_COOKIE = "rack.session"
+
+
+# ============================================
+# PAGE TEMPLATES
+# ============================================
+# Markup keeps the same ids, classes and texts as the real site,
+# so locators like "#username", "#flash" or "#table1 tbody tr" still work.
+
+def layout(title, body, flash=None):
+    """Wrap page body in a common HTML layout."""
+    flash_html = ""
+    if flash:
+        kind, message = flash
+        flash_html = (
+            f'<div id="flash-messages"><div data-alert id="flash" class="flash {kind}">\n'
+            f"            {message}\n"
+            f'            <a href="#" class="close">×</a>\n'
+            f"          </div></div>"
+        )
+    return (
+        "<!DOCTYPE html>\n"
+        f"<html><head><meta charset='utf-8'><title>{title}</title></head>\n"
+        f"<body>{flash_html}<div id='content' class='large-12 columns'>{body}</div></body></html>"
+    )
+
+
+INDEX_LINKS = [
+    ("/add_remove_elements/", "Add/Remove Elements"),
+    ("/broken_images", "Broken Images"),
+    ("/checkboxes", "Checkboxes"),
+    ("/dropdown", "Dropdown"),
+    ("/dynamic_controls", "Dynamic Controls"),
+    ("/dynamic_loading", "Dynamic Loading"),
+    ("/login", "Form Authentication"),
+    ("/iframe", "iFrame"),
+    ("/inputs", "Inputs"),
+    ("/windows", "Multiple Windows"),
+    ("/nested_frames", "Nested Frames"),
+    ("/slow", "Slow Resources"),
+    ("/tables", "Sortable Data Tables"),
+]
+
+INDEX_PAGE = layout("The Internet", (
+    "<h1 class='heading'>Welcome to the-internet</h1>"
+    "<h2>Available Examples</h2><ul>"
+    + "".join(f"<li><a href='{href}'>{text}</a></li>" for href, text in INDEX_LINKS)
+    + "</ul>"
+))
+
+LOGIN_BODY = """
+<div class="example">
+  <h2>Login Page</h2>
+  <h4 class="subheader">This is where you can log into the secure area.</h4>
+  <form name="login" id="login" action="/authenticate" method="post">
+    <div class="row"><label for="username">Username</label>
+      <input type="text" name="username" id="username"></div>
+    <div class="row"><label for="password">Password</label>
+      <input type="password" name="password" id="password"></div>
+    <button class="radius" type="submit"><i class="fa fa-2x fa-sign-in"> Login</i></button>
+  </form>
+</div>
+"""
+
+SECURE_BODY = """
+<div class="example">
+  <h2><i class="icon-lock"></i> Secure Area</h2>
+  <h4 class="subheader">Welcome to the Secure Area. When you are done click logout below.</h4>
+  <a class="button secondary radius" href="/logout"><i class="icon-2x icon-signout"> Logout</i></a>
+</div>
+"""
+
+CHECKBOXES_BODY = """
+<div class="example">
+  <h3>Checkboxes</h3>
+  <form id="checkboxes">
+    <input type="checkbox"> checkbox 1<br>
+    <input type="checkbox" checked> checkbox 2
+  </form>
+</div>
+"""
+
+DROPDOWN_BODY = """
+<div class="example">
+  <h3>Dropdown List</h3>
+  <select id="dropdown">
+    <option value="" disabled="disabled" selected="selected">Please select an option</option>
+    <option value="1">Option 1</option>
+    <option value="2">Option 2</option>
+  </select>
+</div>
+"""
+
+INPUTS_BODY = """
+<div class="example">
+  <h3>Inputs</h3>
+  <div class="no-js-hidden"><p>Number</p><input type="number"></div>
+</div>
+"""
+
+TABLE_ROWS = [
+    ("Smith", "John", "jsmith@gmail.com", "$50.00", "http://www.jsmith.com"),
+    ("Bach", "Frank", "fbach@yahoo.com", "$51.00", "http://www.frank.com"),
+    ("Doe", "Jason", "jdoe@hotmail.com", "$100.00", "http://www.jdoe.com"),
+    ("Conway", "Tim", "tconway@earthlink.net", "$50.00", "http://www.timconway.com"),
+]
+TABLE_HEADERS = ["Last Name", "First Name", "Email", "Due", "Web Site", "Action"]
+TABLE2_CLASSES = ["last-name", "first-name", "email", "dues", "web-site", "action"]
+
+
+def render_table(table_id, with_classes):
+    """Render one of the two tables from /tables."""
+    def cls(i):
+        return f" class='{TABLE2_CLASSES[i]}'" if with_classes else ""
+
+    head = "".join(
+        f"<th{cls(i)}><span{cls(i)}>{h}</span></th>" for i, h in enumerate(TABLE_HEADERS)
+    )
+    rows = ""
+    for row in TABLE_ROWS:
+        cells = "".join(f"<td{cls(i)}>{value}</td>" for i, value in enumerate(row))
+        actions = "<a href='#edit'>edit</a> <a href='#delete'>delete</a>"
+        rows += f"<tr>{cells}<td{cls(5)}>{actions}</td></tr>"
+    return (
+        f"<table id='{table_id}' class='tablesorter'>"
+        f"<thead><tr>{head}</tr></thead><tbody>{rows}</tbody></table>"
+    )
+
+
+TABLES_BODY = (
+    "<div class='example'><h3>Data Tables</h3>"
+    "<h4>Example 1</h4>" + render_table("table1", with_classes=False)
+    + "<h4>Example 2</h4>" + render_table("table2", with_classes=True)
+    + "</div>"
+)
+
+ADD_REMOVE_BODY = """
+<div class="example">
+  <h3>Add/Remove Elements</h3>
+  <button onclick="addElement()">Add Element</button>
+  <div id="elements"></div>
+</div>
+<script>
+  function addElement() {
+    const button = document.createElement("button");
+    button.className = "added-manually";
+    button.textContent = "Delete";
+    button.onclick = function () { deleteElement(this); };
+    document.getElementById("elements").appendChild(button);
+  }
+  function deleteElement(element) { element.remove(); }
+</script>
+"""
+
+
+DYNAMIC_LOADING_INDEX_BODY = """
+<div class="example">
+  <h3>Dynamically Loaded Page Elements</h3>
+  <a href="/dynamic_loading/1">Example 1: Element on page that is hidden</a><br>
+  <a href="/dynamic_loading/2">Example 2: Element rendered after the fact</a>
+</div>
+"""
+
+
+def dynamic_loading_body(example, delay_ms):
+    """Example 1 reveals a hidden element, example 2 renders a new one."""
+    if example == "1":
+        finish = '<div id="finish" style="display:none"><h4>Hello World!</h4></div>'
+        reveal = 'document.getElementById("finish").style.display = "";'
+        title = "Example 1: Element on page that is hidden"
+    else:
+        finish = ""
+        reveal = (
+            'const div = document.createElement("div"); div.id = "finish";'
+            'div.innerHTML = "<h4>Hello World!</h4>";'
+            'document.querySelector(".example").appendChild(div);'
+        )
+        title = "Example 2: Element rendered after the fact"
+    return f"""
+<div class="example">
+  <h3>Dynamically Loaded Page Elements</h3>
+  <h4>{title}</h4>
+  <div id="start"><button>Start</button></div>
+  <div id="loading" style="display:none">Loading... </div>
+  {finish}
+</div>
+<script>
+  document.querySelector("#start button").addEventListener("click", function () {{
+    document.getElementById("start").style.display = "none";
+    document.getElementById("loading").style.display = "";
+    setTimeout(function () {{
+      document.getElementById("loading").style.display = "none";
+      {reveal}
+    }}, {delay_ms});
+  }});
+</script>
+"""
+
+
+def dynamic_controls_body(delay_ms):
+    """Checkbox that can be removed/added and input that can be enabled."""
+    return f"""
+<div class="example">
+  <h4>Dynamic Controls</h4>
+  <h4 class="subheader">Remove/add</h4>
+  <form id="checkbox-example">
+    <div id="checkbox"><input type="checkbox" label="blah"> A checkbox</div>
+    <button type="button" onclick="swapCheckbox(this)">Remove</button>
+    <div id="loading" style="display:none">Wait for it... </div>
+    <p id="message"></p>
+  </form>
+  <h4 class="subheader">Enable/disable</h4>
+  <form id="input-example">
+    <input type="text" disabled>
+    <button type="button" onclick="swapInput(this)">Enable</button>
+    <p id="input-message"></p>
+  </form>
+</div>
+<script>
+  function later(fn) {{ setTimeout(fn, {delay_ms}); }}
+  function swapCheckbox(button) {{
+    const form = document.getElementById("checkbox-example");
+    const loading = document.getElementById("loading");
+    const message = document.getElementById("message");
+    loading.style.display = "";
+    button.disabled = true;
+    later(function () {{
+      loading.style.display = "none";
+      button.disabled = false;
+      const existing = document.getElementById("checkbox");
+      if (existing) {{
+        existing.remove();
+        button.textContent = "Add";
+        message.textContent = "It's gone!";
+      }} else {{
+        const div = document.createElement("div");
+        div.id = "checkbox";
+        div.innerHTML = '<input type="checkbox"> A checkbox';
+        form.insertBefore(div, button);
+        button.textContent = "Remove";
+        message.textContent = "It's back!";
+      }}
+    }});
+  }}
+  function swapInput(button) {{
+    const input = document.querySelector("#input-example input");
+    const message = document.getElementById("input-message");
+    button.disabled = true;
+    later(function () {{
+      button.disabled = false;
+      input.disabled = !input.disabled;
+      button.textContent = input.disabled ? "Enable" : "Disable";
+      message.textContent = input.disabled ? "It's disabled!" : "It's enabled!";
+    }});
+  }}
+</script>
+"""
+
+
+IFRAME_BODY = """
+<div class="example">
+  <h3>An iFrame containing the TinyMCE WYSIWYG Editor</h3>
+  <iframe id="mce_0_ifr" title="Rich Text Area" src="/tinymce_frame"></iframe>
+</div>
+"""
+
+TINYMCE_FRAME = (
+    "<!DOCTYPE html><html><head><title>Editor</title></head>"
+    "<body id='tinymce' class='mce-content-body' contenteditable='true'>"
+    "<p>Your content goes here.</p></body></html>"
+)
+
+NESTED_FRAMES = (
+    "<!DOCTYPE html><html><head><title>Frames</title></head>"
+    "<frameset rows='50%,50%'>"
+    "<frame src='/frame_top' name='frame-top'>"
+    "<frame src='/frame_bottom' name='frame-bottom'>"
+    "</frameset></html>"
+)
+
+FRAME_TOP = (
+    "<!DOCTYPE html><html><head><title>Frame Top</title></head>"
+    "<frameset cols='33%,33%,33%' name='frameset-middle'>"
+    "<frame src='/frame_left' name='frame-left'>"
+    "<frame src='/frame_middle' name='frame-middle'>"
+    "<frame src='/frame_right' name='frame-right'>"
+    "</frameset></html>"
+)
+
+
+def frame_page(text, with_content_id=False):
+    """Tiny page used inside nested frames."""
+    body = f"<div id='content'>{text}</div>" if with_content_id else text
+    return f"<!DOCTYPE html><html><head></head><body>{body}</body></html>"
+
+
+WINDOWS_BODY = """
+<div class="example">
+  <h3>Opening a new window</h3>
+  <a href="/windows/new" target="_blank">Click Here</a>
+</div>
+"""
+
+NEW_WINDOW_PAGE = (
+    "<!DOCTYPE html><html><head><title>New Window</title></head>"
+    "<body><div class='example'><h3>New Window</h3></div></body></html>"
+)
+
+SLOW_BODY = """
+<div class="example">
+  <h3>Slow Resources</h3>
+  <p>This page has a resource that takes a while to load.</p>
+</div>
+<script>fetch("/slow_resources");</script>
+"""
+
+BROKEN_IMAGES_BODY = """
+<div class="example">
+  <h3>Broken Images</h3>
+  <img src="asdf.jpg">
+  <img src="hjkl.jpg">
+  <img src="img/avatar-blank.jpg">
+</div>
+"""
+
+# Smallest valid GIF (1x1 transparent pixel) for the one "working" image
+BLANK_GIF = (
+    b"GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff!\xf9\x04\x01\x00"
+    b"\x00\x00\x00,\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;"
+)
+
+
+# ============================================
+# REQUEST HANDLER
+# ============================================
+
+class TheInternetHandler(BaseHTTPRequestHandler):
+    """Serves the-internet pages from memory.
+
+    `config` and `sessions` are set on the subclass created by LocalServer,
+    so several servers can run side by side with different settings.
+    """
+
+    config = ServerConfig()
+    sessions = {}
+    sessions_lock = threading.Lock()
+
+    # ---------- helpers ----------
+
+    def log_message(self, format, *args):
+        """Keep pytest output clean (default handler logs every request)."""
+
+    def send_html(self, html, status=200, headers=None):
+        body = html.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def redirect(self, location, headers=None):
+        self.send_response(303)
+        self.send_header("Location", location)
+        self.send_header("Content-Length", "0")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+
+    def not_found(self):
+        self.send_html(layout("Not Found", "<h1>Not Found</h1>"), status=404)
+
+    def session(self):
+        """Return (token, session dict) for the request cookie, if any."""
+        cookie_header = self.headers.get("Cookie", "")
+        for part in cookie_header.split(";"):
+            name, _, value = part.strip().partition("=")
+            if name == SESSION_COOKIE:
+                with self.sessions_lock:
+                    if value in self.sessions:
+                        return value, self.sessions[value]
+        return None, None
+
+    def new_session(self, **data):
+        token = secrets.token_hex(16)
+        with self.sessions_lock:
+            self.sessions[token] = data
+        return token
+
+    def pop_flash(self):
+        """Flash messages are shown once, like on the real site."""
+        _, session = self.session()
+        if session is None:
+            return None
+        return session.pop("flash", None)
+
+    def simulate_latency(self):
+        if self.config.latency_ms:
+            time.sleep(self.config.latency_ms / 1000)
+
+    # ---------- routes ----------
+
+    def do_GET(self):
+        self.simulate_latency()
+        path = urlsplit(self.path).path
+
+        static_pages = {
+            "/": INDEX_PAGE,
+            "/dynamic_loading": layout("The Internet", DYNAMIC_LOADING_INDEX_BODY),
+            "/checkboxes": layout("The Internet", CHECKBOXES_BODY),
+            "/dropdown": layout("The Internet", DROPDOWN_BODY),
+            "/inputs": layout("The Internet", INPUTS_BODY),
+            "/tables": layout("The Internet", TABLES_BODY),
+            "/add_remove_elements/": layout("The Internet", ADD_REMOVE_BODY),
+            "/iframe": layout("The Internet", IFRAME_BODY),
+            "/tinymce_frame": TINYMCE_FRAME,
+            "/nested_frames": NESTED_FRAMES,
+            "/frame_top": FRAME_TOP,
+            "/frame_left": frame_page("LEFT"),
+            "/frame_middle": frame_page("MIDDLE", with_content_id=True),
+            "/frame_right": frame_page("RIGHT"),
+            "/frame_bottom": frame_page("BOTTOM"),
+            "/windows": layout("The Internet", WINDOWS_BODY),
+            "/windows/new": NEW_WINDOW_PAGE,
+            "/slow": layout("The Internet", SLOW_BODY),
+            "/broken_images": layout("The Internet", BROKEN_IMAGES_BODY),
+        }
+
+        if path in static_pages:
+            self.send_html(static_pages[path])
+        elif path == "/add_remove_elements":
+            self.redirect("/add_remove_elements/")
+        elif path in ("/dynamic_loading/1", "/dynamic_loading/2"):
+            body = dynamic_loading_body(path[-1], self.config.dynamic_delay_ms)
+            self.send_html(layout("The Internet", body))
+        elif path == "/dynamic_controls":
+            body = dynamic_controls_body(self.config.dynamic_delay_ms)
+            self.send_html(layout("The Internet", body))
+        elif path == "/login":
+            self.send_html(layout("The Internet", LOGIN_BODY, flash=self.pop_flash()))
+        elif path == "/secure":
+            self.handle_secure()
+        elif path == "/logout":
+            self.handle_logout()
+        elif path == "/slow_resources":
+            time.sleep(self.config.slow_ms / 1000)
+            self.send_html("ok")
+        elif path == "/img/avatar-blank.jpg":
+            self.send_response(200)
+            self.send_header("Content-Type", "image/gif")
+            self.send_header("Content-Length", str(len(BLANK_GIF)))
+            self.end_headers()
+            self.wfile.write(BLANK_GIF)
+        else:
+            self.not_found()
+
+    def do_POST(self):
+        self.simulate_latency()
+        if urlsplit(self.path).path != "/authenticate":
+            self.not_found()
+            return
+
+        length = int(self.headers.get("Content-Length", "0"))
+        form = parse_qs(self.rfile.read(length).decode("utf-8"))
+        username = form.get("username", [""])[0]
+        password = form.get("password", [""])[0]
+
+        if username != VALID_USERNAME:
+            flash = ("error", "Your username is invalid!")
+            token = self.new_session(flash=flash)
+            self.redirect("/login", {"Set-Cookie": f"{SESSION_COOKIE}={token}; Path=/"})
+        elif password != VALID_PASSWORD:
+            flash = ("error", "Your password is invalid!")
+            token = self.new_session(flash=flash)
+            self.redirect("/login", {"Set-Cookie": f"{SESSION_COOKIE}={token}; Path=/"})
+        else:
+            flash = ("success", "You logged into a secure area!")
+            token = self.new_session(user=username, flash=flash)
+            self.redirect("/secure", {"Set-Cookie": f"{SESSION_COOKIE}={token}; Path=/"})
+
+    def handle_secure(self):
+        _, session = self.session()
+        if not session or "user" not in session:
+            token = self.new_session(flash=("error", "You must login to view the secure area!"))
+            self.redirect("/login", {"Set-Cookie": f"{SESSION_COOKIE}={token}; Path=/"})
+            return
+        self.send_html(layout("The Internet", SECURE_BODY, flash=session.pop("flash", None)))
+
+    def handle_logout(self):
+        token, _ = self.session()
+        if token:
+            with self.sessions_lock:
+                self.sessions.pop(token, None)
+        new_token = self.new_session(flash=("success", "You logged out of the secure area!"))
+        self.redirect("/login", {"Set-Cookie": f"{SESSION_COOKIE}={new_token}; Path=/"})
+
+
+# ============================================
+# SERVER LIFECYCLE
+# ============================================
+
+class LocalServer:
+    """Runs TheInternetHandler on a free localhost port in a background thread."""
+
+    def __init__(self, config=None, host="127.0.0.1", port=0):
+        handler = type("ConfiguredHandler", (TheInternetHandler,), {
+            "config": config or ServerConfig(),
+            "sessions": {},
+            "sessions_lock": threading.Lock(),
+        })
+        # port=0 lets the OS pick a free port (no clashes between xdist workers)
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.thread.join(timeout=5)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+# ============================================
+# PYTEST FIXTURES (put these in conftest.py)
+# ============================================
+
+@pytest.fixture(scope="session")
+def local_server_config():
+    """Override this fixture to change delays for a whole suite."""
+    return ServerConfig.from_env()
+
+
+@pytest.fixture(scope="session")
+def local_server(local_server_config):
+    """Start the local server ONCE for the whole test session."""
+    with LocalServer(local_server_config) as server:
+        print(f"\n  [local server] {server.url}")
+        yield server
+
+
+@pytest.fixture(scope="session")
+def base_url(local_server):
+    """Override pytest-playwright's base_url with the local server."""
+    return local_server.url
+
+
+# ============================================
+# TESTS (same code as against the real site)
+# ============================================
+
+def test_homepage(page: Page, base_url):
+    page.goto(base_url)
+    assert page.title() == "The Internet"
+
+
+def test_valid_login(page: Page, base_url):
+    page.goto(f"{base_url}/login")
+    page.locator("#username").fill(VALID_USERNAME)
+    page.locator("#password").fill(VALID_PASSWORD)
+    page.locator("button[type='submit']").click()
+
+    expect(page).to_have_url(f"{base_url}/secure")
+    expect(page.locator("h2")).to_have_text(" Secure Area")
+    expect(page.locator("#flash")).to_contain_text("You logged into a secure area!")
+
+
+def test_invalid_login(page: Page, base_url):
+    page.goto(f"{base_url}/login")
+    page.locator("#username").fill("wrong")
+    page.locator("#password").fill("wrong")
+    page.locator("button[type='submit']").click()
+
+    expect(page.locator(".flash.error")).to_contain_text("Your username is invalid!")
+
+
+def test_secure_requires_login(page: Page, base_url):
+    page.goto(f"{base_url}/secure")
+    expect(page).to_have_url(f"{base_url}/login")
+
+
+def test_checkboxes(page: Page, base_url):
+    page.goto(f"{base_url}/checkboxes")
+    checkboxes = page.locator("input[type='checkbox']")
+    expect(checkboxes).to_have_count(2)
+    expect(checkboxes.nth(1)).to_be_checked()
+
+
+def test_tables(page: Page, base_url):
+    page.goto(f"{base_url}/tables")
+    expect(page.locator("#table1 tbody tr")).to_have_count(4)
+    expect(page.locator("#table2 tbody .dues").first).to_have_text("$50.00")
+
+
+def test_dynamic_loading(page: Page, base_url):
+    """Finishes in ~200ms instead of ~5s on the real site."""
+    page.goto(f"{base_url}/dynamic_loading/2")
+    page.locator("#start button").click()
+    expect(page.locator("#finish h4")).to_have_text("Hello World!")
+
+
+def test_nested_frames(page: Page, base_url):
+    page.goto(f"{base_url}/nested_frames")
+    middle = (page
+              .frame_locator("frame[name='frame-top']")
+              .frame_locator("frame[name='frame-middle']"))
+    expect(middle.locator("#content")).to_have_text("MIDDLE")
+
+
+def test_new_window(page: Page, base_url):
+    page.goto(f"{base_url}/windows")
+    with page.expect_popup() as popup_info:
+        page.locator("a[href='/windows/new']").click()
+    expect(popup_info.value.locator("h3")).to_have_text("New Window")
+
+
+def test_navigation_is_fast(page: Page, base_url):
+    """Local navigations take milliseconds, not hundreds of milliseconds."""
+    start = time.perf_counter()
+    for _ in range(10):
+        page.goto(f"{base_url}/login")
+    per_goto_ms = (time.perf_counter() - start) * 1000 / 10
+    print(f"\n  Average goto: {per_goto_ms:.1f}ms")
+    assert per_goto_ms < 200
+
+
+# ============================================
+# KEY POINTS:
+#
+# 1. http.server + a thread = a test server with no extra packages
+# 2. port=0 picks a free port, safe for parallel workers
+# 3. Session fixture starts the server ONCE
+# 4. Overriding base_url switches every test to the local server
+# 5. Delays are configurable (ServerConfig / LOCAL_SERVER_* env vars)
+# 6. Same ids and texts as the real site - tests don't change
+#
+# Run: pytest 06_local_test_server.py -v
+# ============================================
+
+
+if __name__ == "__main__":
+    with LocalServer(ServerConfig.from_env(), port=int(os.getenv("PORT", "8000"))) as server:
+        print(f"Serving the-internet stand-in on {server.url} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
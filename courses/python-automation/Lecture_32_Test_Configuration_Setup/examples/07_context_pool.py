@@ -0,0 +1,293 @@
+"""Example 7: Warm BrowserContext Pool
+
+The shared_browser fixture in 02_conftest_browser_options.py shares the
+BROWSER, but pytest-playwright's `page` fixture still creates a new context
+and a new page for every test. That costs tens of milliseconds per test.
+
+05_clearing_data.py in Lecture 26 showed that a context can be cleaned
+IN PLACE. This example keeps N pre-warmed contexts per worker and, between
+tests, resets them instead of throwing them away:
+
+- cookies          -> context.clear_cookies()
+- permissions      -> context.clear_permissions()
+- routes           -> context.unroute_all()
+- sessionStorage   -> close all pages, open one fresh page
+- localStorage     -> cleared per origin on a blank same-origin document
+- offline/headers  -> set back to what context_args asked for
+- permissions/geolocation from context_args are granted again
+
+After the reset the context is VERIFIED (no cookies, no storage, one blank
+page). A context that fails verification is closed and replaced, so state
+never leaks from one test into another.
+
+Run with: pytest 07_context_pool.py -v -s
+Pool size: CONTEXT_POOL_SIZE=4 pytest ...
+"""
+import os
+import time
+from collections import deque
+
+import pytest
+from playwright.sync_api import Browser, BrowserContext, Page
+
+
+BASE_URL = "https://the-internet.herokuapp.com"
+RESET_PATH = "/__context_pool_reset__"
+
+
+# ============================================
+# POOLED CONTEXT
+# ============================================
+
+class PooledContext:
+    """A context + its single page, as handed out to a test."""
+
+    def __init__(self, context: BrowserContext, page: Page):
+        self.context = context
+        self.page = page
+        self.uses = 0
+
+
+class ContextPool:
+    """Keeps `size` ready-to-use contexts for one worker process."""
+
+    def __init__(self, browser: Browser, size=2, context_args=None):
+        self.browser = browser
+        self.size = size
+        self.context_args = context_args or {}
+        self.idle = deque()  # LIFO: the most recently released context is the warmest
+
+        # Statistics
+        self.created = 0
+        self.creation_time = 0.0
+        self.acquired = 0
+        self.reset_time = 0.0
+        self.replaced = 0
+
+        for _ in range(size):
+            self.idle.append(self.create())
+
+    # ---------- create / acquire / release ----------
+
+    def create(self):
+        start = time.perf_counter()
+        context = self.browser.new_context(**self.context_args)
+        page = context.new_page()
+        self.creation_time += time.perf_counter() - start
+        self.created += 1
+        return PooledContext(context, page)
+
+    def acquire(self):
+        """Hand out a clean context (create one if the pool is empty)."""
+        pooled = self.idle.pop() if self.idle else self.create()
+        pooled.uses += 1
+        self.acquired += 1
+        return pooled
+
+    def release(self, pooled: PooledContext):
+        """Reset the context and put it back; replace it if reset fails."""
+        start = time.perf_counter()
+        try:
+            self.reset(pooled)
+            clean = self.is_clean(pooled)
+        except Exception:
+            clean = False
+        self.reset_time += time.perf_counter() - start
+
+        if clean:
+            self.idle.append(pooled)
+        else:
+            self.replaced += 1
+            try:
+                pooled.context.close()
+            except Exception:
+                pass
+            if len(self.idle) < self.size:
+                self.idle.append(self.create())
+
+    # ---------- reset ----------
+
+    def reset(self, pooled: PooledContext):
+        context = pooled.context
+
+        # Which origins stored something? (read BEFORE closing pages)
+        origins = [o["origin"] for o in context.storage_state()["origins"]]
+
+        context.unroute_all(behavior="ignoreErrors")
+        context.clear_cookies()
+
+        # Back to how new_context(**context_args) created it, not to bare defaults
+        args = self.context_args
+        context.clear_permissions()
+        if args.get("permissions"):
+            context.grant_permissions(args["permissions"])
+        if "geolocation" in args:
+            context.set_geolocation(args["geolocation"])
+        context.set_offline(args.get("offline", False))
+        context.set_extra_http_headers(args.get("extra_http_headers") or {})
+
+        # sessionStorage lives in the page (tab) - a new page has none
+        fresh_page = context.new_page()
+        for page in list(context.pages):
+            if page is not fresh_page:
+                page.close()
+        pooled.page = fresh_page
+
+        # localStorage lives in the context, per origin. Serve a blank page
+        # for each origin from a route (no real network), then clear it.
+        if origins:
+            fresh_page.route(f"**{RESET_PATH}", lambda route: route.fulfill(
+                status=200, content_type="text/html", body="<html></html>"))
+            for origin in origins:
+                fresh_page.goto(origin + RESET_PATH)
+                fresh_page.evaluate("() => { localStorage.clear(); sessionStorage.clear(); }")
+            fresh_page.unroute_all(behavior="ignoreErrors")
+            fresh_page.goto("about:blank")
+
+    def is_clean(self, pooled: PooledContext):
+        """Verify nothing survived the reset."""
+        context = pooled.context
+        state = context.storage_state()
+        return (
+            not state["cookies"]
+            and not any(o["localStorage"] for o in state["origins"])
+            and len(context.pages) == 1
+            and pooled.page.url == "about:blank"
+        )
+
+    # ---------- shutdown / stats ----------
+
+    def close(self):
+        while self.idle:
+            self.idle.pop().context.close()
+
+    def report(self):
+        avg_create = self.creation_time / self.created if self.created else 0.0
+        # Without the pool every acquisition would have created a context
+        without_pool = self.acquired * avg_create
+        with_pool = self.creation_time + self.reset_time
+        return {
+            "tests": self.acquired,
+            "contexts_created": self.created,
+            "contexts_replaced": self.replaced,
+            "avg_create_ms": avg_create * 1000,
+            "avg_reset_ms": self.reset_time / self.acquired * 1000 if self.acquired else 0.0,
+            "saved_s": without_pool - with_pool,
+        }
+
+
+# ============================================
+# FIXTURES (put these in conftest.py)
+# ============================================
+# Session scope = one pool per xdist worker (each worker is its own process).
+
+@pytest.fixture(scope="session")
+def context_pool(browser: Browser, browser_context_args):
+    pool = ContextPool(
+        browser,
+        size=int(os.getenv("CONTEXT_POOL_SIZE", "2")),
+        context_args=browser_context_args,
+    )
+    yield pool
+
+    r = pool.report()
+    print(f"\n  [context pool] {r['tests']} tests, {r['contexts_created']} contexts created, "
+          f"{r['contexts_replaced']} replaced")
+    print(f"  [context pool] create {r['avg_create_ms']:.1f}ms vs reset {r['avg_reset_ms']:.1f}ms "
+          f"-> saved {r['saved_s']:.2f}s")
+    pool.close()
+
+
+@pytest.fixture
+def pooled_page(context_pool):
+    """Drop-in replacement for `page` that reuses warm contexts."""
+    pooled = context_pool.acquire()
+    yield pooled.page
+    context_pool.release(pooled)
+
+
+# ============================================
+# TESTS: STATE MUST NOT LEAK
+# ============================================
+# Each test uses its own pool of ONE context: the context dirtied by the
+# first "test" is the one the second acquire() hands back - also under
+# xdist, where two separate tests could land on different workers.
+
+PERMISSION_JS = "() => navigator.permissions.query({name: 'geolocation'}).then(p => p.state)"
+
+
+def test_nothing_leaked(browser: Browser):
+    pool = ContextPool(browser, size=1)
+    dirty = pool.acquire()
+    page = dirty.page
+    page.goto(f"{BASE_URL}/login")
+    page.context.add_cookies([{"name": "leak", "value": "1", "url": BASE_URL}])
+    page.evaluate("() => { localStorage.setItem('leak', '1'); sessionStorage.setItem('leak', '1'); }")
+    page.context.grant_permissions(["geolocation"])
+    page.context.route("**/*", lambda route: route.abort())
+    page.route("**/*", lambda route: route.abort())
+    page.context.new_page()  # an extra tab
+    pool.release(dirty)
+
+    pooled = pool.acquire()
+    assert pooled is dirty and pool.replaced == 0  # reused, not replaced
+    page = pooled.page
+    assert page.context.cookies() == []
+    assert len(page.context.pages) == 1
+
+    response = page.goto(f"{BASE_URL}/login")  # would be aborted if a route survived
+    assert response is not None and response.ok
+    assert page.evaluate("localStorage.getItem('leak')") is None
+    assert page.evaluate("sessionStorage.getItem('leak')") is None
+    assert page.evaluate(PERMISSION_JS) == "prompt"
+    pool.release(pooled)
+    pool.close()
+
+
+def test_reset_restores_context_args(browser: Browser):
+    pool = ContextPool(browser, size=1, context_args={
+        "permissions": ["geolocation"],
+        "extra_http_headers": {"X-Pool-Test": "1"},
+    })
+    pooled = pool.acquire()
+    pooled.context.clear_permissions()
+    pooled.context.set_extra_http_headers({})
+    pooled.context.set_offline(True)
+    pool.release(pooled)
+
+    pooled = pool.acquire()
+    page = pooled.page
+    seen = {}
+
+    def echo(route):
+        seen.update(route.request.all_headers())
+        route.fulfill(status=200, content_type="text/html", body="<html></html>")
+
+    page.route(f"{BASE_URL}/echo", echo)
+    page.goto(f"{BASE_URL}/echo")
+    assert seen.get("x-pool-test") == "1"
+    assert page.evaluate("navigator.onLine") is True
+    assert page.evaluate(PERMISSION_JS) == "granted"
+    pool.release(pooled)
+    pool.close()
+
+
+@pytest.mark.parametrize("run", range(10))
+def test_many_quick_tests(pooled_page: Page, run):
+    """Lots of short tests - where saved context creation adds up."""
+    pooled_page.goto(f"{BASE_URL}/checkboxes")
+    assert pooled_page.locator("input[type='checkbox']").count() == 2
+
+
+# ============================================
+# KEY POINTS:
+#
+# 1. new_context() per test is isolated but not free
+# 2. A pool keeps warm contexts and resets them in place (LIFO: reuse the warmest)
+# 3. Reset: cookies, permissions, routes, pages, storage - then reapply context_args
+# 4. ALWAYS verify the reset - replace contexts that fail
+# 5. Session scope = one pool per xdist worker
+# 6. Measure: creation time saved vs reset time spent
+#
+# Run: pytest 07_context_pool.py -v -s
+# ============================================
@@ -0,0 +1,268 @@
+"""Example 8: Video Policy - Keep Videos Only When They Matter
+
+video_context in 04_screenshots_and_traces.py records a 1280x720 video
+for every test and keeps all of them. On a long run that fills the disk
+with videos of tests that passed.
+
+The VideoManager:
+- records every test (the video must exist before we know the outcome)
+- KEEPS the video only if the test failed or was retried
+  (pytest-rerunfailures), and deletes the rest on a background thread
+- enforces a run-wide byte quota: when it is full, the oldest kept video
+  is evicted first. A kept video is written once and never read during
+  the run, so "least recently used" and "oldest" are the same video -
+  LRU here needs no more than insertion order (FIFO)
+- reports how much recording cost per test
+- resolution per test with a marker: @pytest.mark.video("low")
+
+Setup: the video marker and the report hook video_page reads are in
+conftest.py in this folder.
+
+Run with (from this folder): pytest 08_video_policy.py -v -s
+Kept video: SHOW_FAILURE=1 pytest 08_video_policy.py -v -s
+Settings: VIDEO_QUALITY=medium VIDEO_QUOTA_MB=500 pytest 08_video_policy.py -v -s
+"""
+import os
+import queue
+import re
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import pytest
+from playwright.sync_api import Browser, Page
+
+
+BASE_URL = "https://the-internet.herokuapp.com"
+
+VIDEO_QUALITY = {
+    "off": None,
+    "low": {"width": 640, "height": 360},
+    "medium": {"width": 960, "height": 540},
+    "full": {"width": 1280, "height": 720},
+}
+
+
+# ============================================
+# BACKGROUND DELETER
+# ============================================
+
+class BackgroundDeleter:
+    """Deletes files on its own thread, so tests never wait for the disk."""
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.deleted = 0
+        self.thread = threading.Thread(target=self._run, name="video-deleter", daemon=True)
+        self.thread.start()
+
+    def delete(self, path):
+        self.queue.put(path)
+
+    def _run(self):
+        while True:
+            path = self.queue.get()
+            try:
+                if path is None:
+                    return
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                elif os.path.exists(path):
+                    os.remove(path)
+                self.deleted += 1
+            finally:
+                self.queue.task_done()
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+
+
+# ============================================
+# VIDEO MANAGER
+# ============================================
+
+class VideoManager:
+    def __init__(self, output_dir="videos", quota_bytes=500 * 1024 * 1024):
+        self.output_dir = output_dir
+        self.quota_bytes = quota_bytes
+        os.makedirs(output_dir, exist_ok=True)
+        self.deleter = BackgroundDeleter()
+
+        self.kept = OrderedDict()  # path -> size, oldest first
+        self.kept_bytes = 0
+        self.recorded = 0
+        self.discarded = 0
+        self.evicted = 0
+        self.overhead = {}         # quality -> [seconds per test]
+
+    def new_context(self, browser: Browser, quality, **context_args):
+        """Context that records into its own temp dir (None = no recording)."""
+        size = VIDEO_QUALITY[quality]
+        if size is None:
+            return browser.new_context(**context_args), None
+        record_dir = tempfile.mkdtemp(prefix="video-")
+        context = browser.new_context(record_video_dir=record_dir,
+                                      record_video_size=size, **context_args)
+        self.recorded += 1
+        return context, record_dir
+
+    def finish(self, test_name, record_dir, video_path, keep):
+        """Called after context.close(): keep or throw away the video."""
+        if record_dir is None:
+            return None
+        if not keep or video_path is None or not os.path.exists(video_path):
+            self.discarded += 1
+            self.deleter.delete(record_dir)
+            return None
+
+        name = re.sub(r"[^\w.-]+", "_", test_name)
+        kept_path = os.path.join(self.output_dir, f"{name}_{int(time.time() * 1000)}.webm")
+        shutil.move(video_path, kept_path)
+        self.deleter.delete(record_dir)
+
+        size = os.path.getsize(kept_path)
+        self.kept[kept_path] = size
+        self.kept_bytes += size
+        self.enforce_quota()
+        return kept_path if kept_path in self.kept else None
+
+    def enforce_quota(self):
+        """Evict the oldest kept videos until the run fits the quota."""
+        while self.kept_bytes > self.quota_bytes and self.kept:
+            path, size = self.kept.popitem(last=False)
+            self.kept_bytes -= size
+            self.evicted += 1
+            self.deleter.delete(path)
+
+    def record_overhead(self, quality, seconds):
+        self.overhead.setdefault(quality, []).append(seconds)
+
+    def close(self):
+        self.deleter.close()
+
+    def report(self):
+        print(f"\n  [videos] recorded {self.recorded}, kept {len(self.kept)}, "
+              f"discarded {self.discarded}, evicted {self.evicted}")
+        print(f"  [videos] kept size: {self.kept_bytes / 1024 / 1024:.1f} MB "
+              f"of {self.quota_bytes / 1024 / 1024:.0f} MB quota")
+        for quality, samples in self.overhead.items():
+            print(f"  [videos] {quality:<6} {len(samples)} tests, context setup+close "
+                  f"avg {sum(samples) / len(samples) * 1000:.0f}ms")
+        for path in self.kept:
+            print(f"  [videos] kept: {path}")
+
+
+# ============================================
+# FIXTURES (put these in conftest.py)
+# ============================================
+
+# The video marker and pytest_runtest_makereport live in conftest.py
+
+@pytest.fixture(scope="session")
+def video_manager():
+    manager = VideoManager(
+        output_dir=os.getenv("VIDEO_DIR", "videos"),
+        quota_bytes=int(float(os.getenv("VIDEO_QUOTA_MB", "500")) * 1024 * 1024),
+    )
+    yield manager
+    manager.close()
+    manager.report()
+
+
+@pytest.fixture
+def video_page(browser: Browser, video_manager, request):
+    """Page that records video; the video survives only failures and retries."""
+    marker = request.node.get_closest_marker("video")
+    quality = marker.args[0] if marker else os.getenv("VIDEO_QUALITY", "medium")
+
+    start = time.perf_counter()
+    context, record_dir = video_manager.new_context(browser, quality)
+    page = context.new_page()
+    setup_time = time.perf_counter() - start
+
+    yield page
+
+    video = page.video
+    start = time.perf_counter()
+    context.close()  # the video file is finished here - this is where encoding cost shows
+    close_time = time.perf_counter() - start
+    video_manager.record_overhead(quality, setup_time + close_time)
+
+    reports = [getattr(request.node, f"rep_{when}", None) for when in ("setup", "call")]
+    failed = any(rep is not None and (rep.failed or rep.outcome == "rerun") for rep in reports)
+    retried = getattr(request.node, "execution_count", 1) > 1  # set by pytest-rerunfailures
+
+    kept = video_manager.finish(request.node.name, record_dir,
+                                video.path() if video else None, keep=failed or retried)
+    if kept:
+        print(f"\n  Video kept: {kept}")
+
+
+# ============================================
+# TESTS
+# ============================================
+
+def test_login_passes(video_page: Page):
+    """Passes -> video deleted in the background."""
+    video_page.goto(f"{BASE_URL}/login")
+    video_page.locator("#username").fill("tomsmith")
+    video_page.locator("#password").fill("SuperSecretPassword!")
+    video_page.locator("button[type='submit']").click()
+    assert "/secure" in video_page.url
+
+
+@pytest.mark.video("low")
+@pytest.mark.parametrize("run", range(5))
+def test_many_quick_tests(video_page: Page, run):
+    """Heavy suite: record at 640x360, cheaper to encode."""
+    video_page.goto(f"{BASE_URL}/checkboxes")
+    assert video_page.locator("input[type='checkbox']").count() == 2
+
+
+@pytest.mark.video("off")
+def test_no_video_needed(video_page: Page):
+    video_page.goto(f"{BASE_URL}/inputs")
+    assert video_page.locator("input[type='number']").is_visible()
+
+
+@pytest.mark.video("full")
+@pytest.mark.skipif(os.getenv("SHOW_FAILURE") != "1", reason="set SHOW_FAILURE=1 to see a kept video")
+def test_failure_keeps_full_video(video_page: Page):
+    video_page.goto(f"{BASE_URL}/login")
+    video_page.locator("#username").fill("wrong")
+    video_page.locator("button[type='submit']").click()
+    assert "/secure" in video_page.url
+
+
+def test_quota_evicts_oldest(tmp_path):
+    """No browser needed: feed the manager fake video files."""
+    manager = VideoManager(output_dir=str(tmp_path / "kept"), quota_bytes=2500)
+    for i in range(4):
+        record_dir = tmp_path / f"rec{i}"
+        record_dir.mkdir()
+        video = record_dir / "video.webm"
+        video.write_bytes(b"x" * 1000)
+        manager.finish(f"test_{i}", str(record_dir), str(video), keep=True)
+    manager.close()
+
+    assert len(manager.kept) == 2
+    assert manager.evicted == 2
+    assert all("test_2" in p or "test_3" in p for p in manager.kept)
+    assert sorted(os.listdir(tmp_path / "kept")) == sorted(os.path.basename(p) for p in manager.kept)
+
+
+# ============================================
+# KEY POINTS:
+#
+# 1. Record every test, decide AFTER the test what to keep
+# 2. Keep failures and retries - delete the rest off the test thread
+# 3. A run-wide quota with oldest-first eviction caps disk use
+#    (= LRU: a kept video is never used again after it is written)
+# 4. Lower resolution = cheaper encoding for heavy suites
+# 5. context.close() is where the video cost shows up - measure it
+#
+# Run: pytest 08_video_policy.py -v -s
+# ============================================
@@ -0,0 +1,14 @@
+"""Hooks for 08_video_policy.py: the video marker and item.rep_<when> reports."""
+import pytest
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "video(quality): off, low, medium or full")
+
+
+@pytest.hookimpl(tryfirst=True, hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    rep = outcome.get_result()
+    # item.rep_setup / item.rep_call: video_page keeps the video of a failure
+    setattr(item, f"rep_{rep.when}", rep)
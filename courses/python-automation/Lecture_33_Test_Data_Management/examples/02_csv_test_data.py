@@ -15,35 +15,19 @@ BASE_URL = "https://the-internet.herokuapp.com"
 
 EXAMPLES_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(EXAMPLES_DIR, "test_data")
-os.makedirs(DATA_DIR, exist_ok=True)
 
 
 # ============================================
-# CREATE SAMPLE CSV FILES
+# SAMPLE CSV FILES
 # ============================================
-
-# login_data.csv
-csv_login_data = [
-    ["username", "password", "should_succeed", "expected_message"],
-    ["tomsmith", "SuperSecretPassword!", "true", "You logged into a secure area!"],
-    ["wrong", "wrong", "false", "Your username is invalid!"],
-    ["tomsmith", "bad_password", "false", "Your password is invalid!"],
-]
-
-with open(os.path.join(DATA_DIR, "login_data.csv"), "w", newline="", encoding="utf-8") as f:
-    writer = csv.writer(f)
-    writer.writerows(csv_login_data)
-
-# dropdown_data.csv
-csv_dropdown_data = [
-    ["value", "expected_text"],
-    ["1", "Option 1"],
-    ["2", "Option 2"],
-]
-
-with open(os.path.join(DATA_DIR, "dropdown_data.csv"), "w", newline="", encoding="utf-8") as f:
-    writer = csv.writer(f)
-    writer.writerows(csv_dropdown_data)
+#
+# login_data.csv and dropdown_data.csv are generated by conftest.py before
+# collection (see 08_data_materialization.py) - this module only reads them.
+#
+# login_data.csv:
+#   username,password,should_succeed,expected_message
+#   tomsmith,SuperSecretPassword!,true,You logged into a secure area!
+#   ...
 
 
 # ============================================
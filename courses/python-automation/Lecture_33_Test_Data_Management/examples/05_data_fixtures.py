@@ -16,35 +16,14 @@ BASE_URL = "https://the-internet.herokuapp.com"
 
 EXAMPLES_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(EXAMPLES_DIR, "test_data")
-os.makedirs(DATA_DIR, exist_ok=True)
 
 
 # ============================================
 # DATA FILES SETUP (for this example)
 # ============================================
-
-# Create test_users.json
-users_json = {
-    "valid": {
-        "username": "tomsmith",
-        "password": "SuperSecretPassword!"
-    },
-    "invalid": [
-        {"username": "wrong", "password": "wrong", "id": "bad_both"},
-        {"username": "tomsmith", "password": "bad", "id": "bad_password"}
-    ]
-}
-
-with open(os.path.join(DATA_DIR, "test_users.json"), "w") as f:
-    json.dump(users_json, f, indent=2)
-
-# Create pages.csv
-with open(os.path.join(DATA_DIR, "pages.csv"), "w", newline="") as f:
-    writer = csv.writer(f)
-    writer.writerow(["path", "heading_tag", "heading_text"])
-    writer.writerow(["/checkboxes", "h3", "Checkboxes"])
-    writer.writerow(["/dropdown", "h3", "Dropdown List"])
-    writer.writerow(["/inputs", "h3", "Inputs"])
+#
+# test_users.json and pages.csv are generated by conftest.py before
+# collection (see 08_data_materialization.py) - this module only reads them.
 
 
 # ============================================
@@ -0,0 +1,317 @@
+"""Example 6: Pre-Generated, Seeded Faker Data Pools
+
+user_factory() in 04_faker_dynamic_data.py calls Faker for every field of
+every user, and builds a NEW Faker(locale) each time a locale is asked for.
+Both are slow: building a locale instance takes milliseconds, and a user
+record is a dozen Faker calls.
+
+Data pools do the work once:
+- generate users / addresses / emails per locale in one batch, with ONE
+  seeded Faker instance per pool
+- save the pool to disk; the file name contains the seed and a hash of the
+  schema, so a changed seed or field list means a new file
+- later runs (and other xdist workers) just load the file
+- each xdist worker gets its own DISJOINT slice, so unique fields
+  (username, email) never collide between parallel tests
+- same seed + same worker count = same data on every run
+
+Install: pip install faker
+Run with: pytest 06_faker_data_pools.py -v -s
+Settings: DATA_POOL_SEED=12345 DATA_POOL_SIZE=10000 DATA_POOL_LOCALES=en_US,uk_UA
+Benchmark: RUN_BENCHMARK=1 pytest 06_faker_data_pools.py -k benchmark -s
+"""
+import hashlib
+import json
+import os
+import time
+
+import pytest
+from playwright.sync_api import Page
+
+try:
+    from faker import Faker
+    FAKER_AVAILABLE = True
+except ImportError:
+    FAKER_AVAILABLE = False
+    print("Faker not installed. Run: pip install faker")
+
+
+BASE_URL = "https://the-internet.herokuapp.com"
+
+EXAMPLES_DIR = os.path.dirname(os.path.abspath(__file__))
+POOL_DIR = os.path.join(EXAMPLES_DIR, "test_data", "pools")
+
+POOL_SEED = int(os.environ.get("DATA_POOL_SEED", "12345"))
+POOL_SIZE = int(os.environ.get("DATA_POOL_SIZE", "10000"))
+POOL_LOCALES = os.environ.get("DATA_POOL_LOCALES", "en_US,uk_UA").split(",")
+
+
+# ============================================
+# SCHEMA: WHAT A RECORD LOOKS LIKE
+# ============================================
+# Each kind is a list of fields and a function that builds ONE record
+# (as a tuple, in field order). `i` is the record number in the pool -
+# adding it to username/email makes them unique without fake.unique,
+# which gets slower and slower as the pool grows.
+
+def make_user(fake, i):
+    username = f"{fake.user_name()}{i}"
+    return (
+        fake.first_name(),
+        fake.last_name(),
+        username,
+        f"{username}@{fake.free_email_domain()}",
+        fake.password(length=12),
+        fake.phone_number(),
+    )
+
+
+def make_address(fake, i):
+    return (fake.street_address(), fake.city(), fake.postcode(), fake.country())
+
+
+def make_email(fake, i):
+    return (f"{fake.user_name()}.{i}@{fake.free_email_domain()}",)
+
+
+SCHEMA_VERSION = 1  # bump when a make_* function changes its output
+
+SCHEMAS = {
+    "users": (["first_name", "last_name", "username", "email", "password", "phone"], make_user),
+    "addresses": (["street", "city", "postcode", "country"], make_address),
+    "emails": (["email"], make_email),
+}
+
+
+def schema_hash(kind):
+    fields, _ = SCHEMAS[kind]
+    text = json.dumps({"version": SCHEMA_VERSION, "kind": kind, "fields": fields})
+    return hashlib.sha256(text.encode()).hexdigest()[:10]
+
+
+# ============================================
+# DATA POOL
+# ============================================
+
+class DataPool:
+    """`size` records of one kind and locale, generated once and cached."""
+
+    def __init__(self, kind, locale="en_US", seed=POOL_SEED, size=POOL_SIZE, cache_dir=POOL_DIR):
+        self.kind = kind
+        self.locale = locale
+        self.seed = seed
+        self.size = size
+        self.fields, self.make_record = SCHEMAS[kind]
+        self.path = os.path.join(
+            cache_dir, f"{kind}-{locale}-seed{seed}-n{size}-{schema_hash(kind)}.json")
+        self.rows = None
+        self.source = None  # "cache" or "generated"
+
+    def generate(self):
+        fake = Faker(self.locale)  # ONE instance for the whole pool
+        fake.seed_instance(f"{self.seed}-{self.kind}-{self.locale}")
+        return [self.make_record(fake, i) for i in range(self.size)]
+
+    def load(self):
+        """Read the cached pool, or generate and cache it."""
+        if self.rows is not None:
+            return self
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.rows = [tuple(row) for row in json.load(f)["rows"]]
+            self.source = "cache"
+        else:
+            self.rows = self.generate()
+            self.save()
+            self.source = "generated"
+        return self
+
+    def save(self):
+        """Atomic write. Two workers generating at once both write the SAME
+        data (same seed), so whichever os.replace() runs last is fine."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            # Rows as lists, field names once: much smaller than a list of dicts
+            json.dump({"fields": self.fields, "rows": self.rows}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def worker_slice(self, worker_index=0, worker_count=1):
+        """A contiguous block of the pool that no other worker gets."""
+        self.load()
+        block = len(self.rows) // worker_count
+        start = worker_index * block
+        return PoolSlice(self, start, start + block)
+
+
+class PoolSlice:
+    """Hands out records one by one, never the same record twice."""
+
+    def __init__(self, pool, start, end):
+        self.pool = pool
+        self.start = start
+        self.end = end
+        self.position = start
+
+    def take(self):
+        if self.position >= self.end:
+            raise RuntimeError(
+                f"{self.pool.kind}/{self.pool.locale} pool exhausted after "
+                f"{self.end - self.start} records - increase DATA_POOL_SIZE")
+        row = self.pool.rows[self.position]
+        self.position += 1
+        return dict(zip(self.pool.fields, row))
+
+    def take_many(self, count):
+        return [self.take() for _ in range(count)]
+
+    @property
+    def remaining(self):
+        return self.end - self.position
+
+
+def xdist_worker():
+    """(index, count) of this xdist worker; (0, 1) without xdist."""
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "gw0")
+    count = int(os.environ.get("PYTEST_XDIST_WORKER_COUNT", "1"))
+    return int(worker.replace("gw", "")), count
+
+
+# ============================================
+# FIXTURES (put these in conftest.py)
+# ============================================
+
+class DataPools:
+    """All pools for this worker: pools[("users", "uk_UA")].take()"""
+
+    def __init__(self, locales, seed=POOL_SEED, size=POOL_SIZE):
+        self.worker_index, self.worker_count = xdist_worker()
+        self.slices = {}
+        for locale in locales:
+            for kind in SCHEMAS:
+                pool = DataPool(kind, locale, seed, size)
+                self.slices[(kind, locale)] = pool.worker_slice(self.worker_index, self.worker_count)
+
+    def __getitem__(self, key):
+        return self.slices[key]
+
+    def user(self, locale="en_US"):
+        return self.slices[("users", locale)].take()
+
+    def address(self, locale="en_US"):
+        return self.slices[("addresses", locale)].take()
+
+    def email(self, locale="en_US"):
+        return self.slices[("emails", locale)].take()["email"]
+
+
+@pytest.fixture(scope="session")
+def data_pools():
+    """Load (or build) every pool ONCE per worker, at session start."""
+    if not FAKER_AVAILABLE:
+        pytest.skip("Faker not installed")
+    start = time.perf_counter()
+    pools = DataPools(POOL_LOCALES)
+    elapsed = time.perf_counter() - start
+
+    sources = {s.pool.source for s in pools.slices.values()}
+    print(f"\n  [data pools] {len(pools.slices)} pools ({', '.join(sorted(sources))}) "
+          f"in {elapsed:.2f}s, worker {pools.worker_index + 1}/{pools.worker_count}")
+    return pools
+
+
+@pytest.fixture
+def pool_user(data_pools):
+    """A fresh English user - different in every test, same on every run."""
+    return data_pools.user("en_US")
+
+
+# ============================================
+# TESTS
+# ============================================
+
+@pytest.mark.skipif(not FAKER_AVAILABLE, reason="Faker not installed")
+def test_same_seed_same_data(tmp_path):
+    first = DataPool("users", seed=7, size=50, cache_dir=str(tmp_path / "a")).load()
+    second = DataPool("users", seed=7, size=50, cache_dir=str(tmp_path / "b")).load()
+    assert first.rows == second.rows
+
+    other_seed = DataPool("users", seed=8, size=50, cache_dir=str(tmp_path / "c")).load()
+    assert other_seed.rows != first.rows
+
+
+@pytest.mark.skipif(not FAKER_AVAILABLE, reason="Faker not installed")
+def test_cache_round_trip(tmp_path):
+    generated = DataPool("addresses", "uk_UA", size=20, cache_dir=str(tmp_path)).load()
+    cached = DataPool("addresses", "uk_UA", size=20, cache_dir=str(tmp_path)).load()
+    assert (generated.source, cached.source) == ("generated", "cache")
+    assert cached.rows == generated.rows
+
+
+@pytest.mark.skipif(not FAKER_AVAILABLE, reason="Faker not installed")
+def test_worker_slices_are_disjoint(tmp_path):
+    pool = DataPool("users", size=400, cache_dir=str(tmp_path))
+    slices = [pool.worker_slice(index, 4) for index in range(4)]
+    emails = [user["email"] for s in slices for user in s.take_many(s.remaining)]
+    assert len(emails) == 400
+    assert len(set(emails)) == 400
+
+
+def test_unique_users(data_pools):
+    users = [data_pools.user() for _ in range(100)]
+    assert len({u["username"] for u in users}) == 100
+
+
+def test_login_with_pool_user(page: Page, pool_user):
+    """Same as test_login_with_fake_data in 04, without calling Faker."""
+    page.goto(f"{BASE_URL}/login")
+    page.locator("#username").fill(pool_user["username"])
+    page.locator("#password").fill(pool_user["password"])
+    page.locator("button[type='submit']").click()
+    assert "/login" in page.url
+
+
+# ============================================
+# BENCHMARK: PER-CALL FAKER vs POOL
+# ============================================
+
+@pytest.mark.skipif(os.environ.get("RUN_BENCHMARK") != "1", reason="set RUN_BENCHMARK=1")
+@pytest.mark.skipif(not FAKER_AVAILABLE, reason="Faker not installed")
+def test_benchmark_pool_vs_per_call(tmp_path):
+    count = int(os.environ.get("BENCHMARK_RECORDS", "1000"))
+
+    # The user_factory way: Faker(locale) + a dozen calls per user
+    start = time.perf_counter()
+    for i in range(count):
+        make_user(Faker("uk_UA"), i)
+    per_call = time.perf_counter() - start
+
+    # First run: generate and save the pool
+    start = time.perf_counter()
+    DataPool("users", "uk_UA", size=count, cache_dir=str(tmp_path)).load()
+    generate = time.perf_counter() - start
+
+    # Every later run: load from disk and take records
+    start = time.perf_counter()
+    pool_slice = DataPool("users", "uk_UA", size=count, cache_dir=str(tmp_path)).worker_slice()
+    pool_slice.take_many(count)
+    cached = time.perf_counter() - start
+
+    print(f"\n  {count} uk_UA users:")
+    print(f"    per call (new Faker each): {per_call:.2f}s")
+    print(f"    pool, first run:           {generate:.2f}s")
+    print(f"    pool, from cache:          {cached:.3f}s ({per_call / cached:.0f}x faster)")
+
+
+# ============================================
+# KEY POINTS:
+#
+# 1. Build ONE Faker per locale, seed it with seed_instance()
+# 2. Generate in batches, cache on disk (seed + schema in file name)
+# 3. Rows as tuples + field names once = small files, fast loading
+# 4. Number-suffixed usernames are unique without fake.unique
+# 5. Disjoint slice per xdist worker = no collisions in parallel
+# 6. Same seed = same data = reproducible failures
+#
+# Run: pytest 06_faker_data_pools.py -v -s
+# ============================================
@@ -0,0 +1,334 @@
+"""Example 7: Change-Aware Data Cache with Typed, Streaming CSV
+
+Two problems with the loaders in 02_csv_test_data.py and 05_data_fixtures.py:
+
+1. TestData._cache keeps a file FOREVER. Edit users.json while a long
+   session (or a REPL) is running and you still get the old data.
+2. load_csv() returns every row as a dict of STRINGS:
+   `row["should_succeed"] == "true"` everywhere, and a 50 MB CSV becomes
+   hundreds of MB of dicts - in every xdist worker.
+
+This data-source layer:
+- declares column types ONCE in a schema; values are parsed while reading
+- streams rows lazily (iter_csv) when you only need to go through a file
+- stores loaded tables as COLUMNS (array.array for numbers), with
+  __slots__ row objects created on access - a fraction of the memory
+- invalidates cached files when they change: size/mtime first (cheap),
+  then a content hash (a `touch` without changes keeps the cache)
+
+Setup: conftest.py in this folder writes test_data/login_cases.csv
+before collection (see 08_data_materialization.py).
+Run with (from this folder): pytest 07_data_sources.py -v -s
+"""
+import array
+import csv
+import hashlib
+import json
+import os
+import tracemalloc
+
+import pytest
+from playwright.sync_api import Page
+
+
+BASE_URL = "https://the-internet.herokuapp.com"
+
+EXAMPLES_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(EXAMPLES_DIR, "test_data")
+
+# test_data/login_cases.csv is generated by conftest.py before collection
+# (registered in 08_data_materialization.py) - this module only reads it.
+
+
+# ============================================
+# COLUMN TYPES
+# ============================================
+
+def parse_bool(value):
+    value = value.strip().lower()
+    if value in ("true", "yes", "1"):
+        return True
+    if value in ("false", "no", "0", ""):
+        return False
+    raise ValueError(f"not a boolean: {value!r}")
+
+
+# array.array typecode per type: numbers are stored unboxed, 8 bytes each
+ARRAY_TYPECODES = {int: "q", float: "d"}
+
+LOGIN_SCHEMA = {
+    "username": str,
+    "password": str,
+    "should_succeed": parse_bool,
+    "expected_message": str,
+    "attempts": int,
+}
+
+
+# ============================================
+# ROWS AND TABLES
+# ============================================
+
+def make_row_class(fields):
+    """A small class with __slots__: no per-row __dict__, attribute AND
+    row["name"] access (so old dict-style tests keep working)."""
+
+    class Row:
+        __slots__ = tuple(fields)
+
+        def __init__(self, *values):
+            for name, value in zip(self.__slots__, values):
+                setattr(self, name, value)
+
+        def __getitem__(self, name):
+            return getattr(self, name)
+
+        def as_dict(self):
+            return {name: getattr(self, name) for name in self.__slots__}
+
+        def __repr__(self):
+            return f"Row({self.as_dict()})"
+
+    return Row
+
+
+def iter_csv(path, schema):
+    """Stream typed rows one by one - nothing is kept in memory."""
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        missing = set(schema) - set(header)
+        if missing:
+            raise ValueError(f"{os.path.basename(path)}: missing columns {sorted(missing)}")
+
+        fields = list(schema)
+        positions = [header.index(name) for name in fields]
+        parsers = [schema[name] for name in fields]  # looked up once, not per row
+        Row = make_row_class(fields)
+
+        for line_number, record in enumerate(reader, start=2):
+            try:
+                yield Row(*[parse(record[pos]) for parse, pos in zip(parsers, positions)])
+            except (ValueError, IndexError) as error:
+                raise ValueError(f"{os.path.basename(path)}:{line_number}: {error}") from None
+
+
+class Table:
+    """Read-only, column-oriented table: one array/list per column."""
+
+    def __init__(self, schema, rows):
+        self.fields = list(schema)
+        self.Row = make_row_class(self.fields)
+        self.columns = {
+            name: array.array(ARRAY_TYPECODES[kind]) if kind in ARRAY_TYPECODES else []
+            for name, kind in schema.items()
+        }
+        for row in rows:
+            for name in self.fields:
+                self.columns[name].append(getattr(row, name))
+
+    def __len__(self):
+        return len(self.columns[self.fields[0]]) if self.fields else 0
+
+    def __getitem__(self, index):
+        return self.Row(*(self.columns[name][index] for name in self.fields))
+
+    def __iter__(self):
+        return (self[index] for index in range(len(self)))
+
+    def column(self, name):
+        return self.columns[name]
+
+    def where(self, **conditions):
+        return [row for row in self if all(row[k] == v for k, v in conditions.items())]
+
+
+# ============================================
+# CHANGE-AWARE CACHE
+# ============================================
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class CacheEntry:
+    __slots__ = ("mtime_ns", "size", "digest", "value")
+
+    def __init__(self, mtime_ns, size, digest, value):
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.digest = digest
+        self.value = value
+
+
+class DataSources:
+    """Drop-in for TestData: same classmethods, but cached data follows the file."""
+
+    data_dir = DATA_DIR
+    _cache = {}
+    loads = 0  # how many times a file was really parsed
+
+    @classmethod
+    def _get(cls, filename, key, loader):
+        path = os.path.join(cls.data_dir, filename)
+        stat = os.stat(path)
+        entry = cls._cache.get(key)
+
+        if entry is not None:
+            # Fast path: nothing about the file changed
+            if (entry.mtime_ns, entry.size) == (stat.st_mtime_ns, stat.st_size):
+                return entry.value
+            # mtime changed (touch, git checkout) - but did the CONTENT change?
+            digest = file_hash(path)
+            if digest == entry.digest:
+                entry.mtime_ns, entry.size = stat.st_mtime_ns, stat.st_size
+                return entry.value
+        else:
+            digest = file_hash(path)
+
+        cls.loads += 1
+        value = loader(path)
+        cls._cache[key] = CacheEntry(stat.st_mtime_ns, stat.st_size, digest, value)
+        return value
+
+    @classmethod
+    def load_json(cls, filename):
+        def loader(path):
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        return cls._get(filename, ("json", filename), loader)
+
+    @classmethod
+    def load_csv(cls, filename, schema):
+        """Typed, column-stored table (cached until the file changes)."""
+        key = ("csv", filename, tuple(schema.items()))
+        return cls._get(filename, key, lambda path: Table(schema, iter_csv(path, schema)))
+
+    @classmethod
+    def iter_csv(cls, filename, schema):
+        """Typed rows streamed from disk (not cached) - for one-pass use."""
+        return iter_csv(os.path.join(cls.data_dir, filename), schema)
+
+    @classmethod
+    def clear(cls):
+        cls._cache.clear()
+
+
+# ============================================
+# FIXTURES
+# ============================================
+
+@pytest.fixture(scope="session")
+def data_sources():
+    return DataSources
+
+
+# ============================================
+# TESTS: TYPED DATA-DRIVEN TESTS
+# ============================================
+
+LOGIN_CASES = DataSources.load_csv("login_cases.csv", LOGIN_SCHEMA)
+
+
+# parametrize wants a list: a Table is just iterable (deprecated in pytest 8)
+@pytest.mark.parametrize("case", list(LOGIN_CASES), ids=lambda c: f"{c.username}-{c.attempts}")
+def test_login_from_typed_csv(page: Page, case):
+    """No `== "true"` and no int() - the schema already did it."""
+    for _ in range(case.attempts):
+        page.goto(f"{BASE_URL}/login")
+        page.locator("#username").fill(case.username)
+        page.locator("#password").fill(case.password)
+        page.locator("button[type='submit']").click()
+
+    assert ("/secure" in page.url) is case.should_succeed
+    assert case.expected_message in page.locator("#flash").text_content()
+
+
+def test_values_are_typed():
+    first = LOGIN_CASES[0]
+    assert first.should_succeed is True
+    assert first["attempts"] == 1
+    assert sum(LOGIN_CASES.column("attempts")) == 4
+    assert len(LOGIN_CASES.where(should_succeed=False)) == 2
+
+
+def test_bad_value_reports_line(tmp_path):
+    path = tmp_path / "broken.csv"
+    path.write_text("username,password,should_succeed,expected_message,attempts\n"
+                    "a,b,maybe,c,1\n")
+    with pytest.raises(ValueError, match="broken.csv:2"):
+        list(iter_csv(str(path), LOGIN_SCHEMA))
+
+
+# ============================================
+# TESTS: INVALIDATION
+# ============================================
+
+def test_cache_follows_the_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(DataSources, "data_dir", str(tmp_path))  # not the real test_data/
+    filename = "cache_demo.json"
+    path = os.path.join(tmp_path, filename)
+    with open(path, "w") as f:
+        json.dump({"version": 1}, f)
+    DataSources.clear()
+
+    assert DataSources.load_json(filename)["version"] == 1
+    loads = DataSources.loads
+
+    # touch: new mtime, same content -> hash matches, no re-parse
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10**9))
+    assert DataSources.load_json(filename)["version"] == 1
+    assert DataSources.loads == loads
+
+    # real edit -> reloaded
+    with open(path, "w") as f:
+        json.dump({"version": 2}, f)
+    assert DataSources.load_json(filename)["version"] == 2
+    assert DataSources.loads == loads + 1
+
+
+# ============================================
+# TESTS: MEMORY - DICTS vs COLUMNS
+# ============================================
+
+def test_memory_dicts_vs_columns(tmp_path):
+    path = tmp_path / "big.csv"
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["username", "password", "should_succeed", "expected_message", "attempts"])
+        for i in range(50_000):
+            writer.writerow([f"user{i}", "secret", i % 2 == 0, "ok", i % 5])
+
+    def measure(load):
+        tracemalloc.start()
+        data = load()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return data, size
+
+    with open(path, "r", encoding="utf-8") as f:
+        dicts, dict_bytes = measure(lambda: list(csv.DictReader(f)))
+    table, table_bytes = measure(lambda: Table(LOGIN_SCHEMA, iter_csv(str(path), LOGIN_SCHEMA)))
+
+    print(f"\n  50,000 rows: list of dicts {dict_bytes / 1e6:.1f} MB, "
+          f"column table {table_bytes / 1e6:.1f} MB")
+    assert len(table) == len(dicts)
+    assert table_bytes < dict_bytes
+
+
+# ============================================
+# KEY POINTS:
+#
+# 1. Declare column types once - parse while reading
+# 2. iter_csv() streams: one row in memory at a time
+# 3. Columns + array.array store numbers without Python objects
+# 4. __slots__ rows: no __dict__ per row, row.name and row["name"]
+# 5. Cache check: size/mtime first, content hash only if they changed
+# 6. A touched-but-unchanged file is NOT re-parsed
+#
+# Run: pytest 07_data_sources.py -v -s
+# ============================================
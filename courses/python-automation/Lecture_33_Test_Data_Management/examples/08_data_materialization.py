@@ -0,0 +1,303 @@
+"""Example 8: Build-Once Data Files (No Writing at Import Time)
+
+02_csv_test_data.py and 05_data_fixtures.py (and 04_dynamic_generation.py
+in Lecture 34) used to write their JSON/CSV files at MODULE IMPORT. That means:
+- the files are rewritten on every collection, even when nothing changed
+- with `pytest -n 4` four workers write the same file at the same time,
+  and a worker can read a half-written CSV
+- a new mtime on every run defeats caches that watch the file
+  (07_data_sources.py)
+
+Instead:
+1. REGISTER every generated file once: name + function that returns content
+2. MATERIALIZE them in one step before the tests (pytest_configure)
+3. compare a content HASH with the manifest, and check that the file on
+   disk is still the one we wrote - unchanged files are skipped, a
+   truncated or edited file is written again
+4. write changed files to a temp file, then os.replace() (atomic)
+5. hold a cross-process FileLock while writing, so only one process works
+
+Collection just reads the files.
+
+Setup: conftest.py in this folder calls materialize() from its
+pytest_configure, so 02_csv_test_data.py, 05_data_fixtures.py and
+07_data_sources.py find their files before they are collected. The
+Lecture 34 conftest.py does the same for 04_dynamic_generation.py.
+Install: pip install filelock
+Run with: pytest 08_data_materialization.py -v -s
+"""
+import csv
+import hashlib
+import io
+import json
+import os
+
+import pytest
+from filelock import FileLock
+from playwright.sync_api import Page
+
+
+BASE_URL = "https://the-internet.herokuapp.com"
+
+EXAMPLES_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(EXAMPLES_DIR, "test_data")
+
+MANIFEST = ".manifest.json"
+
+
+# ============================================
+# REGISTRY
+# ============================================
+
+REGISTRY = {}
+
+
+def data_file(name):
+    """Decorator: register a function that returns the file's content."""
+    def register(generator):
+        REGISTRY[name] = generator
+        return generator
+    return register
+
+
+def to_json(data):
+    return json.dumps(data, indent=2)
+
+
+def to_csv(rows):
+    buffer = io.StringIO(newline="")
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+
+# The same data 02_csv_test_data.py and 05_data_fixtures.py write on import
+
+@data_file("test_users.json")
+def users_json():  # not "test_users": pytest would collect it
+    return to_json({
+        "valid": {"username": "tomsmith", "password": "SuperSecretPassword!"},
+        "invalid": [
+            {"username": "wrong", "password": "wrong", "id": "bad_both"},
+            {"username": "tomsmith", "password": "bad", "id": "bad_password"},
+        ],
+    })
+
+
+@data_file("pages.csv")
+def pages_csv():
+    return to_csv([
+        ["path", "heading_tag", "heading_text"],
+        ["/checkboxes", "h3", "Checkboxes"],
+        ["/dropdown", "h3", "Dropdown List"],
+        ["/inputs", "h3", "Inputs"],
+    ])
+
+
+@data_file("login_data.csv")
+def login_data_csv():
+    return to_csv([
+        ["username", "password", "should_succeed", "expected_message"],
+        ["tomsmith", "SuperSecretPassword!", "true", "You logged into a secure area!"],
+        ["wrong", "wrong", "false", "Your username is invalid!"],
+        ["tomsmith", "bad_password", "false", "Your password is invalid!"],
+    ])
+
+
+# The typed login cases 07_data_sources.py parametrizes over
+
+@data_file("login_cases.csv")
+def login_cases_csv():
+    return to_csv([
+        ["username", "password", "should_succeed", "expected_message", "attempts"],
+        ["tomsmith", "SuperSecretPassword!", "true", "You logged into a secure area!", "1"],
+        ["wrong", "wrong", "false", "Your username is invalid!", "1"],
+        ["tomsmith", "bad_password", "false", "Your password is invalid!", "2"],
+    ])
+
+
+@data_file("dropdown_data.csv")
+def dropdown_data_csv():
+    return to_csv([
+        ["value", "expected_text"],
+        ["1", "Option 1"],
+        ["2", "Option 2"],
+    ])
+
+
+# ============================================
+# MATERIALIZE
+# ============================================
+
+def content_hash(content):
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def read_manifest(data_dir):
+    try:
+        with open(os.path.join(data_dir, MANIFEST), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_atomic(path, content):
+    """Readers see the old file or the new file - never half of one."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def is_current(path, digest, entry):
+    """True if the file on disk holds exactly `digest`.
+
+    Same size and mtime as when we wrote it -> trust the manifest (no read).
+    Otherwise (truncated, edited, checked out again) hash the real file.
+    """
+    if not isinstance(entry, dict) or entry.get("sha256") != digest:
+        return False
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return False
+    if stat.st_size == entry["size"] and stat.st_mtime_ns == entry["mtime_ns"]:
+        return True
+    return file_hash(path) == digest
+
+
+def manifest_entry(path, digest):
+    stat = os.stat(path)
+    return {"sha256": digest, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def outdated(data_dir, contents, manifest):
+    return [
+        name for name, content in contents.items()
+        if not is_current(os.path.join(data_dir, name), content_hash(content), manifest.get(name))
+    ]
+
+
+def materialize(data_dir=DATA_DIR, registry=None):
+    """Write every registered file that is missing or changed.
+
+    Returns the list of files written (empty when all were up to date).
+    """
+    registry = REGISTRY if registry is None else registry
+    os.makedirs(data_dir, exist_ok=True)
+    contents = {name: generator() for name, generator in registry.items()}
+
+    # Fast path, no lock: everything already up to date
+    if not outdated(data_dir, contents, read_manifest(data_dir)):
+        return []
+
+    with FileLock(os.path.join(data_dir, ".materialize.lock")):
+        # Check again: another process may have written while we waited
+        manifest = read_manifest(data_dir)
+        written = outdated(data_dir, contents, manifest)
+        for name in written:
+            path = os.path.join(data_dir, name)
+            write_atomic(path, contents[name])
+            manifest[name] = manifest_entry(path, content_hash(contents[name]))
+        if written:
+            write_atomic(os.path.join(data_dir, MANIFEST), json.dumps(manifest, indent=2))
+    return written
+
+
+# ============================================
+# FIXTURE
+# ============================================
+# The hook that runs this before collection lives in conftest.py
+# (pytest_configure). For a test that needs the files without the
+# conftest, a session fixture does the same - once, never at import.
+
+@pytest.fixture(scope="session")
+def data_dir():
+    materialize()
+    return DATA_DIR
+
+
+# ============================================
+# TESTS
+# ============================================
+
+def load_csv(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def test_dropdown_from_csv(page: Page, data_dir):
+    """Reads the file - does not write it."""
+    for row in load_csv(os.path.join(data_dir, "dropdown_data.csv")):
+        page.goto(f"{BASE_URL}/dropdown")
+        page.locator("#dropdown").select_option(row["value"])
+        selected = page.locator("#dropdown option:checked").text_content()
+        assert selected == row["expected_text"]
+
+
+def test_second_run_writes_nothing(tmp_path):
+    data_dir = str(tmp_path)
+    assert sorted(materialize(data_dir)) == sorted(REGISTRY)
+    mtime = os.stat(os.path.join(data_dir, "pages.csv")).st_mtime_ns
+
+    assert materialize(data_dir) == []
+    assert os.stat(os.path.join(data_dir, "pages.csv")).st_mtime_ns == mtime
+
+
+def test_only_changed_file_is_rewritten(tmp_path):
+    data_dir = str(tmp_path)
+    materialize(data_dir)
+
+    registry = dict(REGISTRY)
+    registry["pages.csv"] = lambda: to_csv([["path"], ["/login"]])
+    assert materialize(data_dir, registry) == ["pages.csv"]
+
+
+def test_deleted_file_is_restored(tmp_path):
+    data_dir = str(tmp_path)
+    materialize(data_dir)
+    os.remove(os.path.join(data_dir, "login_data.csv"))
+
+    assert materialize(data_dir) == ["login_data.csv"]
+    assert not [name for name in os.listdir(data_dir) if name.endswith(".tmp")]
+
+
+def test_corrupted_file_is_rewritten(tmp_path):
+    """Manifest says up to date, but the file on disk was truncated."""
+    data_dir = str(tmp_path)
+    materialize(data_dir)
+    path = os.path.join(data_dir, "pages.csv")
+    with open(path, "w") as f:
+        f.write("path,heading")
+
+    assert materialize(data_dir) == ["pages.csv"]
+    assert file_hash(path) == content_hash(REGISTRY["pages.csv"]())
+
+
+def test_touched_but_unchanged_file_is_kept(tmp_path):
+    """A new mtime alone (e.g. git checkout) is not a reason to rewrite."""
+    data_dir = str(tmp_path)
+    materialize(data_dir)
+    path = os.path.join(data_dir, "pages.csv")
+    os.utime(path, ns=(0, 0))
+
+    assert materialize(data_dir) == []
+
+
+# ============================================
+# KEY POINTS:
+#
+# 1. Never write data files at import - collection should only read
+# 2. One registry of generated files: name -> content function
+# 3. Content hash + manifest: unchanged files are not touched,
+#    and a file changed on disk is caught by size/mtime, then hash
+# 4. Temp file + os.replace(): no half-written CSVs
+# 5. FileLock + check again inside the lock: one writer at a time
+# 6. Untouched files keep their mtime, so file-watching caches stay warm
+#
+# Run: pytest 08_data_materialization.py -v -s
+# ============================================
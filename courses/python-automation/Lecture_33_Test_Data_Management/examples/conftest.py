@@ -0,0 +1,28 @@
+"""Shared setup for the Lecture 33 examples.
+
+Builds every file in test_data/ ONCE, before any example is collected,
+with materialize() from 08_data_materialization.py: unchanged files are
+not touched, missing or damaged ones are written atomically under a lock.
+02_csv_test_data.py and 05_data_fixtures.py then only read their files.
+
+Install: pip install filelock
+"""
+import importlib.util
+import os
+
+
+def load_materialization():
+    # "08_..." is not a valid module name for a normal import
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "08_data_materialization.py")
+    spec = importlib.util.spec_from_file_location("data_materialization", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def pytest_configure(config):
+    # Runs once per process before collection. The xdist controller starts
+    # the workers after this, so they normally find everything up to date.
+    written = load_materialization().materialize()
+    if written and not hasattr(config, "workerinput"):
+        print(f"\n  [test data] wrote {', '.join(written)}")
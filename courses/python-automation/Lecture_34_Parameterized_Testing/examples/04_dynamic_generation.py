@@ -3,6 +3,8 @@
 Demonstrates how to generate test cases programmatically
 using pytest_generate_tests hook and data files.
 
+Setup: conftest.py in this folder writes test_data/pages.json and
+test_data/login_cases.csv before collection - this module only reads them.
 Run with: pytest 04_dynamic_generation.py -v --headed -s
 """
 import json
@@ -15,31 +17,15 @@ from playwright.sync_api import Page
 BASE_URL = "https://the-internet.herokuapp.com"
 EXAMPLES_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(EXAMPLES_DIR, "test_data")
-os.makedirs(DATA_DIR, exist_ok=True)
 
 
 # ============================================
-# CREATE SAMPLE DATA FILES
+# SAMPLE DATA FILES
 # ============================================
-
-# pages.json
-pages_data = [
-    {"path": "/login", "heading": "Login Page", "tag": "h2"},
-    {"path": "/checkboxes", "heading": "Checkboxes", "tag": "h3"},
-    {"path": "/dropdown", "heading": "Dropdown List", "tag": "h3"},
-    {"path": "/inputs", "heading": "Inputs", "tag": "h3"},
-]
-
-with open(os.path.join(DATA_DIR, "pages.json"), "w") as f:
-    json.dump(pages_data, f, indent=2)
-
-# login_cases.csv
-with open(os.path.join(DATA_DIR, "login_cases.csv"), "w", newline="") as f:
-    writer = csv.writer(f)
-    writer.writerow(["username", "password", "expected_url"])
-    writer.writerow(["tomsmith", "SuperSecretPassword!", "/secure"])
-    writer.writerow(["wrong", "wrong", "/login"])
-    writer.writerow(["tomsmith", "bad", "/login"])
+# pages.json and login_cases.csv are generated by conftest.py (once,
+# atomically, before collection) - see 08_data_materialization.py in
+# Lecture 33. Writing them here, at import, rewrote both files on every
+# collection and let xdist workers race on them.
 
 
 # ============================================
@@ -0,0 +1,296 @@
+"""Example 6: Lazy, Shardable Parametrization for Huge Data Files
+
+pytest_generate_tests in 04_dynamic_generation.py reads EVERY row of the
+data file during collection and keeps it in the test item. With 100,000
+rows, collection alone takes minutes - and every xdist worker (and every
+CI machine) does it again.
+
+Collection only needs two things per row: a stable test ID and a way to
+find the row later. So:
+
+1. build an INDEX once: byte offset + ID of every row (rebuilt only when
+   the data file changes)
+2. at collection, parametrize with offsets (plain ints) and IDs from the
+   index - the rows themselves are not parsed
+3. an indirect fixture seeks to the offset and parses ONE row when the
+   test actually runs
+4. pre-shard: TEST_SHARD=2/4 makes this CI job collect only its quarter of
+   the rows; under xdist, rows are grouped per worker (--dist loadgroup)
+
+Note: the index assumes one CSV row per line (no line breaks in fields).
+The sample CSV and its index are generated into test_data/ (gitignored).
+
+Install: pip install filelock
+Run with: pytest 06_lazy_parametrize.py -v -s
+Bigger data: LAZY_ROWS=100000 pytest 06_lazy_parametrize.py --collect-only -q
+CI shard 2 of 4: TEST_SHARD=2/4 pytest 06_lazy_parametrize.py
+"""
+import csv
+import json
+import os
+import time
+import zlib
+
+import pytest
+from filelock import FileLock
+from playwright.sync_api import Page
+
+
+BASE_URL = "https://the-internet.herokuapp.com"
+EXAMPLES_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(EXAMPLES_DIR, "test_data")
+
+LAZY_ROWS = int(os.environ.get("LAZY_ROWS", "1000"))
+
+
+# ============================================
+# SAMPLE DATA (only written if missing)
+# ============================================
+
+BIG_CSV = os.path.join(DATA_DIR, f"number_cases_{LAZY_ROWS}.csv")
+
+
+def ensure_sample_data(data_path=BIG_CSV, rows=LAZY_ROWS):
+    """Write the sample CSV once, at collection - not at import.
+
+    xdist workers collect at the same time: the FileLock lets one of them
+    write, and temp file + os.replace() means nobody reads half a file.
+    """
+    if os.path.exists(data_path):
+        return
+    os.makedirs(os.path.dirname(data_path), exist_ok=True)
+    with FileLock(data_path + ".lock"):
+        if os.path.exists(data_path):  # another worker wrote it while we waited
+            return
+        tmp_path = f"{data_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["case_id", "number", "expected"])
+            for i in range(rows):
+                writer.writerow([f"n{i:06d}", str(i * 7), str(i * 7)])
+        os.replace(tmp_path, data_path)
+
+
+# ============================================
+# ROW INDEX
+# ============================================
+
+def index_path(data_path):
+    return data_path + ".index.json"
+
+
+def build_index(data_path, id_column):
+    """One pass over the file: byte offset and ID of every row."""
+    offsets, ids = [], []
+    with open(data_path, "rb") as f:
+        header = next(csv.reader([f.readline().decode("utf-8")]))
+        id_position = header.index(id_column)
+        while True:
+            offset = f.tell()
+            line = f.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            offsets.append(offset)
+            ids.append(next(csv.reader([line.decode("utf-8")]))[id_position])
+
+    stat = os.stat(data_path)
+    index = {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "header": header,
+        "offsets": offsets,
+        "ids": ids,
+    }
+    tmp_path = f"{index_path(data_path)}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(index, f)
+    os.replace(tmp_path, index_path(data_path))
+    return index
+
+
+def load_index(data_path, id_column):
+    """Use the saved index if it still matches the data file."""
+    stat = os.stat(data_path)
+    try:
+        with open(index_path(data_path)) as f:
+            index = json.load(f)
+        if (index["size"], index["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+            return index
+    except (OSError, ValueError, KeyError):
+        pass
+    return build_index(data_path, id_column)
+
+
+# ============================================
+# LAZY ROW READER
+# ============================================
+
+class RowReader:
+    """Reads single rows by offset. One open file per data file per process."""
+
+    _files = {}
+    _headers = {}
+
+    @classmethod
+    def read(cls, data_path, offset):
+        if data_path not in cls._files:
+            cls._files[data_path] = open(data_path, "rb")
+            cls._headers[data_path] = next(csv.reader([cls._files[data_path].readline().decode("utf-8")]))
+        f = cls._files[data_path]
+        f.seek(offset)
+        values = next(csv.reader([f.readline().decode("utf-8")]))
+        return dict(zip(cls._headers[data_path], values))
+
+
+# ============================================
+# SHARDING
+# ============================================
+
+def ci_shard():
+    """TEST_SHARD=2/4 -> (1, 4) zero-based; (0, 1) when not set."""
+    value = os.environ.get("TEST_SHARD")
+    if not value:
+        return 0, 1
+    number, count = (int(part) for part in value.split("/"))
+    return number - 1, count
+
+
+def shard_of(row_id, count):
+    """Stable across runs and machines (unlike hash(), which is randomized)."""
+    return zlib.crc32(row_id.encode()) % count
+
+
+# ============================================
+# pytest_generate_tests HOOK
+# ============================================
+# fixture name -> (data file, ID column, how to create it if missing),
+# like the fixturenames checks in 04
+
+LAZY_SOURCES = {
+    "number_case": (BIG_CSV, "case_id", ensure_sample_data),
+}
+
+
+def pytest_generate_tests(metafunc):
+    for fixture_name, (data_path, id_column, ensure) in LAZY_SOURCES.items():
+        if fixture_name not in metafunc.fixturenames:
+            continue
+
+        ensure()
+        index = load_index(data_path, id_column)
+        shard, shard_count = ci_shard()
+        workers = int(os.environ.get("PYTEST_XDIST_WORKER_COUNT", "1"))
+
+        params, ids = [], []
+        for offset, row_id in zip(index["offsets"], index["ids"]):
+            # CI shard: rows of other jobs are never even turned into tests.
+            # (Every xdist worker must collect the SAME tests, so workers
+            # are not filtered - their rows are grouped instead.)
+            if shard_of(row_id, shard_count) != shard:
+                continue
+            if workers > 1:
+                group = f"rows-{shard_of(row_id + ':worker', workers)}"
+                params.append(pytest.param((data_path, offset), marks=pytest.mark.xdist_group(group)))
+            else:
+                params.append((data_path, offset))
+            ids.append(row_id)
+
+        metafunc.parametrize(fixture_name, params, ids=ids, indirect=True)
+
+
+# ============================================
+# FIXTURES: THE ROW IS READ HERE, NOT AT COLLECTION
+# ============================================
+
+@pytest.fixture
+def number_case(request):
+    data_path, offset = request.param
+    return RowReader.read(data_path, offset)
+
+
+@pytest.fixture(scope="module")
+def inputs_page(browser):
+    """One page for all rows - thousands of tests should not each open a page."""
+    page = browser.new_page()
+    page.goto(f"{BASE_URL}/inputs")
+    yield page
+    page.close()
+
+
+# ============================================
+# TESTS
+# ============================================
+
+def test_number_input(inputs_page: Page, number_case):
+    input_field = inputs_page.locator("input[type='number']")
+    input_field.fill(number_case["number"])
+    assert input_field.input_value() == number_case["expected"]
+
+
+def test_index_matches_file(tmp_path):
+    data_path = str(tmp_path / "rows.csv")
+    with open(data_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["case_id", "text"])
+        writer.writerows([["a", "first"], ["b", "with, comma"], ["c", "ünïcödé"]])
+
+    index = load_index(data_path, "case_id")
+    assert index["ids"] == ["a", "b", "c"]
+    assert RowReader.read(data_path, index["offsets"][2]) == {"case_id": "c", "text": "ünïcödé"}
+
+    # Changing the file invalidates the index
+    with open(data_path, "a", newline="") as f:
+        csv.writer(f).writerow(["d", "new row"])
+    assert load_index(data_path, "case_id")["ids"] == ["a", "b", "c", "d"]
+
+
+def test_shards_cover_every_row_once():
+    ids = [f"n{i:06d}" for i in range(1000)]
+    shards = [[i for i in ids if shard_of(i, 4) == s] for s in range(4)]
+    assert sorted(sum(shards, [])) == ids
+    assert all(150 < len(s) < 350 for s in shards)  # roughly even
+
+
+def test_sample_data_written_once(tmp_path):
+    data_path = str(tmp_path / "data" / "cases.csv")
+    ensure_sample_data(data_path, rows=10)
+    mtime = os.stat(data_path).st_mtime_ns
+
+    ensure_sample_data(data_path, rows=10)
+    assert os.stat(data_path).st_mtime_ns == mtime
+    assert load_index(data_path, "case_id")["ids"][-1] == "n000009"
+    assert not [name for name in os.listdir(tmp_path / "data") if name.endswith(".tmp")]
+
+
+def test_collection_cost():
+    """What collection pays per run: eager parse vs saved index."""
+    ensure_sample_data()
+    start = time.perf_counter()
+    with open(BIG_CSV) as f:
+        rows = list(csv.DictReader(f))
+    eager = time.perf_counter() - start
+
+    load_index(BIG_CSV, "case_id")  # make sure it exists
+    start = time.perf_counter()
+    index = load_index(BIG_CSV, "case_id")
+    lazy = time.perf_counter() - start
+
+    print(f"\n  {len(rows)} rows: eager parse {eager * 1000:.1f}ms, "
+          f"index load {lazy * 1000:.1f}ms")
+    assert len(index["ids"]) == len(rows)
+
+
+# ============================================
+# KEY POINTS:
+#
+# 1. Collection needs IDs, not data - parametrize with offsets
+# 2. Build the index once; rebuild only when the file changes
+# 3. indirect=True: the fixture reads the row when the test runs
+# 4. Use crc32, not hash(), for shards - it is stable across processes
+# 5. CI shards filter at collection; xdist workers must all collect the same
+# 6. Share one page across rows (module scope) for big data sets
+#
+# Run: pytest 06_lazy_parametrize.py -v -s
+# ============================================
@@ -0,0 +1,51 @@
+"""Shared setup for the Lecture 34 examples.
+
+Writes the data files 04_dynamic_generation.py parametrizes over into
+test_data/ once, before collection, with materialize() from
+Lecture 33's 08_data_materialization.py: unchanged files are left alone,
+missing or damaged ones are written atomically under a lock.
+
+Install: pip install filelock
+"""
+import importlib.util
+import os
+
+EXAMPLES_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(EXAMPLES_DIR, "test_data")
+MATERIALIZATION = os.path.join(EXAMPLES_DIR, "..", "..", "Lecture_33_Test_Data_Management",
+                               "examples", "08_data_materialization.py")
+
+
+def load_materialization():
+    # "08_..." is not a valid module name for a normal import
+    spec = importlib.util.spec_from_file_location("data_materialization", MATERIALIZATION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def registry(m):
+    """name -> function returning the content (the data 04 used to write on import)."""
+    return {
+        "pages.json": lambda: m.to_json([
+            {"path": "/login", "heading": "Login Page", "tag": "h2"},
+            {"path": "/checkboxes", "heading": "Checkboxes", "tag": "h3"},
+            {"path": "/dropdown", "heading": "Dropdown List", "tag": "h3"},
+            {"path": "/inputs", "heading": "Inputs", "tag": "h3"},
+        ]),
+        "login_cases.csv": lambda: m.to_csv([
+            ["username", "password", "expected_url"],
+            ["tomsmith", "SuperSecretPassword!", "/secure"],
+            ["wrong", "wrong", "/login"],
+            ["tomsmith", "bad", "/login"],
+        ]),
+    }
+
+
+def pytest_configure(config):
+    # Runs once per process before collection; xdist workers start after
+    # the controller, so they normally find everything up to date.
+    m = load_materialization()
+    written = m.materialize(DATA_DIR, registry(m))
+    if written and not hasattr(config, "workerinput"):
+        print(f"\n  [test data] wrote {', '.join(written)}")
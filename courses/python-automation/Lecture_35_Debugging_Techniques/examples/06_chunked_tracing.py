@@ -0,0 +1,281 @@
+"""Example 6: Chunked Tracing - Keep Traces Only for Failures
+
+debug_page in 05_debug_strategies.py and traced_page in Lecture 32 call
+tracing.start() and tracing.stop() for EVERY test. Starting a trace has a
+fixed cost, and stop(path=...) serializes screenshots, snapshots and
+sources into a zip - even when the test passed and nobody will open it.
+
+Playwright can split one trace into CHUNKS:
+- tracing.start() ONCE per context
+- tracing.start_chunk() when a test (or a step) begins
+- tracing.stop_chunk(path=...) when it failed  -> zip written
+- tracing.stop_chunk()          when it passed -> chunk dropped, nothing written
+
+The fixture reports how long the start_chunk()/stop_chunk() calls take.
+That is NOT the whole cost: snapshots and screenshots are captured during
+the test's own actions. RUN_BENCHMARK=1 compares the same flow with no
+tracing, start/stop per test and chunks - use that number to decide
+whether trace-on-failure stays switched on in CI.
+
+Setup: the report hook trace_page reads (item.rep_call) is in conftest.py
+in this folder.
+
+Run with (from this folder): pytest 06_chunked_tracing.py -v -s
+Kept trace: SHOW_FAILURE=1 pytest 06_chunked_tracing.py -v -s
+Per-step chunks: TRACE_CHUNKS=step pytest 06_chunked_tracing.py -v -s
+Benchmark: RUN_BENCHMARK=1 pytest 06_chunked_tracing.py -k benchmark -s
+"""
+import os
+import re
+import time
+from contextlib import contextmanager
+
+import pytest
+from playwright.sync_api import Browser, BrowserContext, Page
+
+
+BASE_URL = "https://the-internet.herokuapp.com"
+TRACE_DIR = "traces"
+TRACE_CHUNKS = os.getenv("TRACE_CHUNKS", "test")  # "test" or "step"
+
+
+# ============================================
+# CHUNKED TRACER
+# ============================================
+
+class ChunkedTracer:
+    """One trace per context, one chunk per test (or per step)."""
+
+    def __init__(self, context: BrowserContext, trace_dir=TRACE_DIR):
+        self.context = context
+        self.trace_dir = trace_dir
+        self.chunk_time = {}  # test name -> seconds in start_chunk/stop_chunk calls
+        self.saved = []
+        self.current = None
+        self.step_name = None
+
+        start = time.perf_counter()
+        context.tracing.start(screenshots=True, snapshots=True, sources=False)
+        self.startup = time.perf_counter() - start
+
+    def _timed(self, action, *args, **kwargs):
+        start = time.perf_counter()
+        action(*args, **kwargs)
+        self.chunk_time[self.current] = self.chunk_time.get(self.current, 0.0) + time.perf_counter() - start
+
+    def begin(self, test_name):
+        self.current = test_name
+        self.step_name = None
+        self._timed(self.context.tracing.start_chunk, title=test_name)
+
+    def end(self, failed):
+        """Save the chunk if the test failed, drop it otherwise."""
+        if failed:
+            path = self.path(self.current, self.step_name)
+            self._timed(self.context.tracing.stop_chunk, path=path)
+            self.saved.append(path)
+        else:
+            self._timed(self.context.tracing.stop_chunk)
+
+    @contextmanager
+    def step(self, name):
+        """With TRACE_CHUNKS=step, a passing step's chunk is dropped as soon
+        as the step ends - a failure trace then holds just the failing step."""
+        if TRACE_CHUNKS != "step":
+            yield
+            return
+        # Drop everything recorded before this step and start a fresh chunk
+        self._timed(self.context.tracing.stop_chunk)
+        self.step_name = name
+        self._timed(self.context.tracing.start_chunk, title=f"{self.current} / {name}")
+        yield  # an exception here leaves the chunk open; end(failed=True) saves it
+
+    def path(self, test_name, step_name=None):
+        name = re.sub(r"[^\w.-]+", "_", test_name)
+        if step_name:
+            name += "__" + re.sub(r"[^\w.-]+", "_", step_name)
+        os.makedirs(self.trace_dir, exist_ok=True)
+        return os.path.join(self.trace_dir, f"{name}.zip")
+
+    def reset(self):
+        """Leave nothing behind in the shared context for the next test."""
+        for page in list(self.context.pages):  # popups opened by the test too
+            page.close()
+        self.context.clear_cookies()
+        self.context.clear_permissions()
+        # localStorage lives per origin and can only be cleared from a page
+        # on that origin: serve an empty document there instead of the app
+        origins = [entry["origin"] for entry in self.context.storage_state()["origins"]]
+        if origins:
+            page = self.context.new_page()
+            page.route("**/*", lambda route: route.fulfill(body="<html></html>", content_type="text/html"))
+            for origin in origins:
+                page.goto(origin)
+                page.evaluate("() => { localStorage.clear(); sessionStorage.clear(); }")
+            page.close()
+
+    def close(self):
+        self.context.tracing.stop()  # no path: the last (empty) state is discarded
+
+    def report(self):
+        if not self.chunk_time:
+            return
+        values = sorted(self.chunk_time.values())
+        total = sum(values)
+        print(f"\n  [tracing] start once: {self.startup * 1000:.0f}ms")
+        print(f"  [tracing] {len(values)} tests, chunk start/stop time: "
+              f"avg {total / len(values) * 1000:.1f}ms, "
+              f"max {values[-1] * 1000:.1f}ms, total {total:.2f}s")
+        print("  [tracing] (snapshots taken during the tests are not included - RUN_BENCHMARK=1 measures them)")
+        for path in self.saved:
+            print(f"  [tracing] kept: {path}  (playwright show-trace {path})")
+
+
+# ============================================
+# FIXTURES (put these in conftest.py)
+# ============================================
+
+@pytest.fixture(scope="session")
+def traced_context(browser: Browser):
+    """One context for the session - tracing is started only once."""
+    context = browser.new_context()
+    tracer = ChunkedTracer(context)
+    yield context, tracer
+    tracer.close()
+    tracer.report()
+    context.close()
+
+
+@pytest.fixture
+def trace_page(traced_context, request):
+    """A fresh page in the traced context; trace kept only on failure."""
+    context, tracer = traced_context
+    tracer.begin(request.node.name)
+    page = context.new_page()
+    yield page
+
+    reports = [getattr(request.node, f"rep_{when}", None) for when in ("setup", "call")]
+    failed = any(rep is not None and rep.failed for rep in reports)
+    tracer.end(failed)
+
+    # The context is shared: pages, cookies, storage and permissions go
+    tracer.reset()
+
+
+@pytest.fixture
+def tracer(traced_context):
+    """For step chunks in tests: with tracer.step("login"): ..."""
+    return traced_context[1]
+
+
+# pytest_runtest_makereport (sets item.rep_call) is in conftest.py
+
+
+# ============================================
+# TESTS
+# ============================================
+
+def test_login_passes(trace_page: Page, tracer):
+    """Passing test: its chunk is dropped, no zip is written."""
+    with tracer.step("open login"):
+        trace_page.goto(f"{BASE_URL}/login")
+    with tracer.step("submit"):
+        trace_page.locator("#username").fill("tomsmith")
+        trace_page.locator("#password").fill("SuperSecretPassword!")
+        trace_page.locator("button[type='submit']").click()
+    assert "/secure" in trace_page.url
+
+
+@pytest.mark.parametrize("run", range(10))
+def test_many_passing(trace_page: Page, run):
+    trace_page.goto(f"{BASE_URL}/checkboxes")
+    assert trace_page.locator("input[type='checkbox']").count() == 2
+
+
+@pytest.mark.skipif(os.getenv("SHOW_FAILURE") != "1", reason="set SHOW_FAILURE=1 to see a kept trace")
+def test_failing_keeps_trace(trace_page: Page, tracer):
+    with tracer.step("open login"):
+        trace_page.goto(f"{BASE_URL}/login")
+    with tracer.step("wrong password"):
+        trace_page.locator("#username").fill("tomsmith")
+        trace_page.locator("#password").fill("wrong")
+        trace_page.locator("button[type='submit']").click()
+        assert "/secure" in trace_page.url
+
+
+def test_reset_leaves_nothing_behind(traced_context):
+    """Storage and permissions of one test must not reach the next one."""
+    context, tracer = traced_context
+    page = context.new_page()
+    page.goto(f"{BASE_URL}/login")
+    page.evaluate("() => localStorage.setItem('token', 'secret')")
+    context.grant_permissions(["geolocation"], origin=BASE_URL)
+
+    tracer.reset()
+
+    assert context.pages == []
+    assert context.storage_state() == {"cookies": [], "origins": []}
+    page = context.new_page()
+    page.goto(f"{BASE_URL}/login")
+    state = page.evaluate("() => navigator.permissions.query({name: 'geolocation'}).then(p => p.state)")
+    assert state == "prompt"
+    assert page.evaluate("() => localStorage.getItem('token')") is None
+    tracer.reset()
+
+
+# ============================================
+# BENCHMARK: NO TRACE vs START/STOP PER TEST vs CHUNKS
+# ============================================
+
+@pytest.mark.skipif(os.getenv("RUN_BENCHMARK") != "1", reason="set RUN_BENCHMARK=1")
+def test_benchmark_tracing_modes(browser: Browser, tmp_path):
+    runs = int(os.getenv("BENCHMARK_RUNS", "20"))
+
+    def flow(page):
+        page.goto(f"{BASE_URL}/login")
+        page.locator("#username").fill("tomsmith")
+        page.locator("button[type='submit']").click()
+
+    def measure(mode):
+        context = browser.new_context()
+        if mode == "chunks":
+            context.tracing.start(screenshots=True, snapshots=True)
+        start = time.perf_counter()
+        for i in range(runs):
+            if mode == "full":
+                context.tracing.start(screenshots=True, snapshots=True, sources=True)
+            elif mode == "chunks":
+                context.tracing.start_chunk()
+            page = context.new_page()
+            flow(page)
+            page.close()
+            if mode == "full":
+                context.tracing.stop(path=str(tmp_path / f"full_{i}.zip"))
+            elif mode == "chunks":
+                context.tracing.stop_chunk()  # passing test: dropped
+        elapsed = time.perf_counter() - start
+        if mode == "chunks":
+            context.tracing.stop()
+        context.close()
+        return elapsed
+
+    results = {mode: measure(mode) for mode in ("none", "full", "chunks")}
+    base = results["none"]
+    print(f"\n  {runs} passing tests:")
+    for mode, elapsed in results.items():
+        print(f"    {mode:<7} {elapsed:6.2f}s  (+{(elapsed - base) / runs * 1000:.0f}ms per test)")
+
+
+# ============================================
+# KEY POINTS:
+#
+# 1. tracing.start() once per context, start_chunk() per test
+# 2. stop_chunk() without path = passing test costs no zip at all
+# 3. stop_chunk(path=...) only for failures
+# 4. Step chunks: a failure trace contains only the failing step
+# 5. Shared context -> clear pages, cookies, storage, permissions between tests
+# 6. Chunk start/stop time is not the whole cost - benchmark with and
+#    without tracing before deciding what runs in CI
+#
+# Run: pytest 06_chunked_tracing.py -v -s
+# ============================================
@@ -0,0 +1,406 @@
+"""Example 7: Flake Database - Rerun Only What History Says Is Flaky
+
+retry_on_failure (Lecture 11), click_with_retry (Lecture 8) and
+`pytest --reruns 3` (05_debug_strategies.py) retry EVERY failure. A test
+that is really broken then fails 4 times instead of once, and a suite
+with ten broken tests wastes minutes before it turns red.
+
+This plugin keeps a small SQLite database of past outcomes per test:
+    passed | flaky (failed, then passed on a rerun) | failed
+
+and uses the last runs of each test to decide:
+    new         few runs recorded    -> 1 rerun, to find out
+    stable      never flaky          -> no rerun
+    flaky       flaky now and then   -> up to --flake-reruns reruns
+    quarantine  flaky in >= 30% runs -> moved to a low-priority shard
+    broken      failed the last 3    -> no rerun, fail fast
+
+All reruns of a run share a wall-clock budget (--retry-budget seconds);
+when it is used up, failures are reported as they are.
+
+Quarantined tests run LAST, under xdist_group("quarantine"). They are
+still rerun; only if the LAST attempt fails is the failure reported as
+xfail, so it doesn't break the build - and it is still recorded as a
+failure (or as flaky, if a rerun passed). Run them in a separate CI job:
+    pytest --flake-db --quarantine only
+
+Setup: copy this file to conftest.py (hooks only work in conftest/plugins)
+Run with:
+    pytest --flake-db
+    pytest --flake-db --retry-budget 120 --flake-reruns 2
+    pytest --flake-db --quarantine skip     # main CI job
+    pytest --flake-db --quarantine only     # low-priority job
+Report: python 07_flake_database.py report
+Test the plugin itself: pytest 07_flake_database.py -v
+"""
+import argparse
+import os
+import re
+import sqlite3
+import subprocess
+import sys
+import textwrap
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import pytest
+from _pytest.runner import runtestprotocol
+
+
+DEFAULT_DB = ".flake_history.sqlite"
+WINDOW = 20               # rolling window: the last 20 runs of each test
+MIN_RUNS = 3              # fewer runs than this = "new"
+QUARANTINE_RATE = 0.3     # flaky in 30% of the window = chronic
+BROKEN_AFTER = 3          # failed the last 3 runs = broken, don't rerun
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL,
+    retry_seconds REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS outcomes (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    nodeid TEXT NOT NULL,
+    outcome TEXT NOT NULL,          -- passed / flaky / failed
+    attempts INTEGER NOT NULL,
+    retry_seconds REAL NOT NULL,
+    PRIMARY KEY (run_id, nodeid)
+);
+CREATE INDEX IF NOT EXISTS outcomes_nodeid ON outcomes (nodeid, run_id);
+"""
+
+HISTORY_SQL = """
+WITH recent AS (
+    SELECT nodeid, outcome,
+           ROW_NUMBER() OVER (PARTITION BY nodeid ORDER BY run_id DESC) AS age
+    FROM outcomes
+)
+SELECT nodeid,
+       COUNT(*) AS runs,
+       SUM(outcome = 'flaky') AS flaky,
+       SUM(outcome = 'failed') AS failed,
+       SUM(outcome = 'failed' AND age <= :broken_after) AS recent_failed
+FROM recent
+WHERE age <= :window
+GROUP BY nodeid
+"""
+
+
+def clean_nodeid(nodeid):
+    """Under --dist loadgroup xdist appends '@quarantine' to the node id."""
+    return re.sub(r"@quarantine$", "", nodeid)
+
+
+# ============================================
+# FLAKE DATABASE
+# ============================================
+
+class FlakeDB:
+    def __init__(self, path=DEFAULT_DB):
+        self.db = sqlite3.connect(path, timeout=30)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def history(self, window=WINDOW):
+        """{nodeid: row} with runs/flaky/failed counts over each test's last `window` runs."""
+        rows = self.db.execute(HISTORY_SQL, {"window": window, "broken_after": BROKEN_AFTER})
+        return {row["nodeid"]: row for row in rows}
+
+    def save_run(self, outcomes, retry_seconds):
+        """outcomes: {nodeid: (outcome, attempts, retry_seconds)} - one transaction."""
+        with self.db:
+            run_id = self.db.execute("INSERT INTO runs (started_at, retry_seconds) VALUES (?, ?)",
+                                     (time.time(), retry_seconds)).lastrowid
+            self.db.executemany(
+                "INSERT INTO outcomes (run_id, nodeid, outcome, attempts, retry_seconds) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(run_id, nodeid, *values) for nodeid, values in outcomes.items()])
+        return run_id
+
+    def report(self, limit=20):
+        history = self.history()
+        ranked = sorted(history.values(), key=lambda r: -r["flaky"] / r["runs"])
+        return [(row["nodeid"], classify(row)[0], row["flaky"], row["failed"], row["runs"])
+                for row in ranked[:limit] if row["flaky"] or row["failed"]]
+
+
+def classify(row, max_reruns=2):
+    """(category, reruns) for one test's history row (None = never seen)."""
+    if row is None or row["runs"] < MIN_RUNS:
+        return "new", 1
+    if row["recent_failed"] >= BROKEN_AFTER:
+        return "broken", 0
+    if row["flaky"] / row["runs"] >= QUARANTINE_RATE:
+        return "quarantine", max_reruns
+    if row["flaky"] or row["failed"]:
+        return "flaky", max_reruns
+    return "stable", 0
+
+
+# ============================================
+# PYTEST PLUGIN
+# ============================================
+
+def pytest_addoption(parser):
+    group = parser.getgroup("flake-db")
+    group.addoption("--flake-db", action="store_true",
+                    help="Rerun and quarantine tests based on their flake history")
+    group.addoption("--flake-db-path", default=DEFAULT_DB)
+    group.addoption("--flake-reruns", type=int, default=2,
+                    help="Max reruns for tests with a flaky history")
+    group.addoption("--retry-budget", type=float, default=300.0,
+                    help="Wall-clock seconds all reruns of the run may use together")
+    group.addoption("--quarantine", choices=("run", "skip", "only"), default="run",
+                    help="run: last, failures as xfail | skip: deselect | only: just these")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "quarantine: chronically flaky, set by the flake database")
+    if config.getoption("--flake-db"):
+        config.pluginmanager.register(FlakePlugin(config), "flake_db")
+
+
+class FlakePlugin:
+    """Workers classify and rerun; the controller (or the only process) records."""
+
+    def __init__(self, config):
+        self.config = config
+        self.path = config.getoption("--flake-db-path")
+        self.max_reruns = config.getoption("--flake-reruns")
+        self.mode = config.getoption("--quarantine")
+        workerinput = getattr(config, "workerinput", None)
+        self.is_worker = workerinput is not None
+        workers = workerinput["workercount"] if self.is_worker else 1
+        # Every xdist worker gets its share of the run-level budget
+        self.retry_budget = config.getoption("--retry-budget") / workers
+        self.retry_spent = 0.0
+        self.reruns = {}     # nodeid -> allowed reruns (worker side)
+        self.quarantined = set()
+        self.attempts = defaultdict(int)
+        self.retry_time = defaultdict(float)
+        self.outcomes = {}
+        self.categories = defaultdict(int)
+
+    # ---------- worker side: classify, order, rerun ----------
+
+    @pytest.hookimpl(tryfirst=True)  # before xdist appends "@quarantine" to node ids
+    def pytest_collection_modifyitems(self, config, items):
+        db = FlakeDB(self.path)
+        history = db.history()
+        db.close()
+
+        keep, quarantined, deselected = [], [], []
+        for item in items:
+            category, reruns = classify(history.get(item.nodeid), self.max_reruns)
+            self.categories[category] += 1
+            self.reruns[item.nodeid] = reruns
+            if category != "quarantine":
+                (deselected if self.mode == "only" else keep).append(item)
+                continue
+            if self.mode == "skip":
+                deselected.append(item)
+                continue
+            # No xfail mark: it would turn a failure into a skip before we
+            # could rerun it. The protocol below decides the xfail itself.
+            item.add_marker(pytest.mark.quarantine)
+            item.add_marker(pytest.mark.xdist_group("quarantine"))
+            self.quarantined.add(item.nodeid)
+            quarantined.append(item)
+
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+        items[:] = keep + quarantined  # low priority: quarantined tests run last
+        if self.is_worker:
+            config.workeroutput["flake_categories"] = dict(self.categories)
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_protocol(self, item, nextitem):
+        nodeid = clean_nodeid(item.nodeid)
+        reruns = self.reruns.get(nodeid, 0)
+        quarantined = nodeid in self.quarantined
+        if reruns == 0 and not quarantined:
+            return None  # default protocol, no extra cost
+
+        item.ihook.pytest_runtest_logstart(nodeid=item.nodeid, location=item.location)
+        for attempt in range(reruns + 1):
+            start = time.perf_counter()
+            reports = runtestprotocol(item, nextitem=nextitem, log=False)
+            elapsed = time.perf_counter() - start
+            call = next((r for r in reports if r.when == "call"), None)
+
+            # Rerun only a failing test body, and only while the budget lasts
+            retry = (call is not None and call.failed and attempt < reruns
+                     and self.retry_spent + elapsed <= self.retry_budget)
+            if not retry:
+                if quarantined and call is not None and call.failed:
+                    # Final attempt failed: report it like a non-strict xfail
+                    call.outcome = "skipped"
+                    call.wasxfail = "quarantined: chronically flaky"
+                for report in reports:
+                    item.ihook.pytest_runtest_logreport(report=report)
+                break
+
+            self.retry_spent += elapsed
+            call.outcome = "rerun"
+            call.duration = elapsed
+            item.ihook.pytest_runtest_logreport(report=call)
+            item._initrequest()  # fresh fixtures for the next attempt
+        item.ihook.pytest_runtest_logfinish(nodeid=item.nodeid, location=item.location)
+        return True
+
+    def pytest_report_teststatus(self, report):
+        if report.outcome == "rerun":
+            return "rerun", "R", ("RERUN", {"yellow": True})
+
+    # ---------- controller side: collect outcomes, save ----------
+
+    def pytest_testnodedown(self, node, error):
+        # Under xdist only the workers collect - take the history counts from one
+        output = getattr(node, "workeroutput", {})
+        if not self.categories and "flake_categories" in output:
+            self.categories.update(output["flake_categories"])
+
+    def pytest_runtest_logreport(self, report):
+        if self.is_worker or report.when != "call":
+            return
+        nodeid = clean_nodeid(report.nodeid)
+        if report.outcome == "rerun":
+            self.attempts[nodeid] += 1
+            self.retry_time[nodeid] += report.duration
+            return
+
+        if hasattr(report, "wasxfail") and "quarantine" not in report.keywords:
+            return  # a real xfail test, not ours
+        if report.passed:
+            outcome = "flaky" if self.attempts[nodeid] else "passed"
+        elif report.failed or hasattr(report, "wasxfail"):
+            outcome = "failed"  # quarantined failures arrive as xfail
+        else:
+            return
+        self.outcomes[nodeid] = (outcome, self.attempts[nodeid] + 1, round(self.retry_time[nodeid], 3))
+
+    def pytest_sessionfinish(self):
+        if self.is_worker or not self.outcomes:
+            return
+        db = FlakeDB(self.path)
+        db.save_run(self.outcomes, sum(self.retry_time.values()))
+        db.close()
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if self.is_worker:
+            return
+        terminalreporter.section("flake database")
+        if self.categories:
+            terminalreporter.write_line(
+                "history: " + ", ".join(f"{n} {c}" for c, n in sorted(self.categories.items())))
+        flaky = sorted(n for n, o in self.outcomes.items() if o[0] == "flaky")
+        terminalreporter.write_line(
+            f"reruns: {sum(self.attempts.values())}, "
+            f"{sum(self.retry_time.values()):.1f}s of {self.config.getoption('--retry-budget'):.0f}s budget")
+        for nodeid in flaky:
+            terminalreporter.write_line(f"flaky this run: {nodeid}")
+
+
+# ============================================
+# TESTS (no browser needed)
+# ============================================
+
+def test_classify_from_history(tmp_path):
+    db = FlakeDB(str(tmp_path / "flakes.sqlite"))
+    runs = [
+        {"t::stable": "passed", "t::flaky": "passed", "t::chronic": "flaky", "t::broken": "passed"},
+        {"t::stable": "passed", "t::flaky": "flaky", "t::chronic": "passed", "t::broken": "failed"},
+        {"t::stable": "passed", "t::flaky": "passed", "t::chronic": "flaky", "t::broken": "failed"},
+        {"t::stable": "passed", "t::flaky": "passed", "t::chronic": "passed", "t::broken": "failed"},
+    ]
+    for run in runs:
+        db.save_run({nodeid: (outcome, 1, 0.0) for nodeid, outcome in run.items()}, 0.0)
+    history = db.history()
+
+    assert classify(history["t::stable"]) == ("stable", 0)
+    assert classify(history["t::flaky"]) == ("flaky", 2)
+    assert classify(history["t::chronic"]) == ("quarantine", 2)
+    assert classify(history["t::broken"]) == ("broken", 0)
+    assert classify(history.get("t::unknown")) == ("new", 1)
+    db.close()
+
+
+def test_window_forgets_old_flakes(tmp_path):
+    """Flaky long ago, stable for the last WINDOW runs -> stable again."""
+    db = FlakeDB(str(tmp_path / "flakes.sqlite"))
+    db.save_run({"t::fixed": ("flaky", 2, 1.5)}, 1.5)
+    for _ in range(WINDOW):
+        db.save_run({"t::fixed": ("passed", 1, 0.0)}, 0.0)
+    assert classify(db.history()["t::fixed"]) == ("stable", 0)
+    db.close()
+
+
+@pytest.mark.parametrize("xdist_args", [[], ["-n", "2", "--dist", "loadgroup"]], ids=["serial", "xdist"])
+def test_quarantined_flaky_test_is_rerun(tmp_path, xdist_args):
+    """A test failing every other attempt: quarantined after 3 runs, and
+    still rerun and recorded as flaky - under its real node id."""
+    if xdist_args:
+        pytest.importorskip("xdist")
+    (tmp_path / "conftest.py").write_text(Path(__file__).read_text())
+    (tmp_path / "test_sample.py").write_text(textwrap.dedent("""
+        from pathlib import Path
+
+        def test_flaky():
+            counter = Path(__file__).with_name("attempts")
+            attempt = int(counter.read_text()) if counter.exists() else 0
+            counter.write_text(str(attempt + 1))
+            assert attempt % 2 == 1
+
+        def test_stable():
+            pass
+    """))
+
+    command = [sys.executable, "-m", "pytest", "-p", "no:cacheprovider", "--flake-db", *xdist_args]
+    for _ in range(5):
+        result = subprocess.run(command, cwd=tmp_path, capture_output=True, text=True)
+        assert result.returncode == 0, result.stdout + result.stderr
+    assert "history: 1 quarantine, 1 stable" in result.stdout
+
+    db = FlakeDB(str(tmp_path / DEFAULT_DB))
+    rows = db.db.execute("SELECT nodeid, outcome FROM outcomes ORDER BY run_id").fetchall()
+    db.close()
+    assert {row["nodeid"] for row in rows} == {"test_sample.py::test_flaky", "test_sample.py::test_stable"}
+    assert [row["outcome"] for row in rows if row["nodeid"].endswith("test_flaky")] == ["flaky"] * 5
+
+
+# ============================================
+# CLI: WHICH TESTS ARE FLAKY?
+# ============================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Flake history")
+    parser.add_argument("--db", default=os.getenv("FLAKE_DB", DEFAULT_DB))
+    commands = parser.add_subparsers(dest="command", required=True)
+    report = commands.add_parser("report", help="Flakiest tests of the rolling window")
+    report.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    db = FlakeDB(args.db)
+    print(f"{'category':<11} {'flaky':>5} {'failed':>6} {'runs':>4}  test")
+    for nodeid, category, flaky, failed, runs in db.report(args.limit):
+        print(f"{category:<11} {flaky:>5} {failed:>6} {runs:>4}  {nodeid}")
+    db.close()
+
+
+# ============================================
+# KEY POINTS:
+#
+# 1. Record passed / flaky / failed per test, every run
+# 2. Rolling window: old flakes are forgotten once a test is fixed
+# 3. Rerun only tests with a flaky history - broken tests fail fast
+# 4. Chronic offenders go to a quarantine shard that runs last / separately
+# 5. A run-level retry budget caps what reruns can cost
+#
+# Run: pytest --flake-db
+# ============================================
@@ -0,0 +1,302 @@
+"""Example 8: Console Ring Buffer - Browser Logs Only for Failing Tests
+
+page_with_logging in 02_console_and_events.py prints every console
+message, and debug_page in 05_debug_strategies.py logs every one of them.
+A chatty app then spends its time formatting strings nobody reads, and
+the CI log of a green run is thousands of lines long.
+
+ConsoleCapture keeps the LAST N events per page in ring buffers
+(collections.deque(maxlen=N)):
+- console messages
+- page errors, console.error and failed responses (4xx/5xx) in a separate,
+  smaller ring - a noisy page can't push the one error out
+- the raw event objects are stored; the text is built only when a test
+  failed and the buffer is written to the report
+- level-based sampling for very noisy apps: keep every 10th "log" message,
+  drop "debug" entirely, always keep errors and warnings
+- memory per page is fixed, however long the flow runs
+
+On failure the buffer shows up in pytest's failure output as a
+"Captured browser console" section (and in pytest-html).
+
+Setup: the hook that adds that section is in conftest.py in this folder.
+
+Run with (from this folder): pytest 08_console_ring_buffer.py -v -s
+Failure output: SHOW_FAILURE=1 pytest 08_console_ring_buffer.py -v
+Sampling: CONSOLE_SAMPLE="log=0.1,debug=0" pytest 08_console_ring_buffer.py -v
+Benchmark: RUN_BENCHMARK=1 pytest 08_console_ring_buffer.py -k benchmark -s
+"""
+import importlib.util
+import itertools
+import os
+import time
+from collections import Counter, deque
+from types import SimpleNamespace
+
+import pytest
+from playwright.sync_api import BrowserContext, Page
+
+
+BASE_URL = "https://the-internet.herokuapp.com"
+CONSOLE_BUFFER = int(os.getenv("CONSOLE_BUFFER", "200"))
+ERROR_BUFFER = int(os.getenv("CONSOLE_ERROR_BUFFER", "50"))
+MAX_PAGES = 8   # popups/new tabs per test whose buffers we keep
+ALWAYS_KEEP = {"error", "warning", "assert"}
+
+
+def parse_sample(text):
+    """'log=0.1,debug=0' -> {'log': 0.1, 'debug': 0.0}"""
+    rates = {}
+    for part in filter(None, (text or "").split(",")):
+        level, _, rate = part.partition("=")
+        rates[level.strip()] = float(rate)
+    return rates
+
+
+# ============================================
+# CONSOLE CAPTURE
+# ============================================
+
+class ConsoleCapture:
+    """Ring buffers for one page. Handlers only append - no formatting."""
+
+    def __init__(self, page: Page, size=CONSOLE_BUFFER, error_size=ERROR_BUFFER, sample=None):
+        self.url = page.url
+        self.started = time.monotonic()
+        self.order = itertools.count()  # merges the two rings back in arrival order
+        self.messages = deque(maxlen=size)
+        self.errors = deque(maxlen=error_size)
+        self.seen = Counter()      # level -> messages received
+        self.sampled_out = Counter()
+        # rate 0.1 -> keep every 10th message of that level (deterministic)
+        self.every = {level: (round(1 / rate) if rate > 0 else 0)
+                      for level, rate in (sample or {}).items() if level not in ALWAYS_KEEP}
+
+        page.on("console", self.on_console)
+        page.on("pageerror", self.on_page_error)
+        page.on("response", self.on_response)
+        page.on("framenavigated", self.on_navigated)
+
+    # ---------- handlers: cheap ----------
+
+    def on_console(self, msg):
+        level = msg.type
+        self.seen[level] += 1
+        every = self.every.get(level)
+        if every is not None and (every == 0 or self.seen[level] % every):
+            self.sampled_out[level] += 1
+            return
+        entry = (next(self.order), time.monotonic(), "console", msg)
+        if level == "error":
+            self.errors.append(entry)
+        else:
+            self.messages.append(entry)
+
+    def on_page_error(self, error):
+        self.seen["pageerror"] += 1
+        self.errors.append((next(self.order), time.monotonic(), "pageerror", error))
+
+    def on_response(self, response):
+        if response.status >= 400:
+            self.seen["http"] += 1
+            self.errors.append((next(self.order), time.monotonic(), "http", response))
+
+    def on_navigated(self, frame):
+        if frame.parent_frame is None:
+            self.url = frame.url  # remembered for the report header only
+
+    # ---------- formatting: only on failure ----------
+
+    def format_entry(self, entry):
+        _, timestamp, kind, item = entry
+        offset = f"+{timestamp - self.started:7.3f}s"
+        if kind == "console":
+            location = item.location
+            where = f" ({location['url']}:{location['lineNumber']})" if location.get("url") else ""
+            return f"{offset} [console.{item.type}] {item.text}{where}"
+        if kind == "pageerror":
+            return f"{offset} [pageerror] {item}"
+        return f"{offset} [HTTP {item.status}] {item.request.method} {item.url}"
+
+    def format(self):
+        entries = sorted(list(self.messages) + list(self.errors), key=lambda e: e[0])
+        total = sum(self.seen.values())
+        lines = [f"page {self.url}: {total} events, last {len(entries)} kept"]
+        if self.sampled_out:
+            lines.append("sampled out: " + ", ".join(f"{n} {level}" for level, n in self.sampled_out.items()))
+        lines.extend(self.format_entry(entry) for entry in entries)
+        return "\n".join(lines)
+
+
+class ContextCapture:
+    """One ConsoleCapture per page of a context, including popups."""
+
+    def __init__(self, context: BrowserContext, **options):
+        self.options = options
+        self.pages = deque(maxlen=MAX_PAGES)
+        for page in context.pages:
+            self.attach(page)
+        context.on("page", self.attach)
+
+    def attach(self, page):
+        self.pages.append(ConsoleCapture(page, **self.options))
+
+    def format(self):
+        return "\n\n".join(capture.format() for capture in self.pages)
+
+
+# ============================================
+# FIXTURES (put these in conftest.py)
+# ============================================
+
+@pytest.fixture
+def console_page(context: BrowserContext, request):
+    """A page whose browser logs are reported only if the test fails."""
+    capture = ContextCapture(context, sample=parse_sample(os.getenv("CONSOLE_SAMPLE")))
+    request.node.console_capture = capture
+    return context.new_page()
+
+
+# pytest_runtest_makereport (adds the "Captured browser console" section
+# to a failed report) is in conftest.py
+
+
+# ============================================
+# TESTS
+# ============================================
+
+CHATTY_JS = """(count) => {
+    for (let i = 0; i < count; i++) {
+        console.debug(`render tick ${i}`);
+        console.log(`state update ${i}`);
+        if (i % 500 === 0) console.warn(`slow frame ${i}`);
+    }
+}"""
+
+
+def test_passing_test_prints_nothing(console_page: Page):
+    console_page.goto(f"{BASE_URL}/login")
+    console_page.evaluate(CHATTY_JS, 2000)
+    assert console_page.locator("h2").text_content() == "Login Page"
+
+
+def test_javascript_error_is_kept(console_page: Page, request):
+    console_page.goto(f"{BASE_URL}/javascript_error")
+    console_page.evaluate(CHATTY_JS, 2000)  # noise after the error
+
+    capture = request.node.console_capture.pages[-1]
+    assert len(capture.messages) <= CONSOLE_BUFFER
+    assert any(entry[2] == "pageerror" for entry in capture.errors)
+
+
+@pytest.mark.skipif(os.getenv("SHOW_FAILURE") != "1", reason="set SHOW_FAILURE=1 to see the captured console")
+def test_failure_shows_console(console_page: Page):
+    console_page.goto(f"{BASE_URL}/javascript_error")
+    console_page.goto(f"{BASE_URL}/status_codes/500")
+    console_page.evaluate(CHATTY_JS, 1000)
+    assert console_page.locator("#does-not-exist").count() == 1
+
+
+class FakeMessage:
+    def __init__(self, level, text):
+        self.type, self.text, self.location = level, text, {}
+
+
+class FakePage:
+    url = "about:blank"
+
+    def on(self, event, handler):
+        pass
+
+
+class FakeContext(FakePage):
+    def __init__(self):
+        self.pages = [FakePage()]
+
+
+def test_buffer_size_is_fixed():
+    """No browser needed: 100k fake messages, the buffer stays at its size."""
+    capture = ConsoleCapture(FakePage(), size=100, error_size=10, sample={"log": 0.1, "debug": 0})
+    for i in range(100_000):
+        capture.on_console(FakeMessage(("log", "debug", "error")[i % 3], f"message {i}"))
+
+    assert len(capture.messages) == 100 and len(capture.errors) == 10
+    assert capture.sampled_out["debug"] == capture.seen["debug"]
+    assert capture.sampled_out["log"] == capture.seen["log"] - capture.seen["log"] // 10
+    assert capture.format().splitlines()[-1].endswith("message 99998")
+
+
+def run_makereport_hook(item, rep):
+    """Drive the conftest.py hookwrapper the way pluggy does."""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "conftest.py")
+    spec = importlib.util.spec_from_file_location("lecture35_conftest", path)
+    conftest = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(conftest)
+
+    hook = conftest.pytest_runtest_makereport(item, None)
+    next(hook)
+    with pytest.raises(StopIteration):
+        hook.send(SimpleNamespace(get_result=lambda: rep))
+
+
+def test_hook_adds_console_only_to_failed_report():
+    """No browser needed: the conftest hook on a failed and a passed report."""
+    capture = ContextCapture(FakeContext())
+    capture.pages[0].on_console(FakeMessage("log", "cart loaded"))
+    capture.pages[0].on_console(FakeMessage("error", "price is undefined"))
+    item = SimpleNamespace(console_capture=capture)
+
+    failed = SimpleNamespace(when="call", failed=True, sections=[])
+    run_makereport_hook(item, failed)
+    assert item.rep_call is failed
+    [(title, text)] = failed.sections
+    assert title == "Captured browser console"
+    assert "[console.log] cart loaded" in text and "[console.error] price is undefined" in text
+
+    passed = SimpleNamespace(when="call", failed=False, sections=[])
+    run_makereport_hook(item, passed)
+    assert passed.sections == []
+
+
+# ============================================
+# BENCHMARK: PRINT EVERYTHING vs RING BUFFER
+# ============================================
+
+@pytest.mark.skipif(os.getenv("RUN_BENCHMARK") != "1", reason="set RUN_BENCHMARK=1")
+def test_benchmark_chatty_page(context: BrowserContext, capsys):
+    count = int(os.getenv("BENCHMARK_MESSAGES", "5000"))
+
+    def measure(setup):
+        page = context.new_page()
+        page.goto(f"{BASE_URL}/login")
+        setup(page)
+        start = time.perf_counter()
+        page.evaluate(CHATTY_JS, count)
+        page.evaluate("() => new Promise(r => setTimeout(r, 0))")  # let events arrive
+        elapsed = time.perf_counter() - start
+        page.close()
+        return elapsed
+
+    print_all = measure(lambda page: page.on("console", lambda msg: print(f"  [console.{msg.type}] {msg.text}")))
+    ring = measure(lambda page: ConsoleCapture(page))
+    sampled = measure(lambda page: ConsoleCapture(page, sample={"log": 0.1, "debug": 0}))
+    capsys.readouterr()  # throw away the printed noise
+
+    with capsys.disabled():
+        print(f"\n  {count * 2} console messages:")
+        print(f"    print every message: {print_all:.2f}s")
+        print(f"    ring buffer:         {ring:.2f}s")
+        print(f"    ring + sampling:     {sampled:.2f}s")
+
+
+# ============================================
+# KEY POINTS:
+#
+# 1. deque(maxlen=N) = fixed memory per page, oldest events fall out
+# 2. Errors get their own ring so noise can't evict them
+# 3. Store raw events, format only when a test failed
+# 4. Sample noisy levels, never errors and warnings
+# 5. rep.sections puts the buffer in the failure report, not the CI log
+#
+# Run: pytest 08_console_ring_buffer.py -v -s
+# ============================================
@@ -0,0 +1,19 @@
+"""Hooks for the Lecture 35 examples.
+
+Stores item.rep_<when> reports for trace_page (06_chunked_tracing.py) and
+adds the console_page buffer (08_console_ring_buffer.py) to failed reports.
+"""
+import pytest
+
+
+@pytest.hookimpl(tryfirst=True, hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    rep = outcome.get_result()
+    # item.rep_setup / item.rep_call / item.rep_teardown for the fixtures
+    setattr(item, f"rep_{rep.when}", rep)
+
+    # Format the console buffers only now - and only for a failure
+    capture = getattr(item, "console_capture", None)
+    if capture is not None and rep.failed:
+        rep.sections.append(("Captured browser console", capture.format()))
@@ -0,0 +1,282 @@
+"""Example 6: Wait-Time Profiler
+
+Most of a UI suite's wall-clock time is spent WAITING. The timed_page
+fixture in 05_reporting_monitoring.py tells us a test took 8 seconds,
+but not where those seconds went.
+
+This profiler wraps every waiting call:
+- page.wait_for_* and locator.wait_for()
+- expect(...) assertions (they retry until timeout)
+- page.wait_for_timeout() and time.sleep() - FIXED sleeps
+
+and prints a ranked "where did the time go" report per call site
+(file:line) with p50/p95 durations and how many calls hit a timeout.
+Fixed sleeps are flagged - 05_timeout_config.py calls them an anti-pattern.
+
+Run with: pytest 06_wait_profiler.py -v
+Disable:  WAIT_PROFILE=0 pytest ...
+In a real project put the fixture (and the classes) in conftest.py.
+"""
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import playwright
+import pytest
+from playwright.sync_api import (
+    Page, Locator, expect, TimeoutError as PlaywrightTimeoutError,
+    PageAssertions, LocatorAssertions, APIResponseAssertions,
+)
+
+
+BASE_URL = "https://the-internet.herokuapp.com"
+
+
+# ============================================
+# WHICH CALLS ARE "WAITS"
+# ============================================
+
+PAGE_WAITS = [
+    "wait_for_selector", "wait_for_load_state", "wait_for_url",
+    "wait_for_function", "wait_for_event",
+]
+FIXED_SLEEPS = "sleep"   # kind used for wait_for_timeout() / time.sleep()
+
+PLAYWRIGHT_DIR = os.path.dirname(playwright.__file__)
+THIS_FILE = os.path.abspath(__file__)
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+# ============================================
+# PROFILER
+# ============================================
+
+class CallSiteStats:
+    """Durations for one call site (file:line + method)."""
+
+    def __init__(self, site, label, kind):
+        self.site = site
+        self.label = label
+        self.kind = kind
+        self.durations = []
+        self.timeouts = 0
+
+    @property
+    def total(self):
+        return sum(self.durations)
+
+    def summary(self):
+        ordered = sorted(self.durations)
+        return {
+            "site": self.site,
+            "call": self.label,
+            "kind": self.kind,
+            "calls": len(ordered),
+            "total_s": round(self.total, 3),
+            "p50_ms": round(percentile(ordered, 0.50) * 1000, 1),
+            "p95_ms": round(percentile(ordered, 0.95) * 1000, 1),
+            "timeouts": self.timeouts,
+            "fixed_sleep": self.kind == FIXED_SLEEPS,
+        }
+
+
+class WaitProfiler:
+    """Monkeypatches waiting methods and records how long each call took."""
+
+    def __init__(self):
+        self.stats = {}          # (site, label) -> CallSiteStats
+        self.patched = []        # (owner, name, original) to undo later
+        self.local = threading.local()
+        self.started = None
+        self.finished = None
+
+    # ---------- patching ----------
+
+    def wrap(self, owner, name, kind):
+        original = getattr(owner, name)
+        label = f"{getattr(owner, '__name__', 'time')}.{name}"
+        profiler = self
+
+        @functools.wraps(original)
+        def wrapper(*args, **kwargs):
+            # Don't count waits made INSIDE another measured wait twice
+            if getattr(profiler.local, "busy", False):
+                return original(*args, **kwargs)
+            profiler.local.busy = True
+            site = profiler.call_site()
+            timed_out = False
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            except (PlaywrightTimeoutError, AssertionError):
+                timed_out = True
+                raise
+            finally:
+                profiler.record(site, label, kind, time.perf_counter() - start, timed_out)
+                profiler.local.busy = False
+
+        setattr(owner, name, wrapper)
+        self.patched.append((owner, name, original))
+
+    def install(self):
+        for name in PAGE_WAITS:
+            self.wrap(Page, name, "wait")
+        self.wrap(Page, "wait_for_timeout", FIXED_SLEEPS)
+        self.wrap(Locator, "wait_for", "wait")
+        for assertions in (PageAssertions, LocatorAssertions, APIResponseAssertions):
+            for name in dir(assertions):
+                if name.startswith(("to_", "not_to_")):
+                    self.wrap(assertions, name, "expect")
+        # Only catches `import time; time.sleep()`, not `from time import sleep`
+        self.wrap(time, "sleep", FIXED_SLEEPS)
+        self.started = time.perf_counter()
+
+    def uninstall(self):
+        self.finished = time.perf_counter()
+        for owner, name, original in reversed(self.patched):
+            setattr(owner, name, original)
+        self.patched.clear()
+
+    # ---------- recording ----------
+
+    @staticmethod
+    def call_site():
+        """First stack frame outside Playwright and this profiler."""
+        frame = sys._getframe(2)
+        while frame:
+            filename = frame.f_code.co_filename
+            if not filename.startswith(PLAYWRIGHT_DIR) and os.path.abspath(filename) != THIS_FILE:
+                return f"{os.path.relpath(filename)}:{frame.f_lineno} ({frame.f_code.co_name})"
+            frame = frame.f_back
+        return "<unknown>"
+
+    def record(self, site, label, kind, duration, timed_out):
+        key = (site, label)
+        if key not in self.stats:
+            self.stats[key] = CallSiteStats(site, label, kind)
+        entry = self.stats[key]
+        entry.durations.append(duration)
+        if timed_out:
+            entry.timeouts += 1
+
+    # ---------- reporting ----------
+
+    def report(self):
+        """Call sites ranked by total time spent waiting."""
+        return [s.summary() for s in sorted(self.stats.values(), key=lambda s: s.total, reverse=True)]
+
+    def wall_clock(self):
+        return (self.finished or time.perf_counter()) - (self.started or time.perf_counter())
+
+    def format_report(self, top=20):
+        wall = self.wall_clock()
+        waited = sum(s.total for s in self.stats.values())
+        slept = sum(s.total for s in self.stats.values() if s.kind == FIXED_SLEEPS)
+        lines = [
+            f"Suite wall-clock: {wall:.2f}s | waiting: {waited:.2f}s "
+            f"({waited / wall * 100 if wall else 0:.0f}%) | fixed sleeps: {slept:.2f}s",
+            f"{'total':>8} {'%':>4} {'calls':>5} {'p50':>8} {'p95':>8} {'t/o':>3}  call site",
+        ]
+        for row in self.report()[:top]:
+            share = row["total_s"] / wall * 100 if wall else 0
+            flag = "  <-- FIXED SLEEP" if row["fixed_sleep"] else ""
+            lines.append(
+                f"{row['total_s']:>7.2f}s {share:>3.0f}% {row['calls']:>5} "
+                f"{row['p50_ms']:>6.0f}ms {row['p95_ms']:>6.0f}ms {row['timeouts']:>3}  "
+                f"{row['site']} {row['call']}{flag}"
+            )
+        return lines
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({
+            "wall_clock_s": round(self.wall_clock(), 3),
+            "call_sites": self.report(),
+        }, indent=2))
+        return path
+
+
+class WaitReportPlugin:
+    """Prints the report in pytest's terminal summary (after all tests)."""
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+
+    def pytest_terminal_summary(self, terminalreporter):
+        terminalreporter.section("where did the time go (waits)")
+        for line in self.profiler.format_report():
+            terminalreporter.write_line(line)
+
+
+# ============================================
+# FIXTURE (put in conftest.py)
+# ============================================
+
+@pytest.fixture(scope="session", autouse=True)
+def wait_profiler(request):
+    """Profile every wait in the session; report at the end."""
+    if os.getenv("WAIT_PROFILE", "1") == "0":
+        yield None
+        return
+
+    profiler = WaitProfiler()
+    profiler.install()
+    request.config.pluginmanager.register(WaitReportPlugin(profiler), "wait_report")
+
+    yield profiler
+
+    profiler.uninstall()
+    profiler.save("test-results/wait_profile.json")
+
+
+# ============================================
+# TESTS
+# ============================================
+
+def test_dynamic_loading(page: Page):
+    """Conditional wait - shows up as 'wait' with its real duration."""
+    page.goto(f"{BASE_URL}/dynamic_loading/1")
+    page.locator("#start button").click()
+    page.locator("#finish").wait_for(state="visible")
+    expect(page.locator("#finish h4")).to_have_text("Hello World!")
+
+
+def test_with_fixed_sleep(page: Page):
+    """Anti-pattern - flagged as FIXED SLEEP in the report."""
+    page.goto(f"{BASE_URL}/dynamic_loading/2")
+    page.locator("#start button").click()
+    page.wait_for_timeout(6000)
+    assert page.locator("#finish h4").is_visible()
+
+
+def test_time_sleep_in_helper(page: Page):
+    """time.sleep() in helpers (like retry_on_failure) is caught too."""
+    page.goto(f"{BASE_URL}/login")
+    time.sleep(0.5)
+    expect(page.locator("h2")).to_have_text("Login Page")
+
+
+# ============================================
+# KEY POINTS:
+#
+# 1. Waits, not clicks, dominate UI suite time
+# 2. Wrap methods once per session (monkeypatch + restore)
+# 3. Attribute time to call sites (file:line), not just tests
+# 4. p50/p95 show typical vs worst-case waits
+# 5. Timeouts hit = wasted time + likely bug
+# 6. Fixed sleeps are flagged - replace them with conditional waits
+#
+# Run: pytest 06_wait_profiler.py -v
+# ============================================
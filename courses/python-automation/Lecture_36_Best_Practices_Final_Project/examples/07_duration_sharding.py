@@ -0,0 +1,294 @@
+"""Example 7: Duration-Aware Sharding for pytest-xdist
+
+04_ci_cd_integration.py recommends `pytest -n auto`. xdist hands tests to
+workers without knowing how long they take, so one slow /slow or video test
+that happens to start last stretches the whole run while other workers idle.
+
+This plugin:
+1. reads past per-test durations (its own history file, or the JSON written
+   by TestResultTracker.save() in 05_reporting_monitoring.py)
+2. packs tests onto workers LONGEST-FIRST (the classic LPT heuristic):
+   each test goes to the worker with the least total time so far
+3. keeps tests that share an xdist_group on the same worker
+4. estimates unknown tests (module average, else suite median)
+5. prints predicted vs actual makespan (= time of the slowest worker)
+6. updates the history file after every run
+
+How it works with xdist: every worker computes the SAME assignment and tags
+each test with xdist_group("shard-N"). With --dist loadgroup, xdist then
+sends each shard to one worker.
+
+Setup: copy this file to conftest.py (hooks only work in conftest/plugins)
+Install: pip install pytest-xdist
+Run with:
+    pytest -n 4 --dist loadgroup --duration-sharding
+    pytest -n 4 --dist loadgroup --duration-sharding --durations-file test-results/results.json
+Test the plugin itself: pytest 07_duration_sharding.py -v
+"""
+import json
+import re
+import statistics
+import subprocess
+import sys
+import textwrap
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import pytest
+
+
+DEFAULT_HISTORY = ".test_durations.json"
+DEFAULT_ESTIMATE = 1.0  # seconds, when nothing at all is known
+
+
+# ============================================
+# HISTORY
+# ============================================
+
+def load_durations(path):
+    """Return {nodeid_or_name: seconds} from either supported format.
+
+    - our history file:           {"tests/test_a.py::test_x": 1.23, ...}
+    - TestResultTracker.save():   {"results": [{"test": "test_x", "duration_seconds": 1.2}]}
+    """
+    path = Path(path)
+    if not path.exists():
+        return {}
+    data = json.loads(path.read_text())
+    if "results" in data:
+        return {r["test"]: r["duration_seconds"] for r in data["results"]}
+    return data
+
+
+def save_durations(path, durations):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(durations, indent=1, sort_keys=True))
+    tmp_path.replace(path)
+
+
+def clean_nodeid(nodeid):
+    """xdist adds '@<groups>' to node ids under loadgroup, e.g. '@shard-1' or
+    '@db_shard-1' for a class-level group - strip only a suffix holding our
+    shard, so an '@' inside a parameter id survives."""
+    return re.sub(r"@[^@\]]*shard-\d+[^@\]]*$", "", nodeid)
+
+
+def estimate_durations(items, history):
+    """Known duration, else module average, else suite median."""
+    known = {}
+    by_module = defaultdict(list)
+    for item in items:
+        seconds = history.get(clean_nodeid(item.nodeid), history.get(item.name))
+        if seconds is not None:
+            known[item.nodeid] = seconds
+            by_module[item.nodeid.split("::")[0]].append(seconds)
+
+    fallback = statistics.median(known.values()) if known else DEFAULT_ESTIMATE
+    estimates = {}
+    for item in items:
+        if item.nodeid in known:
+            estimates[item.nodeid] = known[item.nodeid]
+        else:
+            module_times = by_module.get(item.nodeid.split("::")[0])
+            estimates[item.nodeid] = statistics.fmean(module_times) if module_times else fallback
+    return estimates, len(known)
+
+
+# ============================================
+# LONGEST-FIRST PACKING
+# ============================================
+
+def pack_longest_first(units, workers):
+    """Assign units to workers; return (assignment, load per worker).
+
+    units: {unit_name: seconds}. Biggest unit first, always onto the
+    least-loaded worker. Ties are broken by name so every xdist worker
+    computes exactly the same result.
+    """
+    loads = [0.0] * workers
+    assignment = {}
+    for name, seconds in sorted(units.items(), key=lambda u: (-u[1], u[0])):
+        target = min(range(workers), key=lambda w: (loads[w], w))
+        assignment[name] = target
+        loads[target] += seconds
+    return assignment, loads
+
+
+def build_units(items, estimates):
+    """Group items: an existing xdist_group is ONE unit, others are alone."""
+    units = defaultdict(float)
+    unit_of = {}
+    for item in items:
+        marker = item.get_closest_marker("xdist_group")
+        if marker:
+            group = marker.args[0] if marker.args else marker.kwargs.get("name")
+            unit = f"group:{group}"
+        else:
+            unit = clean_nodeid(item.nodeid)
+        unit_of[item.nodeid] = unit
+        units[unit] += estimates[item.nodeid]
+    return dict(units), unit_of
+
+
+# ============================================
+# PYTEST PLUGIN
+# ============================================
+
+def pytest_addoption(parser):
+    group = parser.getgroup("duration-sharding")
+    group.addoption("--duration-sharding", action="store_true",
+                    help="Pack tests onto xdist workers longest-first by past duration")
+    group.addoption("--durations-file", default=DEFAULT_HISTORY,
+                    help="History JSON (own format or TestResultTracker output)")
+
+
+def pytest_configure(config):
+    if config.getoption("--duration-sharding"):
+        config.pluginmanager.register(DurationSharding(config), "duration_sharding")
+
+
+class DurationSharding:
+    """Runs in the controller AND in every xdist worker."""
+
+    def __init__(self, config):
+        self.config = config
+        self.source = config.getoption("--durations-file")
+        self.history = load_durations(self.source)
+        # TestResultTracker output is read-only for us - keep our own history
+        self.history_path = self.source if "results" not in self.history else DEFAULT_HISTORY
+        self.workerinput = getattr(config, "workerinput", None)
+        self.durations = defaultdict(float)
+        self.worker_times = defaultdict(float)   # worker id -> seconds of tests it ran
+        self.workers = {}
+        self.started = time.perf_counter()
+
+        dist = config.getoption("dist", "no")
+        if self.workerinput is None and dist not in ("no", "loadgroup"):
+            config.issue_config_time_warning(pytest.PytestConfigWarning(
+                f"--duration-sharding needs --dist loadgroup (got --dist {dist}): "
+                "the shard groups are ignored and tests are spread without the plan"), stacklevel=2)
+
+    # ---------- worker side: plan and tag ----------
+
+    @pytest.hookimpl(tryfirst=True)  # must run BEFORE xdist adds "@group" to node ids
+    def pytest_collection_modifyitems(self, items):
+        if self.workerinput is None:
+            return  # not under xdist - nothing to shard
+
+        estimates, known = estimate_durations(items, self.history)
+        units, unit_of = build_units(items, estimates)
+        assignment, loads = pack_longest_first(units, self.workerinput["workercount"])
+
+        for item in items:
+            shard = assignment[unit_of[item.nodeid]]
+            # The whole original group moved into this shard - replace its mark
+            item.own_markers = [m for m in item.own_markers if m.name != "xdist_group"]
+            item.add_marker(pytest.mark.xdist_group(f"shard-{shard}"))
+
+        # Longest tests first inside each shard too
+        items.sort(key=lambda i: -estimates[i.nodeid])
+
+        self.config.workeroutput["predicted_loads"] = loads
+        self.config.workeroutput["known_tests"] = known
+        self.config.workeroutput["total_tests"] = len(items)
+
+    # ---------- controller side: measure and report ----------
+
+    def pytest_runtest_logreport(self, report):
+        """setup + call + teardown time per test, and per worker."""
+        self.durations[clean_nodeid(report.nodeid)] += report.duration
+        node = getattr(report, "node", None)  # set by xdist on the controller
+        if node is not None:
+            self.worker_times[node.workerinput["workerid"]] += report.duration
+
+    def pytest_testnodedown(self, node, error):
+        output = getattr(node, "workeroutput", {})
+        if "predicted_loads" in output:
+            self.workers[node.workerinput["workerid"]] = output
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if self.workerinput is not None:
+            return
+        terminalreporter.section("duration sharding")
+        if self.workers:
+            plan = next(iter(self.workers.values()))  # all workers share one plan
+            predicted = plan["predicted_loads"]
+            terminalreporter.write_line(
+                f"history: {plan['known_tests']}/{plan['total_tests']} tests known")
+            terminalreporter.write_line(
+                "predicted load per worker: " + ", ".join(f"{s:.1f}s" for s in predicted))
+            terminalreporter.write_line(f"predicted makespan: {max(predicted):.1f}s")
+        else:
+            terminalreporter.write_line("not running under xdist - no sharding applied")
+        if self.worker_times:
+            # Makespan = busiest worker; comparable with the predicted one
+            actual = [self.worker_times[w] for w in sorted(self.worker_times)]
+            terminalreporter.write_line(
+                "actual load per worker:    " + ", ".join(f"{s:.1f}s" for s in actual))
+            terminalreporter.write_line(f"actual makespan:    {max(actual):.1f}s")
+        terminalreporter.write_line(
+            f"session wall-clock: {time.perf_counter() - self.started:.1f}s")
+
+    def pytest_sessionfinish(self):
+        """Merge this run's durations into the history file."""
+        if self.workerinput is not None or not self.durations:
+            return
+        history = load_durations(self.history_path)
+        history.update({k: round(v, 3) for k, v in self.durations.items()})
+        save_durations(self.history_path, history)
+
+
+# ============================================
+# TEST: TWO RUNS UNDER XDIST (the 2nd one uses the history of the 1st)
+# ============================================
+
+def test_two_runs_with_xdist(tmp_path):
+    pytest.importorskip("xdist")
+    (tmp_path / "conftest.py").write_text(Path(__file__).read_text())
+    (tmp_path / "test_sample.py").write_text(textwrap.dedent("""
+        import time
+        import pytest
+
+        @pytest.mark.parametrize("n", range(4))
+        def test_sleep(n):
+            time.sleep(0.05 * n)
+
+        @pytest.mark.xdist_group("db")
+        class TestDatabase:
+            def test_one(self):
+                time.sleep(0.1)
+
+            def test_two(self):
+                time.sleep(0.1)
+    """))
+
+    command = [sys.executable, "-m", "pytest", "-p", "no:cacheprovider", "-n", "2",
+               "--dist", "loadgroup", "--duration-sharding"]
+    for run in ("first", "second"):
+        result = subprocess.run(command, cwd=tmp_path, capture_output=True, text=True)
+        assert result.returncode == 0, result.stdout + result.stderr
+        assert "INTERNALERROR" not in result.stdout
+        assert "predicted makespan" in result.stdout, f"{run} run: no prediction"
+        assert "actual makespan" in result.stdout
+
+    history = load_durations(tmp_path / DEFAULT_HISTORY)
+    assert len(history) == 6
+    assert history["test_sample.py::TestDatabase::test_one"] >= 0.1
+    assert all("@" not in nodeid for nodeid in history)
+
+
+# ============================================
+# KEY POINTS:
+#
+# 1. Default xdist scheduling ignores test duration
+# 2. Longest-first packing: biggest test -> least-loaded worker
+# 3. Keep xdist_group members together (pack the group as one unit)
+# 4. Workers must compute the SAME plan -> deterministic tie-breaking
+# 5. Unknown tests get an estimate, then real times are recorded
+# 6. Compare predicted vs actual makespan to see the gain
+#
+# Run: pytest -n 4 --dist loadgroup --duration-sharding
+# ============================================
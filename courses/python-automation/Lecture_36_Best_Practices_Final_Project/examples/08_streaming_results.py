@@ -0,0 +1,411 @@
+"""Example 8: Streaming Result Tracker
+
+TestResultTracker in 05_reporting_monitoring.py keeps every result in a
+list. save() rewrites the whole JSON file and counts passed/failed with a
+full scan, and summary() scans again. The longer the suite, the slower
+each save - and under pytest-xdist every worker overwrites the same file.
+
+The StreamingResultTracker:
+- appends ONE JSON line per result (JSONL) - record() costs the same for
+  test 10 and test 10,000
+- keeps running counters and a duration histogram, so summary() never
+  looks at old results
+- flushes every line to the OS, so a crashed or killed worker keeps all
+  results it recorded (fsync every N lines also covers a power loss)
+- writes one file per xdist worker; the controller merges them at the end
+
+Setup: copy this file to conftest.py (hooks only work in conftest/plugins)
+Run with:
+    pytest --stream-results
+    pytest -n 4 --stream-results --results-dir test-results
+Demo tests: pytest 08_streaming_results.py -v -s
+Benchmark: RUN_BENCHMARK=1 pytest 08_streaming_results.py -k benchmark -s
+"""
+import json
+import math
+import os
+import shutil
+import time
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+
+DEFAULT_RESULTS_DIR = "test-results"
+BUCKET_RATIO = 1.05   # histogram bucket width: quantiles within ~2.5%
+MIN_DURATION = 0.001  # everything faster than 1ms shares bucket 0
+
+
+# ============================================
+# RUNNING STATISTICS
+# ============================================
+
+class RunningStats:
+    """Counters and a duration histogram, updated in O(1) per result.
+
+    Log-spaced buckets instead of a list of durations: memory stays small
+    however many tests run, and two workers' stats merge by adding counts.
+    """
+
+    def __init__(self):
+        self.counts = Counter()
+        self.buckets = Counter()   # bucket index -> number of tests
+        self.total_duration = 0.0
+        self.slowest = (None, 0.0)
+
+    @staticmethod
+    def bucket(duration):
+        if duration <= MIN_DURATION:
+            return 0
+        return int(math.log(duration / MIN_DURATION, BUCKET_RATIO)) + 1
+
+    @staticmethod
+    def bucket_value(index):
+        """Middle of the bucket (geometric), in seconds."""
+        if index == 0:
+            return MIN_DURATION
+        return MIN_DURATION * BUCKET_RATIO ** (index - 0.5)
+
+    def add(self, test_name, status, duration):
+        self.counts[status] += 1
+        self.buckets[self.bucket(duration)] += 1
+        self.total_duration += duration
+        if duration > self.slowest[1]:
+            self.slowest = (test_name, duration)
+
+    def merge(self, other):
+        self.counts.update(other.counts)
+        self.buckets.update(other.buckets)
+        self.total_duration += other.total_duration
+        if other.slowest[1] > self.slowest[1]:
+            self.slowest = other.slowest
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    def quantile(self, q):
+        """Approximate duration quantile (q=0.9 -> p90) from the histogram."""
+        total = self.total
+        if total == 0:
+            return 0.0
+        rank = q * (total - 1)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                return self.bucket_value(index)
+        return self.bucket_value(max(self.buckets))
+
+    def to_dict(self):
+        return {
+            "total": self.total,
+            "passed": self.counts["passed"],
+            "failed": self.counts["failed"],
+            "skipped": self.counts["skipped"],
+            "error": self.counts["error"],
+            "duration_seconds": round(self.total_duration, 2),
+            "p50_seconds": round(self.quantile(0.5), 3),
+            "p90_seconds": round(self.quantile(0.9), 3),
+            "p99_seconds": round(self.quantile(0.99), 3),
+            "slowest": {"test": self.slowest[0], "duration_seconds": round(self.slowest[1], 2)},
+            # Raw state so summaries from several workers can be merged
+            "counts": dict(self.counts),
+            "buckets": {str(k): v for k, v in self.buckets.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        stats.counts.update(data["counts"])
+        stats.buckets.update({int(k): v for k, v in data["buckets"].items()})
+        stats.total_duration = data["duration_seconds"]
+        stats.slowest = (data["slowest"]["test"], data["slowest"]["duration_seconds"])
+        return stats
+
+
+# ============================================
+# STREAMING TRACKER
+# ============================================
+
+class StreamingResultTracker:
+    """Same record()/save()/summary() as TestResultTracker, but streaming."""
+
+    def __init__(self, output_dir: str = DEFAULT_RESULTS_DIR, worker: str = "main",
+                 fsync_every: int = 50):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.worker = worker
+        self.path = self.output_dir / f"part-{worker}.jsonl"
+        self.summary_path = self.output_dir / f"part-{worker}.summary.json"
+        self.fsync_every = fsync_every
+        self.stats = RunningStats()
+        self.failures = []
+        self._unsynced = 0
+        # Append mode: a worker restarted by xdist continues the same file
+        self._file = open(self.path, "a", encoding="utf-8", buffering=64 * 1024)
+
+    def record(self, test_name: str, status: str, duration: float, error: str = None):
+        """Append one result line; constant cost however many came before."""
+        line = json.dumps({
+            "test": test_name,
+            "status": status,
+            "duration_seconds": round(duration, 3),
+            "error": error,
+            "worker": self.worker,
+        })
+        self._file.write(line + "\n")
+        self._file.flush()  # in the OS now: survives a crash of this process
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every:
+            os.fsync(self._file.fileno())  # on disk: survives a machine crash
+            self._unsynced = 0
+
+        self.stats.add(test_name, status, duration)
+        if status in ("failed", "error"):
+            self.failures.append(test_name)
+
+    def save(self):
+        """Write this worker's aggregates next to its JSONL file."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        write_json(self.summary_path, {"worker": self.worker, "failures": self.failures,
+                                       **self.stats.to_dict()})
+        return self.summary_path
+
+    def close(self):
+        self.save()
+        self._file.close()
+
+    def summary(self) -> str:
+        return format_summary(self.stats)
+
+
+def write_json(path, data):
+    tmp_path = Path(str(path) + ".tmp")
+    tmp_path.write_text(json.dumps(data, indent=2))
+    tmp_path.replace(path)
+
+
+def format_summary(stats):
+    counts = stats.counts
+    return (f"Total: {stats.total}, Passed: {counts['passed']}, Failed: {counts['failed']}, "
+            f"Skipped: {counts['skipped']}, Errors: {counts['error']} | "
+            f"p50 {stats.quantile(0.5):.2f}s, p90 {stats.quantile(0.9):.2f}s, "
+            f"p99 {stats.quantile(0.99):.2f}s")
+
+
+def read_results(path):
+    """Yield results from a JSONL file, one at a time.
+
+    A worker killed mid-write can leave half a line at the end - skip it
+    instead of failing the whole merge.
+    """
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+# ============================================
+# MERGE (controller, after all workers finished)
+# ============================================
+
+def merge_results(output_dir=DEFAULT_RESULTS_DIR):
+    """Combine part-*.jsonl into results.jsonl and summary.json.
+
+    Each worker's summary is used when it exists; for a worker that crashed
+    before writing it, the stats are rebuilt from its JSONL lines.
+    """
+    output_dir = Path(output_dir)
+    stats = RunningStats()
+    failures = []
+    workers = []
+
+    merged_path = output_dir / "results.jsonl"
+    tmp_path = output_dir / "results.jsonl.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as merged:
+        for part in sorted(output_dir.glob("part-*.jsonl")):
+            worker = part.stem[len("part-"):]
+            summary_path = output_dir / f"part-{worker}.summary.json"
+            if summary_path.exists():
+                data = json.loads(summary_path.read_text())
+                stats.merge(RunningStats.from_dict(data))
+                failures.extend(data["failures"])
+                with open(part, encoding="utf-8") as f:
+                    shutil.copyfileobj(f, merged)  # streamed, never held in memory
+            else:
+                for result in read_results(part):
+                    stats.add(result["test"], result["status"], result["duration_seconds"])
+                    if result["status"] in ("failed", "error"):
+                        failures.append(result["test"])
+                    merged.write(json.dumps(result) + "\n")
+            workers.append(worker)
+    tmp_path.replace(merged_path)
+
+    write_json(output_dir / "summary.json", {"workers": workers, "failures": failures,
+                                             **stats.to_dict()})
+    return stats
+
+
+def clear_parts(output_dir):
+    for path in Path(output_dir).glob("part-*"):
+        path.unlink()
+
+
+# ============================================
+# PYTEST PLUGIN
+# ============================================
+
+def pytest_addoption(parser):
+    group = parser.getgroup("stream-results")
+    group.addoption("--stream-results", action="store_true",
+                    help="Append results to JSONL as tests finish (one file per xdist worker)")
+    group.addoption("--results-dir", default=DEFAULT_RESULTS_DIR,
+                    help="Where part-*.jsonl, results.jsonl and summary.json go")
+
+
+def pytest_configure(config):
+    if config.getoption("--stream-results"):
+        config.pluginmanager.register(StreamingResults(config), "stream_results")
+
+
+class StreamingResults:
+    """Workers record, the controller merges. Without xdist it does both."""
+
+    def __init__(self, config):
+        self.output_dir = config.getoption("--results-dir")
+        workerinput = getattr(config, "workerinput", None)
+        self.is_worker = workerinput is not None
+        if not self.is_worker:
+            # Runs before xdist starts its workers: old parts never leak in
+            clear_parts(self.output_dir)
+        self.tracker = None
+        self.worker = workerinput["workerid"] if self.is_worker else "main"
+        self.stats = None
+
+    def pytest_sessionstart(self, session):
+        if self.is_worker or not session.config.pluginmanager.hasplugin("dsession"):
+            self.tracker = StreamingResultTracker(self.output_dir, worker=self.worker)
+
+    def pytest_runtest_logreport(self, report):
+        # Under xdist the controller also sees these reports - only the
+        # process that owns a tracker records them
+        if self.tracker is None:
+            return
+        if report.when == "call":
+            status = report.outcome
+        elif report.when == "setup" and not report.passed:
+            status = "skipped" if report.skipped else "error"
+        elif report.when == "teardown" and report.failed:
+            status = "error"
+        else:
+            return
+        error = report.longreprtext.splitlines()[-1] if report.failed and report.longreprtext else None
+        self.tracker.record(report.nodeid, status, report.duration, error)
+
+    def pytest_sessionfinish(self):
+        if self.tracker is not None:
+            self.tracker.close()
+        if not self.is_worker:
+            self.stats = merge_results(self.output_dir)
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if self.stats is None:
+            return
+        terminalreporter.section("streaming results")
+        terminalreporter.write_line(format_summary(self.stats))
+        terminalreporter.write_line(f"results: {Path(self.output_dir) / 'results.jsonl'}")
+
+
+# ============================================
+# TESTS (no browser needed)
+# ============================================
+
+def test_summary_from_running_stats(tmp_path):
+    tracker = StreamingResultTracker(tmp_path, worker="gw0")
+    for i in range(100):
+        tracker.record(f"test_{i}", "failed" if i % 10 == 0 else "passed", (i + 1) / 100)
+    tracker.close()
+
+    assert tracker.stats.counts == {"passed": 90, "failed": 10}
+    assert tracker.stats.quantile(0.5) == pytest.approx(0.5, rel=0.05)
+    assert tracker.stats.quantile(0.9) == pytest.approx(0.9, rel=0.05)
+    assert tracker.stats.slowest == ("test_99", 1.0)
+    print(f"\n  {tracker.summary()}")
+
+
+def test_workers_merge(tmp_path):
+    for worker in ("gw0", "gw1"):
+        tracker = StreamingResultTracker(tmp_path, worker=worker)
+        for i in range(5):
+            tracker.record(f"{worker}_test_{i}", "passed", 0.2)
+        tracker.close()
+
+    stats = merge_results(tmp_path)
+    summary = json.loads((tmp_path / "summary.json").read_text())
+    assert stats.total == 10
+    assert summary["workers"] == ["gw0", "gw1"]
+    assert len(list(read_results(tmp_path / "results.jsonl"))) == 10
+
+
+def test_crash_keeps_recorded_results(tmp_path):
+    """A worker that dies without close(): no summary, half a line at the end."""
+    tracker = StreamingResultTracker(tmp_path, worker="gw0")
+    tracker.record("test_ok", "passed", 0.1)
+    tracker.record("test_broken", "failed", 0.3, "AssertionError")
+    with open(tracker.path, "a") as f:
+        f.write('{"test": "test_cut_off", "sta')  # killed mid-write
+
+    stats = merge_results(tmp_path)
+    assert stats.counts == {"passed": 1, "failed": 1}
+    summary = json.loads((tmp_path / "summary.json").read_text())
+    assert summary["failures"] == ["test_broken"]
+
+
+# ============================================
+# BENCHMARK: LIST + SAVE() vs STREAMING
+# ============================================
+
+@pytest.mark.skipif(os.getenv("RUN_BENCHMARK") != "1", reason="set RUN_BENCHMARK=1")
+def test_benchmark_record_cost(tmp_path):
+    """Save after every test, as a crash-safe list tracker would have to."""
+    runs = int(os.getenv("BENCHMARK_RUNS", "2000"))
+
+    results = []
+    start = time.perf_counter()
+    for i in range(runs):
+        results.append({"test": f"test_{i}", "status": "passed", "duration_seconds": 0.5, "error": None})
+        with open(tmp_path / "results.json", "w") as f:
+            json.dump({"total": len(results),
+                       "passed": sum(1 for r in results if r["status"] == "passed"),
+                       "results": results}, f)
+    list_time = time.perf_counter() - start
+
+    tracker = StreamingResultTracker(tmp_path / "stream", worker="bench")
+    start = time.perf_counter()
+    for i in range(runs):
+        tracker.record(f"test_{i}", "passed", 0.5)
+    stream_time = time.perf_counter() - start
+    tracker.close()
+
+    print(f"\n  {runs} results, crash-safe after every test:")
+    print(f"    list + save(): {list_time:6.2f}s  ({list_time / runs * 1e6:.0f}us per test)")
+    print(f"    streaming:     {stream_time:6.2f}s  ({stream_time / runs * 1e6:.0f}us per test)")
+
+
+# ============================================
+# KEY POINTS:
+#
+# 1. Append one JSON line per result - no rewrite, no rescans
+# 2. Running counters + a log histogram give summary() and quantiles in O(1)
+# 3. flush() per line survives a crash, fsync every N lines a power loss
+# 4. One file per xdist worker - no two processes write the same file
+# 5. Merge at the end; rebuild from JSONL if a worker died early
+#
+# Run: pytest -n 4 --stream-results
+# ============================================
@@ -0,0 +1,309 @@
+"""Example 9: Performance Budgets per Navigation
+
+timed_page in 05_reporting_monitoring.py measures only how long the whole
+test took and prints a warning past 10 seconds. A page that got 800ms
+slower to respond still passes - nobody notices until users do.
+
+This version of timed_page:
+- after EVERY page.goto() reads Navigation Timing, paint and resource
+  timing entries from the browser
+- stores them per test and URL
+- checks budgets declared on the test:
+      @pytest.mark.perf_budget(ttfb=200, load=1500)
+  a navigation over budget FAILS the test, right at that goto()
+- appends every sample to a history file (JSONL, one line per navigation)
+  and compares this run with the median of earlier runs
+
+Metrics (milliseconds, from the start of the navigation):
+    ttfb, dom_content_loaded, load, first_paint, first_contentful_paint,
+    resources (count), transfer_kb, slowest_resource
+
+Setup: the perf_budget marker is registered in conftest.py in this folder.
+
+Run with (from this folder): pytest 09_perf_budgets.py -v -s
+Compare runs: python 09_perf_budgets.py compare
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from playwright.sync_api import Page
+
+
+BASE_URL = "https://the-internet.herokuapp.com"
+HISTORY_FILE = os.getenv("PERF_HISTORY", "test-results/perf-history.jsonl")
+BASELINE_RUNS = int(os.getenv("PERF_BASELINE_RUNS", "5"))
+REGRESSION_THRESHOLD = float(os.getenv("PERF_REGRESSION", "0.25"))  # +25% = regression
+
+TIMING_METRICS = ("ttfb", "dom_content_loaded", "load", "first_paint",
+                  "first_contentful_paint", "slowest_resource")
+
+COLLECT_JS = """async (timeout) => {
+    // goto() returns on the load EVENT - loadEventEnd is set a moment later
+    const started = Date.now();
+    while (Date.now() - started < timeout) {
+        const nav = performance.getEntriesByType("navigation")[0];
+        if (!nav || nav.loadEventEnd > 0) break;
+        await new Promise(resolve => setTimeout(resolve, 20));
+    }
+    const nav = performance.getEntriesByType("navigation")[0];
+    const paints = {};
+    for (const entry of performance.getEntriesByType("paint")) {
+        paints[entry.name] = entry.startTime;
+    }
+    const resources = performance.getEntriesByType("resource");
+    return {
+        ttfb: nav ? nav.responseStart - nav.startTime : null,
+        dom_content_loaded: nav && nav.domContentLoadedEventEnd ? nav.domContentLoadedEventEnd : null,
+        load: nav && nav.loadEventEnd ? nav.loadEventEnd : null,
+        first_paint: paints["first-paint"] ?? null,
+        first_contentful_paint: paints["first-contentful-paint"] ?? null,
+        resources: resources.length,
+        transfer_kb: resources.reduce((sum, r) => sum + (r.transferSize || 0), 0) / 1024,
+        slowest_resource: resources.reduce((max, r) => Math.max(max, r.duration), 0),
+    };
+}"""
+
+
+# ============================================
+# METRICS COLLECTOR
+# ============================================
+
+class PerfCollector:
+    """Collects browser timings per test and URL, checks budgets, keeps history."""
+
+    def __init__(self, history_file=HISTORY_FILE, run_id=None):
+        self.history_file = Path(history_file)
+        self.run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.samples = []
+        self.violations = []
+        self.baseline = load_baseline(self.history_file, BASELINE_RUNS, exclude_run=self.run_id)
+
+    def collect(self, page: Page, test_name, url, timeout_ms=5000):
+        metrics = page.evaluate(COLLECT_JS, timeout_ms)
+        metrics = {k: round(v, 1) if isinstance(v, float) else v for k, v in metrics.items()}
+        sample = {"run": self.run_id, "test": test_name, "url": url, "metrics": metrics}
+        self.samples.append(sample)
+        return sample
+
+    def check_budget(self, sample, budget):
+        """Return 'metric 320ms > 200ms' for every metric over budget."""
+        over = []
+        for metric, limit in budget.items():
+            value = sample["metrics"].get(metric)
+            if value is not None and value > limit:
+                over.append(f"{metric} {value:.0f}ms > {limit}ms")
+        if over:
+            self.violations.append((sample["test"], sample["url"], over))
+        return over
+
+    def regressions(self, threshold=REGRESSION_THRESHOLD):
+        """Compare this run with the median of earlier runs."""
+        return compare_samples(self.samples, self.baseline, threshold)
+
+    def save(self):
+        """Append this run's samples - one JSON line per navigation."""
+        if not self.samples:
+            return
+        self.history_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.history_file, "a", encoding="utf-8") as f:
+            for sample in self.samples:
+                f.write(json.dumps(sample) + "\n")
+
+    def report(self):
+        if not self.samples:
+            return
+        print(f"\n  [perf] {len(self.samples)} navigations, run {self.run_id}")
+        for sample in self.samples:
+            m = sample["metrics"]
+            print(f"  [perf] {sample['test']} {sample['url']}: "
+                  f"ttfb {fmt(m['ttfb'])}, fcp {fmt(m['first_contentful_paint'])}, "
+                  f"load {fmt(m['load'])}, {m['resources']} resources / {m['transfer_kb']:.0f}KB")
+        for test, url, over in self.violations:
+            print(f"  [perf] BUDGET {test} {url}: {', '.join(over)}")
+        for line in self.regressions():
+            print(f"  [perf] REGRESSION {line}")
+
+
+def fmt(value):
+    return "-" if value is None else f"{value:.0f}ms"
+
+
+# ============================================
+# HISTORY & TRENDS
+# ============================================
+
+def read_history(path):
+    path = Path(path)
+    if not path.exists():
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def run_order(samples):
+    """Run ids oldest first - the file is append-only, so file order is time order."""
+    return list(dict.fromkeys(s["run"] for s in samples))
+
+
+def load_baseline(path, runs=BASELINE_RUNS, exclude_run=None):
+    """{(test, url, metric): median} over the last `runs` runs."""
+    samples = [s for s in read_history(path) if s["run"] != exclude_run]
+    recent = set(run_order(samples)[-runs:])
+    values = defaultdict(list)
+    for sample in samples:
+        if sample["run"] not in recent:
+            continue
+        for metric in TIMING_METRICS:
+            value = sample["metrics"].get(metric)
+            if value is not None:
+                values[(sample["test"], sample["url"], metric)].append(value)
+    return {key: statistics.median(v) for key, v in values.items()}
+
+
+def compare_samples(samples, baseline, threshold=REGRESSION_THRESHOLD):
+    lines = []
+    for sample in samples:
+        for metric in TIMING_METRICS:
+            value = sample["metrics"].get(metric)
+            before = baseline.get((sample["test"], sample["url"], metric))
+            # Ignore tiny absolute changes: 4ms -> 6ms is +50% but just noise
+            if value is None or not before or value - before < 50:
+                continue
+            change = (value - before) / before
+            if change > threshold:
+                lines.append(f"{sample['test']} {sample['url']} {metric}: "
+                             f"{before:.0f}ms -> {value:.0f}ms (+{change:.0%})")
+    return lines
+
+
+# ============================================
+# FIXTURES (put these in conftest.py)
+# ============================================
+
+# The perf_budget marker is registered in conftest.py (pytest.ini works too):
+#
+#   [pytest]
+#   markers =
+#       perf_budget(**metrics): max milliseconds per navigation
+
+@pytest.fixture(scope="session")
+def perf_collector():
+    # All xdist workers of one run share the run id
+    collector = PerfCollector(run_id=os.getenv("PYTEST_XDIST_TESTRUNUID"))
+    yield collector
+    collector.save()
+    collector.report()
+
+
+@pytest.fixture
+def timed_page(page: Page, perf_collector, request):
+    """Page whose goto() collects browser metrics and enforces budgets."""
+    marker = request.node.get_closest_marker("perf_budget")
+    budget = marker.kwargs if marker else {}
+    test_name = request.node.name
+    original_goto = page.goto
+
+    def goto(url, **kwargs):
+        response = original_goto(url, **kwargs)
+        sample = perf_collector.collect(page, test_name, url.replace(BASE_URL, "") or "/")
+        over = perf_collector.check_budget(sample, budget)
+        if over:
+            pytest.fail(f"Performance budget exceeded for {url}: {', '.join(over)}")
+        return response
+
+    page.goto = goto
+    start = time.time()
+
+    yield page
+
+    duration = time.time() - start
+    print(f"\n  [TIMING] {test_name}: {duration:.2f}s")
+    if duration > 10:
+        print(f"  [WARNING] {test_name} took over 10 seconds!")
+
+
+# ============================================
+# TESTS
+# ============================================
+
+@pytest.mark.perf_budget(ttfb=1500, load=5000)
+def test_login_performance(timed_page: Page):
+    """Only goto() is measured - the /secure page opened by click() is not."""
+    timed_page.goto(f"{BASE_URL}/login")
+    timed_page.locator("#username").fill("tomsmith")
+    timed_page.locator("#password").fill("SuperSecretPassword!")
+    timed_page.locator("button[type='submit']").click()
+    assert "/secure" in timed_page.url
+
+
+@pytest.mark.perf_budget(first_contentful_paint=3000, load=5000)
+def test_several_pages(timed_page: Page):
+    for path in ("/checkboxes", "/dropdown", "/inputs"):
+        timed_page.goto(f"{BASE_URL}{path}")
+
+
+@pytest.mark.skipif(os.getenv("SHOW_FAILURE") != "1", reason="set SHOW_FAILURE=1 to see a budget failure")
+@pytest.mark.perf_budget(ttfb=1)
+def test_impossible_budget(timed_page: Page):
+    timed_page.goto(f"{BASE_URL}/login")
+
+
+def test_compare_with_history(tmp_path):
+    """No browser needed: two earlier runs and a slower current run."""
+    history = tmp_path / "perf-history.jsonl"
+    with open(history, "w") as f:
+        for run, ttfb in (("run1", 200), ("run2", 220)):
+            f.write(json.dumps({"run": run, "test": "test_x", "url": "/login",
+                                "metrics": {"ttfb": ttfb, "load": 900}}) + "\n")
+
+    baseline = load_baseline(history)
+    assert baseline[("test_x", "/login", "ttfb")] == 210
+
+    current = [{"run": "run3", "test": "test_x", "url": "/login",
+                "metrics": {"ttfb": 400, "load": 920}}]
+    lines = compare_samples(current, baseline)
+    assert len(lines) == 1 and "ttfb" in lines[0]
+
+
+# ============================================
+# CLI: COMPARE THE LAST RUN WITH THE ONES BEFORE
+# ============================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Performance history")
+    commands = parser.add_subparsers(dest="command", required=True)
+    compare = commands.add_parser("compare", help="Last run vs median of earlier runs")
+    compare.add_argument("--history", default=HISTORY_FILE)
+    compare.add_argument("--runs", type=int, default=BASELINE_RUNS)
+    compare.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args()
+
+    samples = read_history(args.history)
+    if not samples:
+        raise SystemExit(f"No history in {args.history}")
+    last_run = run_order(samples)[-1]
+    baseline = load_baseline(args.history, args.runs, exclude_run=last_run)
+    lines = compare_samples([s for s in samples if s["run"] == last_run], baseline, args.threshold)
+    print(f"Run {last_run} vs median of up to {args.runs} earlier runs:")
+    for line in lines or ["no regressions"]:
+        print(f"  {line}")
+
+
+# ============================================
+# KEY POINTS:
+#
+# 1. Navigation Timing + paint + resource entries come from the browser itself
+# 2. Collect after every goto(), stored per test AND URL
+# 3. @pytest.mark.perf_budget(...) turns slow pages into failing tests
+# 4. Append-only history -> compare each run with the median of earlier runs
+# 5. Ignore tiny absolute changes, they are noise
+#
+# Run: pytest 09_perf_budgets.py -v -s
+# ============================================
@@ -0,0 +1,6 @@
+"""Registers the perf_budget marker used by 09_perf_budgets.py."""
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "perf_budget(**metrics): max milliseconds per navigation, e.g. ttfb=200, load=1500")